@@ -1,6 +1,13 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import PlayerProfile, CoachProfile, CoachAvailability, CoachReview
+from .models import PlayerProfile, CoachProfile, CoachAvailability, CoachReview, CoachSpecialty
+from .thumbnails import thumbnail_urls
+
+
+def preview_url(profile):
+    """The 256px thumbnail once it exists, otherwise the original upload."""
+    return thumbnail_urls(profile).get('256', {}).get('jpeg') or profile.profile_image.url
+
 
 # Register your models here.
 @admin.register(PlayerProfile)
@@ -25,16 +32,22 @@ class PlayerProfileAdmin(admin.ModelAdmin):
     
     def profile_image_preview(self, obj):
         if obj.profile_image:
-            return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', obj.profile_image.url)
+            return format_html('<img src="{}" style="max-height: 200px; max-width: 200px;" />', preview_url(obj))
         return "No image uploaded"
     profile_image_preview.short_description = 'Profile Image Preview'
 
 
+class CoachSpecialtyInline(admin.TabularInline):
+    model = CoachSpecialty
+    extra = 1
+
+
 @admin.register(CoachProfile)
 class CoachProfileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'certification_level', 'years_experience', 'hourly_rate', 'is_available', 'profile_image_preview']
+    inlines = [CoachSpecialtyInline]
+    list_display = ['user', 'certification_level', 'years_experience', 'hourly_rate', 'rating_avg', 'rating_count', 'is_available', 'profile_image_preview']
     list_filter = ['certification_level', 'is_available', 'created_at']
-    search_fields = ['user__username', 'user__first_name', 'user__last_name', 'specialties']
+    search_fields = ['user__username', 'user__first_name', 'user__last_name', 'specialty_set__specialty']
     readonly_fields = ['created_at', 'updated_at', 'profile_image_preview']
     list_editable = ['is_available']
     fieldsets = (
@@ -46,7 +59,7 @@ class CoachProfileAdmin(admin.ModelAdmin):
             'fields': ('user', 'date_of_birth', 'certification_level')
         }),
         ('Coaching Details', {
-            'fields': ('specialties', 'years_experience', 'hourly_rate', 'bio', 'is_available')
+            'fields': ('years_experience', 'hourly_rate', 'bio', 'is_available')
         }),
         
         ('Timestamps', {
@@ -57,7 +70,7 @@ class CoachProfileAdmin(admin.ModelAdmin):
     
     def profile_image_preview(self, obj):
         if obj.profile_image:
-            return format_html('<img src="{}" style="max-height: 100px; max-width: 100px;" />', obj.profile_image.url)
+            return format_html('<img src="{}" style="max-height: 100px; max-width: 100px;" />', preview_url(obj))
         return "No image uploaded"
     profile_image_preview.short_description = 'Profile Image Preview'
 
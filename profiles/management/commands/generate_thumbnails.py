@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from profiles.models import PlayerProfile, CoachProfile
+from profiles.thumbnails import process, source_name
+
+
+class Command(BaseCommand):
+    help = "Create missing or outdated profile image thumbnails, in the foreground."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Recreate thumbnails that are already up to date.")
+
+    def handle(self, *args, **options):
+        created = failed = 0
+        for model in (PlayerProfile, CoachProfile):
+            profiles = model.objects.only('pk', 'profile_image', 'profile_thumbnails').order_by('pk')
+            for profile in profiles.iterator():
+                source = source_name(model, profile.profile_image.name)
+                if source is None:
+                    continue
+                if not options['force'] and profile.profile_thumbnails.get('source') == source:
+                    continue
+                if process(model, profile.pk, source):
+                    created += 1
+                else:
+                    failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Created thumbnails for {created} profile(s), {failed} failed."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from profiles.models import CoachProfile, CoachReview
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored rating aggregates on every CoachProfile from its reviews."
+
+    def handle(self, *args, **options):
+        stars = {f'stars_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+        totals = {
+            row.pop('coach'): row
+            for row in CoachReview.objects.order_by().values('coach').annotate(
+                rating_count=Count('id'), rating_sum=Sum('rating'), **stars
+            )
+        }
+        empty = dict.fromkeys(['rating_count', 'rating_sum', *stars], 0)
+
+        coaches = list(CoachProfile.objects.only('pk', *CoachProfile.RATING_FIELDS))
+        changed = []
+        for coach in coaches:
+            values = totals.get(coach.pk, empty)
+            values['rating_avg'] = values['rating_sum'] / values['rating_count'] if values['rating_count'] else 0
+            if any(getattr(coach, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(coach, field, value)
+                changed.append(coach)
+
+        with transaction.atomic():
+            CoachProfile.objects.bulk_update(changed, CoachProfile.RATING_FIELDS, batch_size=500)
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {len(coaches)} coach(es), repaired {len(changed)}."
+        ))
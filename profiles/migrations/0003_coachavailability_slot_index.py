@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_coachavailability_coachprofile_coachreview'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='coachavailability',
+            name='coach',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='profiles.coachprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='coachavailability',
+            index=models.Index(fields=['day_of_week', 'start_time', 'end_time'], name='coach_availability_slot_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:50
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def aggregate_ratings(apps, schema_editor):
+    CoachProfile = apps.get_model('profiles', 'CoachProfile')
+    CoachReview = apps.get_model('profiles', 'CoachReview')
+    stars = {f'stars_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+    rows = CoachReview.objects.order_by().values('coach').annotate(
+        rating_count=Count('id'), rating_sum=Sum('rating'), **stars
+    )
+    for row in rows:
+        coach_id = row.pop('coach')
+        row['rating_avg'] = row['rating_sum'] / row['rating_count']
+        CoachProfile.objects.filter(pk=coach_id).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_coachavailability_slot_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coachprofile',
+            name='rating_avg',
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coachprofile',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coachprofile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coachprofile',
+            name='stars_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coachprofile',
+            name='stars_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coachprofile',
+            name='stars_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coachprofile',
+            name='stars_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coachprofile',
+            name='stars_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(aggregate_ratings, migrations.RunPython.noop),
+    ]
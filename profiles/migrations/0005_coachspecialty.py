@@ -0,0 +1,75 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+SPECIALTIES = [
+    ('technique', 'Technique Development'),
+    ('strategy', 'Game Strategy'),
+    ('fitness', 'Physical Conditioning'),
+    ('mental', 'Mental Game'),
+    ('youth', 'Youth Development'),
+    ('performance', 'Performance Coaching'),
+]
+
+
+def split_specialties(apps, schema_editor):
+    """Turn the comma-separated strings into rows, matching codes or labels."""
+    CoachProfile = apps.get_model('profiles', 'CoachProfile')
+    CoachSpecialty = apps.get_model('profiles', 'CoachSpecialty')
+    lookup = {}
+    for code, label in SPECIALTIES:
+        lookup[code] = code
+        lookup[label.lower()] = code
+
+    rows = []
+    for coach_id, specialties in CoachProfile.objects.values_list('id', 'specialties').iterator():
+        codes = {lookup.get(item.strip().lower()) for item in (specialties or '').split(',')}
+        codes.discard(None)
+        rows.extend(CoachSpecialty(coach_id=coach_id, specialty=code) for code in sorted(codes))
+    CoachSpecialty.objects.bulk_create(rows, batch_size=1000)
+
+
+def join_specialties(apps, schema_editor):
+    CoachProfile = apps.get_model('profiles', 'CoachProfile')
+    CoachSpecialty = apps.get_model('profiles', 'CoachSpecialty')
+    codes = {}
+    for coach_id, code in CoachSpecialty.objects.values_list('coach_id', 'specialty'):
+        codes.setdefault(coach_id, []).append(code)
+    for coach_id, specialties in codes.items():
+        CoachProfile.objects.filter(pk=coach_id).update(specialties=', '.join(sorted(specialties)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_coachprofile_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoachSpecialty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('specialty', models.CharField(choices=[('technique', 'Technique Development'), ('strategy', 'Game Strategy'), ('fitness', 'Physical Conditioning'), ('mental', 'Mental Game'), ('youth', 'Youth Development'), ('performance', 'Performance Coaching')], max_length=20)),
+                ('coach', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='specialty_set', to='profiles.coachprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Coach specialties',
+                'ordering': ['specialty'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='coachspecialty',
+            index=models.Index(fields=['specialty', 'coach'], name='coach_specialty_search_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='coachspecialty',
+            unique_together={('coach', 'specialty')},
+        ),
+        migrations.RunPython(split_specialties, join_specialties),
+        migrations.RemoveField(
+            model_name='coachprofile',
+            name='specialties',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_coachspecialty'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playerprofile',
+            index=models.Index(fields=['skill_level', 'date_of_birth'], name='player_skill_dob_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerprofile',
+            index=models.Index(fields=['date_of_birth'], name='player_dob_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_playerprofile_age_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coachprofile',
+            name='profile_thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='playerprofile',
+            name='profile_thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
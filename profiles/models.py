@@ -1,10 +1,84 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Coalesce, ExtractYear, NullIf
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+import datetime
 import os
+from tennisapp.models import SnapshotModel
+from .thumbnails import schedule_thumbnails, source_name
+
+
+def age_on(date_of_birth, today):
+    """Completed years between date_of_birth and today."""
+    return today.year - date_of_birth.year - ((today.month, today.day) < (date_of_birth.month, date_of_birth.day))
+
+
+def birth_date_cutoff(today, years):
+    """Latest date of birth of someone who is at least `years` old today."""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:  # 29 February in a non-leap year
+        return today.replace(year=today.year - years, day=28)
+
 
 # Create your models here.
-class PlayerProfile(models.Model):
+class PlayerProfileQuerySet(models.QuerySet):
+    def with_age(self, today=None):
+        """Annotate age_years, computed in the query with the same rule as age_on()."""
+        today = today or datetime.date.today()
+        birthday_pending = Case(
+            When(
+                Q(date_of_birth__month__gt=today.month)
+                | Q(date_of_birth__month=today.month, date_of_birth__day__gt=today.day),
+                then=Value(1),
+            ),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        return self.annotate(
+            age_years=Value(today.year, output_field=IntegerField())
+            - ExtractYear('date_of_birth')
+            - birthday_pending
+        )
+
+    def age_between(self, min_age=None, max_age=None, today=None):
+        """Filter on age as a date_of_birth range, so the index can be used."""
+        today = today or datetime.date.today()
+        players = self
+        if min_age is not None:
+            players = players.filter(date_of_birth__lte=birth_date_cutoff(today, min_age))
+        if max_age is not None:
+            players = players.filter(date_of_birth__gt=birth_date_cutoff(today, max_age + 1))
+        return players
+
+
+class ThumbnailedProfile(SnapshotModel):
+    """A profile whose profile_image gets background thumbnails (see thumbnails.py)."""
+    profile_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Written in the background, never back from a stale instance
+    MAINTAINED_FIELDS = ('profile_thumbnails',)
+
+    # Uploaded image name as last read from / written to the database
+    _loaded_image = None
+
+    class Meta:
+        abstract = True
+
+    def take_snapshot(self):
+        # A deferred image keeps the last name seen
+        if 'profile_image' in self.__dict__:
+            self._loaded_image = source_name(type(self), str(self.__dict__['profile_image'] or ''))
+
+    def save(self, *args, **kwargs):
+        loaded_image = self._loaded_image
+        super().save(*args, **kwargs)
+        if 'profile_image' in self.__dict__ and self._loaded_image != loaded_image:
+            schedule_thumbnails(self)
+
+
+class PlayerProfile(ThumbnailedProfile):
     SKILL_LEVELS = [
         ('beginner', 'Beginner'),
         ('intermediate', 'Intermediate'),
@@ -24,15 +98,60 @@ class PlayerProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PlayerProfileQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Player filters: skill level plus age as a date_of_birth range
+            models.Index(fields=['skill_level', 'date_of_birth'], name='player_skill_dob_idx'),
+            models.Index(fields=['date_of_birth'], name='player_dob_idx'),
+        ]
+
     def age(self):
-        import datetime
-        return int((datetime.date.today() - self.date_of_birth).days / 365.25)
+        return age_on(self.date_of_birth, datetime.date.today())
     
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}"
 
 
-class CoachProfile(models.Model):
+class CoachProfileQuerySet(models.QuerySet):
+    def available_between(self, date, start_time, end_time):
+        """
+        Coaches with a weekly availability row covering start_time-end_time
+        on date's weekday. Served by the (day_of_week, start_time, end_time)
+        index on CoachAvailability.
+        """
+        covering = CoachAvailability.objects.filter(
+            day_of_week=date.weekday(),
+            start_time__lte=start_time,
+            end_time__gte=end_time,
+        ).values('coach_id')
+        return self.filter(is_available=True, pk__in=covering)
+
+    def for_directory(self):
+        """Join the user and prefetch specialties and weekly availability."""
+        return self.select_related('user').prefetch_related(
+            'specialty_set',
+            models.Prefetch(
+                'availability',
+                queryset=CoachAvailability.objects.order_by('day_of_week', 'start_time'),
+            ),
+        )
+
+    def with_specialties(self, codes, match='any'):
+        """
+        Coaches offering any (or, with match='all', every one) of the given
+        specialty codes. Served by the (specialty, coach) index on
+        CoachSpecialty rather than scanning coach rows.
+        """
+        codes = set(codes)
+        offering = CoachSpecialty.objects.filter(specialty__in=codes).values('coach_id')
+        if match == 'all':
+            offering = offering.annotate(matched=models.Count('id')).filter(matched=len(codes))
+        return self.filter(pk__in=offering.values('coach_id'))
+
+
+class CoachProfile(ThumbnailedProfile):
     CERTIFICATION_LEVELS = [
         ('level1', 'Level 1 - Assistant Coach'),
         ('level2', 'Level 2 - Head Coach'),
@@ -52,7 +171,6 @@ class CoachProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     date_of_birth = models.DateField()
     certification_level = models.CharField(max_length=10, choices=CERTIFICATION_LEVELS)
-    specialties = models.CharField(max_length=100, help_text="Comma-separated list of coaching specialties")
     years_experience = models.PositiveIntegerField(
         validators=[MinValueValidator(0), MaxValueValidator(70)]
     )
@@ -72,12 +190,49 @@ class CoachProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Review aggregates, kept in step by CoachReview
+    rating_avg = models.FloatField(default=0, editable=False, db_index=True)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    stars_1 = models.PositiveIntegerField(default=0, editable=False)
+    stars_2 = models.PositiveIntegerField(default=0, editable=False)
+    stars_3 = models.PositiveIntegerField(default=0, editable=False)
+    stars_4 = models.PositiveIntegerField(default=0, editable=False)
+    stars_5 = models.PositiveIntegerField(default=0, editable=False)
+
+    # Maintained with F() updates, never written back from a stale instance
+    RATING_FIELDS = (
+        'rating_avg', 'rating_count', 'rating_sum',
+        'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5',
+    )
+    MAINTAINED_FIELDS = ThumbnailedProfile.MAINTAINED_FIELDS + RATING_FIELDS
+
+    objects = CoachProfileQuerySet.as_manager()
+
+    @classmethod
+    def apply_rating(cls, coach_id, rating, sign=1):
+        """Add (sign=1) or remove (sign=-1) one review's rating in a single UPDATE."""
+        star = f'stars_{rating}'
+        count = F('rating_count') + sign
+        total = F('rating_sum') + sign * rating
+        cls.objects.filter(pk=coach_id).update(
+            rating_count=count,
+            rating_sum=total,
+            rating_avg=Coalesce(
+                Cast(total, FloatField()) / NullIf(count, 0), Value(0.0), output_field=FloatField()
+            ),
+            **{star: F(star) + sign}
+        )
+
+    def rating_histogram(self):
+        return {star: getattr(self, f'stars_{star}') for star in range(1, 6)}
+
     def age(self):
-        import datetime
-        return int((datetime.date.today() - self.date_of_birth).days / 365.25)
+        return age_on(self.date_of_birth, datetime.date.today())
     
     def get_specialties_list(self):
-        return [specialty.strip() for specialty in self.specialties.split(',')]
+        # Uses the prefetch cache when specialty_set was prefetched
+        return [specialty.specialty for specialty in self.specialty_set.all()]
     
     def profile_image_url(self):
         """
@@ -95,6 +250,23 @@ class CoachProfile(models.Model):
         verbose_name_plural = "Coach Profiles"
 
 
+class CoachSpecialty(models.Model):
+    coach = models.ForeignKey(CoachProfile, on_delete=models.CASCADE, related_name='specialty_set')
+    specialty = models.CharField(max_length=20, choices=CoachProfile.SPECIALTIES)
+
+    class Meta:
+        unique_together = ('coach', 'specialty')
+        ordering = ['specialty']
+        indexes = [
+            # Specialty search: "coaches who do X (and Y)"
+            models.Index(fields=['specialty', 'coach'], name='coach_specialty_search_idx'),
+        ]
+        verbose_name_plural = "Coach specialties"
+
+    def __str__(self):
+        return f"{self.coach.user.first_name}: {self.get_specialty_display()}"
+
+
 class CoachAvailability(models.Model):
     DAYS_OF_WEEK = [
         (0, 'Monday'),
@@ -106,16 +278,22 @@ class CoachAvailability(models.Model):
         (6, 'Sunday'),
     ]
     
-    coach = models.ForeignKey(CoachProfile, on_delete=models.CASCADE)
+    coach = models.ForeignKey(CoachProfile, on_delete=models.CASCADE, related_name='availability')
     day_of_week = models.IntegerField(choices=DAYS_OF_WEEK)
     start_time = models.TimeField()
     end_time = models.TimeField()
+
+    class Meta:
+        indexes = [
+            # "Who can teach at this time": day equality + start_time range
+            models.Index(fields=['day_of_week', 'start_time', 'end_time'], name='coach_availability_slot_idx'),
+        ]
     
     def __str__(self):
         return f"{self.coach.user.first_name}'s {self.get_day_of_week_display()} Availability"
 
 
-class CoachReview(models.Model):
+class CoachReview(SnapshotModel):
     coach = models.ForeignKey(CoachProfile, on_delete=models.CASCADE, related_name='reviews')
     player = models.ForeignKey(PlayerProfile, on_delete=models.CASCADE)
     rating = models.PositiveIntegerField(
@@ -123,6 +301,21 @@ class CoachReview(models.Model):
     )
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    # (coach_id, rating) as last read from / written to the database
+    _loaded_rating = None
+
+    def take_snapshot(self):
+        self._loaded_rating = (self.__dict__.get('coach_id'), self.__dict__.get('rating'))
+
+    def save(self, *args, **kwargs):
+        loaded_rating = self._loaded_rating
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self._loaded_rating != loaded_rating:
+                if loaded_rating is not None:
+                    CoachProfile.apply_rating(*loaded_rating, sign=-1)
+                CoachProfile.apply_rating(*self._loaded_rating)
     
     def __str__(self):
         return f"{self.rating} star review for {self.coach.user.first_name} by {self.player.user.first_name}"
\ No newline at end of file
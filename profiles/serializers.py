@@ -1,19 +1,36 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import PlayerProfile
+from .models import PlayerProfile, CoachProfile, CoachAvailability
+from .thumbnails import thumbnail_urls
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
+class ProfileThumbnailsField(serializers.ReadOnlyField):
+    """Thumbnail URLs by size and format; {} until the background job has run."""
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, profile):
+        return thumbnail_urls(profile)
+
 class PlayerProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
-    age = serializers.ReadOnlyField()
+    age = serializers.SerializerMethodField()
+    profile_image_thumbnails = ProfileThumbnailsField()
     
     class Meta:
         model = PlayerProfile
-        fields = '__all__'
+        exclude = ['profile_thumbnails']
+
+    def get_age(self, obj):
+        # Prefer the age_years annotation from PlayerProfile.objects.with_age()
+        age = getattr(obj, 'age_years', None)
+        return obj.age() if age is None else age
 
 class PlayerProfileDetailSerializer(PlayerProfileSerializer):
     user = UserSerializer(read_only=True)
@@ -28,4 +45,64 @@ class PlayerProfileDetailSerializer(PlayerProfileSerializer):
             user.email = user_data.get('email', user.email)
             user.save()
         
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+class PlayerProfileQuerySerializer(serializers.Serializer):
+    min_age = serializers.IntegerField(min_value=0, max_value=120, required=False)
+    max_age = serializers.IntegerField(min_value=0, max_value=120, required=False)
+    skill_level = serializers.ChoiceField(choices=PlayerProfile.SKILL_LEVELS, required=False)
+
+    def validate(self, data):
+        if data.get('min_age') is not None and data.get('max_age') is not None and data['max_age'] < data['min_age']:
+            raise serializers.ValidationError({"max_age": "max_age must not be below min_age."})
+        return data
+
+
+class CoachAvailabilitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CoachAvailability
+        fields = ['id', 'day_of_week', 'start_time', 'end_time']
+
+
+class CoachProfileSerializer(serializers.ModelSerializer):
+    """Expects CoachProfile.objects.for_directory() so a page costs a fixed number of queries."""
+    user = UserSerializer(read_only=True)
+    age = serializers.ReadOnlyField()
+    specialties_list = serializers.ReadOnlyField(source='get_specialties_list')
+    rating_histogram = serializers.ReadOnlyField()
+    availability = CoachAvailabilitySerializer(many=True, read_only=True)
+    profile_image_thumbnails = ProfileThumbnailsField()
+
+    class Meta:
+        model = CoachProfile
+        exclude = ['profile_thumbnails']
+
+
+class SpecialtyListField(serializers.ListField):
+    """Specialty codes from repeated (?specialty=a&specialty=b) or comma-separated params."""
+    child = serializers.ChoiceField(choices=CoachProfile.SPECIALTIES)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [data]
+        codes = [code.strip() for item in data for code in str(item).split(',') if code.strip()]
+        return super().to_internal_value(codes)
+
+
+class CoachSearchQuerySerializer(serializers.Serializer):
+    specialty = SpecialtyListField(required=False)
+    match = serializers.ChoiceField(choices=['any', 'all'], default='any')
+    certification_level = serializers.ChoiceField(choices=CoachProfile.CERTIFICATION_LEVELS, required=False)
+    min_rating = serializers.FloatField(min_value=0, max_value=5, required=False)
+    ordering = serializers.ChoiceField(choices=['name', 'rating', '-rating'], default='name')
+
+
+class CoachAvailabilityQuerySerializer(CoachSearchQuerySerializer):
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, data):
+        if data['end_time'] <= data['start_time']:
+            raise serializers.ValidationError({"end_time": "End time must be after the start time."})
+        return data
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from tennisapp.cache import invalidate, invalidate_on_user_change
+from .models import PlayerProfile, CoachProfile, CoachReview, CoachAvailability, CoachSpecialty
+from .thumbnails import thumbnails_updated
+
+COACH_DIRECTORY_CACHE = 'coach-directory'
+PLAYER_PROFILES_CACHE = 'player-profiles'
+
+invalidate_on_user_change(COACH_DIRECTORY_CACHE, PLAYER_PROFILES_CACHE)
+
+
+# ---------------- Coach rating aggregates ----------------
+@receiver(post_delete, sender=CoachReview)
+def remove_review_rating(sender, instance, **kwargs):
+    if instance._loaded_rating is not None:
+        CoachProfile.apply_rating(*instance._loaded_rating, sign=-1)
+
+
+# ---------------- Coach directory cache ----------------
+@receiver(post_save, sender=CoachProfile)
+@receiver(post_delete, sender=CoachProfile)
+@receiver(post_save, sender=CoachAvailability)
+@receiver(post_delete, sender=CoachAvailability)
+@receiver(post_save, sender=CoachReview)
+@receiver(post_delete, sender=CoachReview)
+@receiver(post_save, sender=CoachSpecialty)
+@receiver(post_delete, sender=CoachSpecialty)
+@receiver(thumbnails_updated, sender=CoachProfile)
+def invalidate_coach_directory(sender, **kwargs):
+    invalidate(COACH_DIRECTORY_CACHE)
+
+
+# ---------------- Player profile cache ----------------
+@receiver(post_save, sender=PlayerProfile)
+@receiver(post_delete, sender=PlayerProfile)
+@receiver(thumbnails_updated, sender=PlayerProfile)
+def invalidate_player_profiles(sender, **kwargs):
+    invalidate(PLAYER_PROFILES_CACHE)
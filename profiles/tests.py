@@ -1,3 +1,290 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, time
+from io import BytesIO, StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APITestCase
+from .models import PlayerProfile, CoachProfile, CoachAvailability, CoachReview, CoachSpecialty, age_on
+from .serializers import PlayerProfileSerializer
+from .thumbnails import SIZES, FORMATS
 
-# Create your tests here.
+
+class PlayerAgeTests(TestCase):
+    """The DB-side age annotation and range filter agree with age_on()."""
+
+    def setUp(self):
+        self.today = date(2024, 3, 1)
+        births = [date(2010, 2, 28), date(2010, 3, 1), date(2010, 3, 2), date(2008, 2, 29)]
+        self.players = [
+            PlayerProfile.objects.create(
+                user=User.objects.create_user(username=f'player{i}', password='pass'),
+                date_of_birth=born,
+                skill_level='beginner',
+            )
+            for i, born in enumerate(births)
+        ]
+
+    def test_annotation_matches_python_age(self):
+        for player in PlayerProfile.objects.with_age(today=self.today):
+            self.assertEqual(player.age_years, age_on(player.date_of_birth, self.today))
+
+    def test_age_between_matches_python_age(self):
+        for low, high in [(13, 13), (14, None), (None, 13), (15, 16)]:
+            expected = {
+                p.pk for p in self.players
+                if (low is None or age_on(p.date_of_birth, self.today) >= low)
+                and (high is None or age_on(p.date_of_birth, self.today) <= high)
+            }
+            found = set(
+                PlayerProfile.objects.age_between(low, high, today=self.today).values_list('pk', flat=True)
+            )
+            self.assertEqual(found, expected, (low, high))
+
+
+class PlayerDetailAgeTests(APITestCase):
+    """The detail computes ages against the date of each request."""
+
+    def setUp(self):
+        self.player = PlayerProfile.objects.create(
+            user=User.objects.create_user(username='player', password='pass'),
+            date_of_birth=date(2000, 6, 15),
+            skill_level='beginner',
+            profile_image=None,
+        )
+
+    def age_on_day(self, today):
+        cache.clear()
+        with mock.patch('profiles.models.datetime') as clock:
+            clock.date.today.return_value = today
+            return self.client.get(f'/api/profiles/{self.player.pk}/').json()['age']
+
+    def test_age_follows_the_calendar(self):
+        self.assertEqual(self.age_on_day(date(2030, 6, 14)), 29)
+        self.assertEqual(self.age_on_day(date(2030, 6, 15)), 30)
+
+
+class ProfileThumbnailTests(TestCase):
+    """Thumbnails are created on the local filesystem storage as well."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        storage = override_settings(
+            DEFAULT_FILE_STORAGE='django.core.files.storage.FileSystemStorage',
+            MEDIA_ROOT=media_root,
+            THUMBNAILS_ASYNC=False,
+        )
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.player = PlayerProfile.objects.create(
+            user=User.objects.create_user(username='player', password='pass'),
+            date_of_birth=date(2000, 1, 1),
+            skill_level='beginner',
+        )
+
+    def upload(self, name):
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), 'yellow').save(buffer, 'PNG')
+        self.player.profile_image = SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+        self.player.save()
+
+    def test_upload_creates_every_size_and_format(self):
+        self.upload('ball.png')
+
+        player = PlayerProfile.objects.get(pk=self.player.pk)
+        urls = PlayerProfileSerializer(player).data['profile_image_thumbnails']
+        self.assertEqual(set(urls), {str(size) for size in SIZES})
+        self.assertEqual(urls['64']['webp'], '/media/profiles/thumbs/ball_64.webp')
+        for size in SIZES:
+            for ext, fmt in FORMATS.items():
+                name = player.profile_thumbnails['sizes'][str(size)][ext]
+                with player.profile_image.storage.open(name) as f, Image.open(f) as thumb:
+                    self.assertEqual((thumb.format, thumb.size), (fmt, (size, size)))
+
+    def test_thumbnails_of_a_replaced_image_are_not_served(self):
+        self.upload('ball.png')
+        PlayerProfile.objects.filter(pk=self.player.pk).update(profile_image='profiles/other.png')
+
+        player = PlayerProfile.objects.get(pk=self.player.pk)
+        self.assertEqual(PlayerProfileSerializer(player).data['profile_image_thumbnails'], {})
+
+
+def make_coach(username, **fields):
+    fields.setdefault('certification_level', 'level2')
+    return CoachProfile.objects.create(
+        user=User.objects.create_user(username=username, password='pass', last_name=username),
+        date_of_birth=date(1980, 1, 1),
+        years_experience=10,
+        hourly_rate=40,
+        profile_image=None,
+        **fields
+    )
+
+
+class AvailableCoachTests(APITestCase):
+    """A coach is available when one weekly row covers the whole slot."""
+
+    def setUp(self):
+        cache.clear()
+        self.monday = date(2030, 1, 7)
+        self.morning = make_coach('morning')
+        self.split = make_coach('split')
+        self.away = make_coach('away', is_available=False)
+        CoachAvailability.objects.create(coach=self.morning, day_of_week=0, start_time=time(9), end_time=time(12))
+        CoachAvailability.objects.create(coach=self.split, day_of_week=0, start_time=time(9), end_time=time(10))
+        CoachAvailability.objects.create(coach=self.split, day_of_week=0, start_time=time(10), end_time=time(12))
+        CoachAvailability.objects.create(coach=self.away, day_of_week=0, start_time=time(8), end_time=time(20))
+
+    def available(self, day, start, end):
+        return set(CoachProfile.objects.available_between(day, time(start), time(end)).values_list('pk', flat=True))
+
+    def test_available_between(self):
+        self.assertEqual(self.available(self.monday, 10, 11), {self.morning.pk, self.split.pk})
+        # Adjacent rows are not merged
+        self.assertEqual(self.available(self.monday, 9, 11), {self.morning.pk})
+        self.assertEqual(self.available(self.monday, 11, 13), set())
+        self.assertEqual(self.available(date(2030, 1, 8), 10, 11), set())
+
+    def test_endpoint(self):
+        response = self.client.get(
+            f'/api/profiles/coaches/available/?date={self.monday}&start_time=09:00&end_time=11:00'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([coach['id'] for coach in response.json()['results']], [self.morning.pk])
+
+        response = self.client.get(
+            f'/api/profiles/coaches/available/?date={self.monday}&start_time=11:00&end_time=10:00'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class CoachRatingTests(TestCase):
+    """The stored rating aggregates follow review writes and deletes."""
+
+    def setUp(self):
+        self.coach = make_coach('coach')
+        self.other = make_coach('other')
+        self.player = PlayerProfile.objects.create(
+            user=User.objects.create_user(username='player', password='pass'),
+            date_of_birth=date(2000, 1, 1),
+            skill_level='beginner',
+            profile_image=None,
+        )
+
+    def summary(self, coach):
+        coach.refresh_from_db()
+        return coach.rating_avg, coach.rating_count, coach.rating_histogram()
+
+    def test_aggregates_follow_reviews(self):
+        five = CoachReview.objects.create(coach=self.coach, player=self.player, rating=5)
+        three = CoachReview.objects.create(coach=self.coach, player=self.player, rating=3)
+        self.assertEqual(self.summary(self.coach), (4.0, 2, {1: 0, 2: 0, 3: 1, 4: 0, 5: 1}))
+
+        three.rating = 1
+        three.save()
+        self.assertEqual(self.summary(self.coach), (3.0, 2, {1: 1, 2: 0, 3: 0, 4: 0, 5: 1}))
+
+        five.coach = self.other
+        five.save()
+        self.assertEqual(self.summary(self.coach)[:2], (1.0, 1))
+        self.assertEqual(self.summary(self.other)[:2], (5.0, 1))
+
+        three.delete()
+        self.assertEqual(self.summary(self.coach), (0.0, 0, dict.fromkeys(range(1, 6), 0)))
+
+    def test_coach_save_never_writes_stale_aggregates(self):
+        stale = CoachProfile.objects.get(pk=self.coach.pk)
+        CoachReview.objects.create(coach=self.coach, player=self.player, rating=4)
+        stale.bio = 'Former tour player'
+        stale.save()
+        self.assertEqual(self.summary(self.coach)[:2], (4.0, 1))
+
+    def test_rebuild_command_fixes_drift(self):
+        CoachReview.objects.create(coach=self.coach, player=self.player, rating=4)
+        CoachProfile.objects.filter(pk=self.coach.pk).update(rating_avg=1, rating_count=7, stars_1=7)
+
+        call_command('rebuild_coach_ratings', stdout=StringIO())
+        self.assertEqual(self.summary(self.coach), (4.0, 1, {1: 0, 2: 0, 3: 0, 4: 1, 5: 0}))
+
+
+class CoachSpecialtyTests(APITestCase):
+    """Specialty search matches any or all of the requested codes."""
+
+    def setUp(self):
+        cache.clear()
+        self.coaches = {}
+        for name, codes in [('both', ['youth', 'mental']), ('youth', ['youth']), ('fitness', ['fitness'])]:
+            coach = self.coaches[name] = make_coach(name)
+            for code in codes:
+                CoachSpecialty.objects.create(coach=coach, specialty=code)
+
+    def names(self, queryset):
+        return sorted(coach.user.username for coach in queryset)
+
+    def test_with_specialties(self):
+        coaches = CoachProfile.objects.select_related('user')
+        self.assertEqual(self.names(coaches.with_specialties(['youth', 'mental'])), ['both', 'youth'])
+        self.assertEqual(self.names(coaches.with_specialties(['youth', 'mental'], match='all')), ['both'])
+        self.assertEqual(self.names(coaches.with_specialties(['strategy'])), [])
+
+    def test_search_endpoint(self):
+        response = self.client.get('/api/profiles/coaches/?specialty=youth,mental&match=all')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([coach['id'] for coach in results], [self.coaches['both'].pk])
+        self.assertEqual(results[0]['specialties_list'], ['mental', 'youth'])
+
+        response = self.client.get('/api/profiles/coaches/?specialty=youth&specialty=fitness')
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertEqual(self.client.get('/api/profiles/coaches/?specialty=juggling').status_code, 400)
+
+
+class CoachDirectoryTests(APITestCase):
+    """Directory pages cost a fixed number of queries and are cached until coaches change."""
+
+    def setUp(self):
+        cache.clear()
+
+    def add_coaches(self, count):
+        for _ in range(count):
+            coach = make_coach(f'coach{CoachProfile.objects.count()}')
+            CoachSpecialty.objects.create(coach=coach, specialty='technique')
+            for day in range(3):
+                CoachAvailability.objects.create(coach=coach, day_of_week=day, start_time=time(9), end_time=time(17))
+
+    def fetch(self, url='/api/profiles/coaches/'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_query_count_is_independent_of_page_size(self):
+        self.add_coaches(1)
+        small, _ = self.fetch()
+        self.add_coaches(5)
+        large, data = self.fetch()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['results']), 6)
+        self.assertEqual(len(data['results'][0]['availability']), 3)
+
+    def test_responses_are_cached_until_a_coach_changes(self):
+        self.add_coaches(1)
+        coach = CoachProfile.objects.get()
+        url = f'/api/profiles/coaches/{coach.pk}/'
+        self.fetch(url)
+        queries, data = self.fetch(url)
+        self.assertEqual(queries, 0)
+
+        CoachAvailability.objects.create(coach=coach, day_of_week=5, start_time=time(9), end_time=time(12))
+        queries, data = self.fetch(url)
+        self.assertGreater(queries, 0)
+        self.assertEqual(len(data['availability']), 4)
@@ -0,0 +1,135 @@
+"""
+Profile image thumbnails.
+
+When a profile image changes, a small thread pool renders square thumbnails
+in every size and format with Pillow and stores them next to the original
+through the image field's own storage, so Cloudinary and the local
+filesystem both work. The stored names are recorded in profile_thumbnails
+together with the image they were made from; they are only served while
+that image is still the current one.
+"""
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+SIZES = (64, 256, 512)
+FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+QUALITY = 85
+
+# Sent with the profile model as sender once a worker has stored thumbnails
+thumbnails_updated = Signal()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'THUMBNAIL_WORKERS', 2),
+                thread_name_prefix='thumbnails',
+            )
+    return _executor
+
+
+def image_field(model):
+    return model._meta.get_field('profile_image')
+
+
+def source_name(model, name):
+    """The uploaded image name, or None for an empty or placeholder image."""
+    if not name or name == image_field(model).default:
+        return None
+    return name
+
+
+def thumbnail_name(source, size, ext):
+    """profiles/ball.jpg -> profiles/thumbs/ball_64.webp"""
+    directory, filename = posixpath.split(source)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'thumbs', f'{stem}_{size}.{ext}')
+
+
+def render(image, size, fmt):
+    thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    if fmt == 'JPEG' and thumb.mode != 'RGB':
+        thumb = thumb.convert('RGB')
+    buffer = BytesIO()
+    thumb.save(buffer, fmt, quality=QUALITY)
+    return buffer.getvalue()
+
+
+def generate_thumbnails(model, source):
+    """Render and store every size and format of `source`. Returns {size: {format: name}}."""
+    storage = image_field(model).storage
+    with storage.open(source, 'rb') as f:
+        image = ImageOps.exif_transpose(Image.open(f))
+        image.load()
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    names = {}
+    for size in SIZES:
+        for ext, fmt in FORMATS.items():
+            name = thumbnail_name(source, size, ext)
+            # Replace rather than let the storage pick an alternative name
+            if storage.exists(name):
+                storage.delete(name)
+            names.setdefault(str(size), {})[ext] = storage.save(name, ContentFile(render(image, size, fmt)))
+    return names
+
+
+def process(model, pk, source):
+    """Create the thumbnails and record them, unless the image changed meanwhile."""
+    try:
+        thumbnails = {'source': source, 'sizes': generate_thumbnails(model, source)}
+    except Exception:
+        logger.exception("Could not create thumbnails for %s %s (%s)", model.__name__, pk, source)
+        return None
+    if model.objects.filter(pk=pk, profile_image=source).update(profile_thumbnails=thumbnails):
+        thumbnails_updated.send(sender=model, pk=pk)
+    return thumbnails
+
+
+def _work(model, pk, source):
+    try:
+        process(model, pk, source)
+    finally:
+        # Worker threads open their own connections; don't leak them
+        connections.close_all()
+
+
+def schedule_thumbnails(profile):
+    """Queue thumbnails for the profile's current image once the transaction commits."""
+    model = type(profile)
+    source = source_name(model, profile.profile_image.name)
+    if source is None:
+        model.objects.filter(pk=profile.pk).update(profile_thumbnails={})
+        profile.profile_thumbnails = {}
+    elif getattr(settings, 'THUMBNAILS_ASYNC', True):
+        transaction.on_commit(lambda: get_executor().submit(_work, model, profile.pk, source))
+    else:
+        profile.profile_thumbnails = process(model, profile.pk, source) or {}
+
+
+def thumbnail_urls(profile):
+    """{size: {format: url}} for the current image, or {} until the thumbnails exist."""
+    thumbnails = profile.profile_thumbnails or {}
+    if not thumbnails or thumbnails.get('source') != profile.profile_image.name:
+        return {}
+    storage = image_field(type(profile)).storage
+    return {
+        size: {ext: storage.url(name) for ext, name in formats.items()}
+        for size, formats in thumbnails['sizes'].items()
+    }
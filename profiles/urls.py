@@ -5,4 +5,7 @@ urlpatterns = [
     path('', views.PlayerProfileList.as_view()),
     path('<int:pk>/', views.PlayerProfileDetail.as_view()),
     path('me/', views.PlayerProfileDetail.as_view(), {'pk': 'me'}),
+    path('coaches/', views.CoachList.as_view()),
+    path('coaches/<int:pk>/', views.CoachDetail.as_view()),
+    path('coaches/available/', views.AvailableCoachList.as_view()),
 ]
\ No newline at end of file
@@ -1,22 +1,107 @@
 from django.shortcuts import render
 from rest_framework import generics, permissions
 from django.contrib.auth.models import User
-from .models import PlayerProfile
-from .serializers import PlayerProfileSerializer, PlayerProfileDetailSerializer
+from .models import PlayerProfile, CoachProfile
+from .serializers import (
+    PlayerProfileSerializer,
+    PlayerProfileDetailSerializer,
+    PlayerProfileQuerySerializer,
+    CoachProfileSerializer,
+    CoachSearchQuerySerializer,
+    CoachAvailabilityQuerySerializer,
+)
+from tennisapp.cache import CachedResponseMixin
 from tennisapp.permissions import IsOwnerOrReadOnly
+from .signals import COACH_DIRECTORY_CACHE, PLAYER_PROFILES_CACHE
 
 # Create your views here.
-class PlayerProfileList(generics.ListAPIView):
-    queryset = PlayerProfile.objects.all()
+class PlayerProfileList(CachedResponseMixin, generics.ListAPIView):
+    """Players, filterable by ?skill_level=, ?min_age= and ?max_age=."""
     serializer_class = PlayerProfileSerializer
+    cache_namespace = PLAYER_PROFILES_CACHE
+    # Ages move on without any row changing
+    cache_timeout = 60 * 5
 
-class PlayerProfileDetail(generics.RetrieveUpdateAPIView):
+    def get_queryset(self):
+        params = PlayerProfileQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        players = PlayerProfile.objects.select_related('user').with_age()
+        if filters.get('skill_level'):
+            players = players.filter(skill_level=filters['skill_level'])
+        players = players.age_between(filters.get('min_age'), filters.get('max_age'))
+        return players.order_by('id')
+
+class PlayerProfileDetail(CachedResponseMixin, generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
-    queryset = PlayerProfile.objects.all()
     serializer_class = PlayerProfileDetailSerializer
+    cache_namespace = PLAYER_PROFILES_CACHE
+    cache_timeout = 60 * 5
+
+    def get_queryset(self):
+        # Built per request: the age annotation depends on today's date
+        return PlayerProfile.objects.select_related('user').with_age()
+
+    def is_cacheable(self):
+        # /me/ depends on who is asking
+        return self.kwargs['pk'] != 'me'
     
     def get_object(self):
         # Allow users to access their own profile by ID or by 'me'
         if self.kwargs['pk'] == 'me':
             return self.request.user.playerprofile
-        return super().get_object()
\ No newline at end of file
+        return super().get_object()
+
+class CoachList(CachedResponseMixin, generics.ListAPIView):
+    """
+    Coach directory and search: ?specialty=youth,mental with ?match=any|all,
+    plus ?certification_level=, ?min_rating= and ?ordering=name|rating|-rating.
+    Responses are cached per filter set and cleared by the profiles signals.
+    """
+    serializer_class = CoachProfileSerializer
+    cache_namespace = COACH_DIRECTORY_CACHE
+    query_serializer_class = CoachSearchQuerySerializer
+    ORDERINGS = {
+        'name': ('user__last_name', 'id'),
+        'rating': ('rating_avg', 'id'),
+        '-rating': ('-rating_avg', '-id'),
+    }
+
+    def get_filters(self):
+        params = self.query_serializer_class(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data
+
+    def get_base_queryset(self, filters):
+        return CoachProfile.objects.all()
+
+    def get_queryset(self):
+        filters = self.get_filters()
+        coaches = self.get_base_queryset(filters).for_directory()
+        if filters.get('specialty'):
+            coaches = coaches.with_specialties(filters['specialty'], match=filters['match'])
+        if filters.get('certification_level'):
+            coaches = coaches.filter(certification_level=filters['certification_level'])
+        if filters.get('min_rating') is not None:
+            coaches = coaches.filter(rating_avg__gte=filters['min_rating'])
+        return coaches.order_by(*self.ORDERINGS[filters['ordering']])
+
+
+class AvailableCoachList(CoachList):
+    """
+    Coaches whose weekly availability covers ?date=&start_time=&end_time=,
+    with the same filters and ordering as the coach search.
+    """
+    query_serializer_class = CoachAvailabilityQuerySerializer
+
+    def get_base_queryset(self, filters):
+        return CoachProfile.objects.available_between(
+            filters['date'], filters['start_time'], filters['end_time']
+        )
+
+
+class CoachDetail(CachedResponseMixin, generics.RetrieveAPIView):
+    queryset = CoachProfile.objects.for_directory()
+    serializer_class = CoachProfileSerializer
+    cache_namespace = COACH_DIRECTORY_CACHE
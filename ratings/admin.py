@@ -0,0 +1,22 @@
+from django.contrib import admin
+from .models import PlayerRating, MatchResult
+
+
+@admin.register(PlayerRating)
+class PlayerRatingAdmin(admin.ModelAdmin):
+    list_display = ('player', 'rating', 'matches_played', 'skill_level', 'updated_at')
+    list_filter = ('skill_level',)
+    search_fields = ('player__user__username', 'player__user__first_name', 'player__user__last_name')
+    list_select_related = ('player__user',)
+    # Ratings only change through results (or the replay_ratings command)
+    readonly_fields = ('player', 'rating', 'matches_played', 'skill_level', 'updated_at')
+
+
+@admin.register(MatchResult)
+class MatchResultAdmin(admin.ModelAdmin):
+    list_display = ('played_at', 'winner', 'loser', 'source', 'winner_delta')
+    list_filter = ('source', 'played_at')
+    search_fields = ('winner__user__username', 'loser__user__username')
+    list_select_related = ('winner__user', 'loser__user')
+    date_hierarchy = 'played_at'
+    readonly_fields = ('winner_rating', 'loser_rating', 'winner_delta', 'loser_delta')
@@ -0,0 +1,125 @@
+"""
+Elo ratings for players.
+
+record_result() applies one result incrementally: it locks the two rating
+rows, moves the points and logs the result, a fixed handful of queries no
+matter how long the history is. replay() recomputes every rating from the
+result log in one ordered pass in memory and writes the outcome back in
+bulk; use it after correcting or deleting logged results.
+
+Results are applied in the order they are recorded; replay() applies them
+in played_at order, so late entries may shift ratings slightly on replay.
+
+Both take row locks on the players involved (replay() on all of them)
+before touching ratings, so results recorded while a replay runs wait for
+it instead of being overwritten by it.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from profiles.models import PlayerProfile
+from .models import PlayerRating, MatchResult
+
+INITIAL_RATING = 1500
+# New players move faster until their rating has settled
+PROVISIONAL_MATCHES = 30
+PROVISIONAL_K = 40
+K = 20
+
+
+def expected_score(rating, opponent_rating):
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def k_factor(matches_played):
+    return PROVISIONAL_K if matches_played < PROVISIONAL_MATCHES else K
+
+
+def rate(winner_rating, winner_played, loser_rating, loser_played):
+    """Points gained by the winner and lost by the loser (a negative number)."""
+    upset = 1 - expected_score(winner_rating, loser_rating)
+    return k_factor(winner_played) * upset, -k_factor(loser_played) * upset
+
+
+def lock_ratings(players):
+    """The players' rating rows, created if needed and locked, by player id."""
+    ids = [player.pk for player in players]
+    # The player rows are the lock shared with replay(); rating rows may not exist yet
+    list(PlayerProfile.objects.select_for_update().filter(pk__in=ids).order_by('pk').values_list('pk'))
+    PlayerRating.objects.bulk_create(
+        [PlayerRating(player=player, rating=INITIAL_RATING, skill_level=player.skill_level) for player in players],
+        ignore_conflicts=True,
+    )
+    rows = PlayerRating.objects.select_for_update().filter(pk__in=ids).order_by('pk')
+    return {row.pk: row for row in rows}
+
+
+def record_result(winner, loser, source, match=None, session=None, played_at=None):
+    """Log a decided match and update both ratings. Returns the MatchResult."""
+    if winner.pk == loser.pk:
+        raise ValidationError("A player can't beat themselves.")
+    with transaction.atomic():
+        ratings = lock_ratings([winner, loser])
+        winner_row, loser_row = ratings[winner.pk], ratings[loser.pk]
+        gain, loss = rate(winner_row.rating, winner_row.matches_played, loser_row.rating, loser_row.matches_played)
+        result = MatchResult.objects.create(
+            winner=winner, loser=loser, source=source, match=match, session=session,
+            played_at=played_at or timezone.now(),
+            winner_rating=winner_row.rating, loser_rating=loser_row.rating,
+            winner_delta=gain, loser_delta=loss,
+        )
+        for row, delta in ((winner_row, gain), (loser_row, loss)):
+            row.rating += delta
+            row.matches_played += 1
+            row.save(update_fields=['rating', 'matches_played', 'updated_at'])
+    return result
+
+
+def replay(batch_size=1000):
+    """
+    Recompute every rating and result snapshot from the log. Returns
+    (players, results_changed). Memory grows with the number of players,
+    not with the length of the log.
+    """
+    state = {}  # player id -> [rating, matches played]
+    changed, results_changed = [], 0
+    results = MatchResult.objects.order_by('played_at', 'id').only(
+        'id', 'winner_id', 'loser_id', 'winner_rating', 'loser_rating', 'winner_delta', 'loser_delta'
+    )
+    snapshot_fields = ['winner_rating', 'loser_rating', 'winner_delta', 'loser_delta']
+
+    with transaction.atomic():
+        # Wait for results being recorded, and hold new ones off until done
+        list(PlayerProfile.objects.select_for_update().order_by('pk').values_list('pk'))
+        for result in results.iterator(chunk_size=batch_size):
+            winner = state.setdefault(result.winner_id, [INITIAL_RATING, 0])
+            loser = state.setdefault(result.loser_id, [INITIAL_RATING, 0])
+            gain, loss = rate(winner[0], winner[1], loser[0], loser[1])
+            snapshot = (winner[0], loser[0], gain, loss)
+            if snapshot != tuple(getattr(result, field) for field in snapshot_fields):
+                for field, value in zip(snapshot_fields, snapshot):
+                    setattr(result, field, value)
+                changed.append(result)
+            winner[0], winner[1] = winner[0] + gain, winner[1] + 1
+            loser[0], loser[1] = loser[0] + loss, loser[1] + 1
+
+            if len(changed) >= batch_size:
+                MatchResult.objects.bulk_update(changed, snapshot_fields)
+                results_changed += len(changed)
+                changed = []
+        MatchResult.objects.bulk_update(changed, snapshot_fields)
+        results_changed += len(changed)
+
+        rows = list(PlayerRating.objects.all())
+        for row in rows:
+            row.rating, row.matches_played = state.pop(row.pk, (INITIAL_RATING, 0))
+        PlayerRating.objects.bulk_update(rows, ['rating', 'matches_played'], batch_size=batch_size)
+        levels = dict(PlayerProfile.objects.filter(pk__in=state).values_list('pk', 'skill_level'))
+        PlayerRating.objects.bulk_create(
+            (
+                PlayerRating(player_id=player_id, rating=rating, matches_played=played, skill_level=levels[player_id])
+                for player_id, (rating, played) in state.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(rows) + len(state), results_changed
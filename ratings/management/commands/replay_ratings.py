@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from ratings.elo import replay
+
+
+class Command(BaseCommand):
+    help = "Recompute every player rating from the match result log."
+
+    def handle(self, *args, **options):
+        players, results_changed = replay()
+        self.stdout.write(self.style.SUCCESS(
+            f"Replayed ratings for {players} player(s); {results_changed} result snapshot(s) updated."
+        ))
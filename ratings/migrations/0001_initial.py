@@ -0,0 +1,79 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('profiles', '0007_profile_thumbnails'),
+        ('training', '0012_courtusage'),
+        ('tournaments', '0007_match_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('tournament', 'Tournament'), ('training', 'Training')], max_length=10)),
+                ('played_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('winner_rating', models.FloatField(editable=False)),
+                ('loser_rating', models.FloatField(editable=False)),
+                ('winner_delta', models.FloatField(editable=False)),
+                ('loser_delta', models.FloatField(editable=False)),
+            ],
+            options={
+                'ordering': ['played_at', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlayerRating',
+            fields=[
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='profiles.playerprofile')),
+                ('rating', models.FloatField(default=1500)),
+                ('matches_played', models.PositiveIntegerField(default=0)),
+                ('skill_level', models.CharField(choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced'), ('competition', 'Competition')], max_length=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-rating', 'player'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='playerrating',
+            index=models.Index(fields=['-rating', 'player'], name='rating_leaderboard_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerrating',
+            index=models.Index(fields=['skill_level', '-rating', 'player'], name='rating_level_leaderboard_idx'),
+        ),
+        migrations.AddField(
+            model_name='matchresult',
+            name='loser',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.playerprofile'),
+        ),
+        migrations.AddField(
+            model_name='matchresult',
+            name='match',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='result', to='tournaments.match'),
+        ),
+        migrations.AddField(
+            model_name='matchresult',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='match_results', to='training.trainingsession'),
+        ),
+        migrations.AddField(
+            model_name='matchresult',
+            name='winner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.playerprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='matchresult',
+            index=models.Index(fields=['played_at', 'id'], name='result_replay_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import models
+from django.utils import timezone
+from profiles.models import PlayerProfile
+from tournaments.models import Match
+from training.models import TrainingSession
+
+
+# ---------------- Player Rating ----------------
+class PlayerRating(models.Model):
+    """A player's current Elo rating, see ratings.elo."""
+    player = models.OneToOneField(PlayerProfile, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    rating = models.FloatField(default=1500)
+    matches_played = models.PositiveIntegerField(default=0)
+    # Copied from the profile so the leaderboard reads one index per level
+    skill_level = models.CharField(max_length=12, choices=PlayerProfile.SKILL_LEVELS)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-rating', 'player']
+        indexes = [
+            # Leaderboards in rank order: whole club, and per skill level
+            models.Index(fields=['-rating', 'player'], name='rating_leaderboard_idx'),
+            models.Index(fields=['skill_level', '-rating', 'player'], name='rating_level_leaderboard_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player}: {self.rating:.0f}"
+
+
+# ---------------- Match Result Log ----------------
+class MatchResult(models.Model):
+    """
+    One decided match, from a tournament draw or training play. The log is
+    the source of truth: ratings can always be replayed from it.
+    """
+    SOURCES = [
+        ('tournament', 'Tournament'),
+        ('training', 'Training'),
+    ]
+
+    winner = models.ForeignKey(PlayerProfile, on_delete=models.CASCADE, related_name='+')
+    loser = models.ForeignKey(PlayerProfile, on_delete=models.CASCADE, related_name='+')
+    source = models.CharField(max_length=10, choices=SOURCES)
+    match = models.OneToOneField(Match, on_delete=models.SET_NULL, null=True, blank=True, related_name='result')
+    session = models.ForeignKey(
+        TrainingSession, on_delete=models.SET_NULL, null=True, blank=True, related_name='match_results'
+    )
+    played_at = models.DateTimeField(default=timezone.now)
+
+    # Ratings before the result and the points that changed hands
+    winner_rating = models.FloatField(editable=False)
+    loser_rating = models.FloatField(editable=False)
+    winner_delta = models.FloatField(editable=False)
+    loser_delta = models.FloatField(editable=False)
+
+    class Meta:
+        ordering = ['played_at', 'id']
+        indexes = [
+            # Replay order
+            models.Index(fields=['played_at', 'id'], name='result_replay_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.winner} d. {self.loser} ({self.played_at:%Y-%m-%d})"
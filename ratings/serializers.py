@@ -0,0 +1,63 @@
+from rest_framework import serializers
+from profiles.models import PlayerProfile
+from tournaments.models import Match
+from training.models import TrainingSession
+from .models import PlayerRating, MatchResult
+
+
+class LeaderboardSerializer(serializers.ModelSerializer):
+    """Expects rows with `rank` set by the leaderboard view."""
+    rank = serializers.ReadOnlyField()
+    player_name = serializers.ReadOnlyField(source='player.user.get_full_name')
+    username = serializers.ReadOnlyField(source='player.user.username')
+    rating = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PlayerRating
+        fields = ['rank', 'player', 'player_name', 'username', 'rating', 'matches_played', 'skill_level']
+
+    def get_rating(self, obj):
+        return round(obj.rating, 1)
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    skill_level = serializers.ChoiceField(choices=PlayerProfile.SKILL_LEVELS, required=False)
+
+
+class MatchResultSerializer(serializers.ModelSerializer):
+    """Record a tournament match (`match`) or a training game (`session`)."""
+    winner = serializers.PrimaryKeyRelatedField(queryset=PlayerProfile.objects.all())
+    loser = serializers.PrimaryKeyRelatedField(queryset=PlayerProfile.objects.all())
+    match = serializers.PrimaryKeyRelatedField(queryset=Match.objects.all(), required=False, allow_null=True)
+    session = serializers.PrimaryKeyRelatedField(
+        queryset=TrainingSession.objects.all(), required=False, allow_null=True
+    )
+    score = serializers.CharField(max_length=50, required=False, allow_blank=True, write_only=True)
+
+    class Meta:
+        model = MatchResult
+        fields = [
+            'id', 'winner', 'loser', 'source', 'match', 'session', 'played_at', 'score',
+            'winner_rating', 'loser_rating', 'winner_delta', 'loser_delta',
+        ]
+        read_only_fields = ['source']
+
+    def validate(self, data):
+        match, session = data.get('match'), data.get('session')
+        players = {data['winner'].pk, data['loser'].pk}
+        if data['winner'] == data['loser']:
+            raise serializers.ValidationError("A player can't beat themselves.")
+        if bool(match) == bool(session):
+            raise serializers.ValidationError("Give either the tournament match or the training session.")
+        if match:
+            if {match.player1_id, match.player2_id} != players:
+                raise serializers.ValidationError({"match": "These players don't meet in this match."})
+            if match.winner_id is not None:
+                raise serializers.ValidationError({"match": "This match already has a result."})
+            data['source'] = 'tournament'
+        else:
+            active = session.sessionparticipant_set.filter(player__in=players, status='active').count()
+            if active != 2:
+                raise serializers.ValidationError({"session": "Both players must take part in this session."})
+            data['source'] = 'training'
+        return data
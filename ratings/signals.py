@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from profiles.models import PlayerProfile
+from .models import PlayerRating
+
+
+# ---------------- Leaderboard skill level ----------------
+@receiver(post_save, sender=PlayerProfile)
+def sync_skill_level(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'skill_level' not in update_fields):
+        return
+    PlayerRating.objects.filter(pk=instance.pk).exclude(skill_level=instance.skill_level).update(
+        skill_level=instance.skill_level
+    )
@@ -0,0 +1,149 @@
+from datetime import date, datetime, timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from profiles.models import PlayerProfile
+from tournaments.brackets import generate_draw
+from tournaments.models import Tournament, TournamentRegistration
+from .elo import INITIAL_RATING, record_result, replay
+from .models import PlayerRating, MatchResult
+
+
+def make_player(username, skill_level='intermediate'):
+    return PlayerProfile.objects.create(
+        user=User.objects.create_user(username=username, password='pass'),
+        date_of_birth=date(2000, 1, 1),
+        skill_level=skill_level,
+        profile_image=None,
+    )
+
+
+class EloTests(APITestCase):
+    def setUp(self):
+        self.players = [make_player(f'p{i}') for i in range(4)]
+
+    def test_recording_a_result_costs_the_same_queries_however_long_the_history(self):
+        a, b, c, d = self.players
+        for _ in range(5):
+            record_result(a, b, 'training')
+        with CaptureQueriesContext(connection) as first:
+            record_result(c, d, 'training')
+        with CaptureQueriesContext(connection) as later:
+            record_result(a, b, 'training')
+        self.assertEqual(len(first), len(later))
+
+        a_rating, b_rating = PlayerRating.objects.get(pk=a.pk), PlayerRating.objects.get(pk=b.pk)
+        self.assertEqual(a_rating.matches_played, 6)
+        self.assertGreater(a_rating.rating, INITIAL_RATING)
+        self.assertAlmostEqual(a_rating.rating + b_rating.rating, 2 * INITIAL_RATING)
+
+    def test_replay_reproduces_the_incremental_ratings(self):
+        a, b, c, d = self.players
+        start = timezone.make_aware(datetime(2030, 1, 1))
+        games = [(a, b), (c, d), (b, c), (a, d), (d, a), (a, c), (b, d)]
+        for hour, (winner, loser) in enumerate(games):
+            record_result(winner, loser, 'training', played_at=start + timedelta(hours=hour))
+        incremental = dict(PlayerRating.objects.values_list('pk', 'rating'))
+
+        PlayerRating.objects.update(rating=INITIAL_RATING, matches_played=0)
+        MatchResult.objects.update(winner_delta=0)
+        players, results_changed = replay()
+        self.assertEqual((players, results_changed), (4, len(games)))
+        for pk, rating in PlayerRating.objects.values_list('pk', 'rating'):
+            self.assertAlmostEqual(rating, incremental[pk])
+
+        # Nothing left to fix on a second run
+        self.assertEqual(replay(), (4, 0))
+
+
+class LeaderboardTests(APITestCase):
+    def setUp(self):
+        self.players = [make_player(f'p{i}', 'advanced' if i < 2 else 'beginner') for i in range(4)]
+        for player, rating in zip(self.players, (1600, 1550, 1600, 1400)):
+            PlayerRating.objects.create(player=player, rating=rating, skill_level=player.skill_level)
+
+    def test_ties_share_a_rank(self):
+        response = self.client.get('/api/ratings/leaderboard/')
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()['results']
+        self.assertEqual([row['rank'] for row in rows], [1, 1, 3, 4])
+        self.assertEqual(rows[0]['player'], self.players[0].pk)
+
+    def test_ranks_continue_across_pages(self):
+        for i in range(4, 12):
+            player = make_player(f'p{i}')
+            PlayerRating.objects.create(player=player, rating=1300 - i, skill_level=player.skill_level)
+        response = self.client.get('/api/ratings/leaderboard/?page=2')
+        self.assertEqual([row['rank'] for row in response.json()['results']], [11, 12])
+
+        first_page = self.client.get('/api/ratings/leaderboard/?cursor=')
+        following = self.client.get(first_page.json()['next'])
+        self.assertEqual([row['rank'] for row in following.json()['results']], [11, 12])
+
+    def test_skill_level_filter(self):
+        response = self.client.get('/api/ratings/leaderboard/?skill_level=beginner')
+        rows = response.json()['results']
+        self.assertEqual([(row['player'], row['rank']) for row in rows], [(self.players[2].pk, 1), (self.players[3].pk, 2)])
+
+
+class MatchResultTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='pass')
+        self.players = [make_player(f'p{i}') for i in range(4)]
+        self.tournament = Tournament.objects.create(
+            name='Club Open', location='Court 1', start_date=date(2030, 6, 1),
+            end_date=date(2030, 6, 3), surface='clay', created_by=self.admin,
+        )
+        for seed, player in enumerate(self.players, start=1):
+            TournamentRegistration.objects.create(tournament=self.tournament, player=player, seed=seed)
+        generate_draw(self.tournament)
+
+    def test_result_updates_ratings_and_advances_the_winner(self):
+        match = self.tournament.matches.get(round=1, position=0)
+        self.client.force_authenticate(self.admin)
+        response = self.client.post('/api/ratings/results/', {
+            'match': match.pk, 'winner': match.player1_id, 'loser': match.player2_id, 'score': '6-4 6-2',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['source'], 'tournament')
+        self.assertEqual(self.tournament.matches.get(round=2).player1_id, match.player1_id)
+        self.assertGreater(PlayerRating.objects.get(pk=match.player1_id).rating, INITIAL_RATING)
+
+        again = self.client.post('/api/ratings/results/', {
+            'match': match.pk, 'winner': match.player1_id, 'loser': match.player2_id,
+        })
+        self.assertEqual(again.status_code, 400)
+
+    def test_concurrent_results_for_one_match(self):
+        match = self.tournament.matches.get(round=1, position=0)
+        winner = PlayerProfile.objects.get(pk=match.player1_id)
+        loser = PlayerProfile.objects.get(pk=match.player2_id)
+
+        class Interleaved:
+            """Commit a competing result after this request has validated its own."""
+            @staticmethod
+            def atomic():
+                record_result(winner, loser, 'tournament', match=match)
+                type(match).objects.filter(pk=match.pk).update(winner=winner)
+                return transaction.atomic()
+
+        self.client.force_authenticate(self.admin)
+        with mock.patch('ratings.views.transaction', Interleaved):
+            response = self.client.post('/api/ratings/results/', {
+                'match': match.pk, 'winner': loser.pk, 'loser': winner.pk,
+            })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(MatchResult.objects.count(), 1)
+
+    def test_players_must_meet_in_the_match(self):
+        match = self.tournament.matches.get(round=1, position=0)
+        outsider = next(p for p in self.players if p.pk not in (match.player1_id, match.player2_id))
+        self.client.force_authenticate(self.admin)
+        response = self.client.post('/api/ratings/results/', {
+            'match': match.pk, 'winner': match.player1_id, 'loser': outsider.pk,
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MatchResult.objects.exists())
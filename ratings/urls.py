@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('leaderboard/', views.Leaderboard.as_view()),
+    path('results/', views.MatchResultCreate.as_view()),
+]
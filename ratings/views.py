@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models import Count, Q
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from tournaments.brackets import advance_winner
+from tournaments.models import Match
+from .elo import record_result
+from .models import PlayerRating, MatchResult
+from .serializers import LeaderboardSerializer, LeaderboardQuerySerializer, MatchResultSerializer
+
+
+def assign_ranks(queryset, page):
+    """
+    Set competition ranks (1, 2, 2, 4) on a page of the leaderboard. One
+    count over the rating index places the first row; the rest follow.
+    """
+    if not page:
+        return
+    first = page[0]
+    counts = queryset.order_by().filter(rating__gte=first.rating).aggregate(
+        above=Count('pk', filter=Q(rating__gt=first.rating)),
+        tied_before=Count('pk', filter=Q(rating=first.rating, player_id__lt=first.player_id)),
+    )
+    position = counts['above'] + counts['tied_before'] + 1
+    rank = counts['above'] + 1
+    for offset, row in enumerate(page):
+        if offset and row.rating != page[offset - 1].rating:
+            rank = position + offset
+        row.rank = rank
+
+
+class Leaderboard(generics.ListAPIView):
+    """
+    Players by rating, optionally for one ?skill_level=. Pages are read in
+    index order, never sorted on request; use ?cursor= for deep pages.
+    """
+    serializer_class = LeaderboardSerializer
+    # Opt-in keyset pagination with ?cursor=
+    cursor_ordering = ('-rating', 'player_id')
+
+    def get_queryset(self):
+        params = LeaderboardQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        ratings = PlayerRating.objects.select_related('player__user')
+        if params.validated_data.get('skill_level'):
+            ratings = ratings.filter(skill_level=params.validated_data['skill_level'])
+        return ratings.order_by(*self.cursor_ordering)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        assign_ranks(queryset, page)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class MatchResultCreate(generics.CreateAPIView):
+    """Record a result and update both players' ratings (staff only)."""
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = MatchResultSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        match = data.get('match')
+
+        with transaction.atomic():
+            if match is not None:
+                # Checked again under the lock: a concurrent post may have won
+                match = Match.objects.select_for_update().get(pk=match.pk)
+                if match.winner_id is not None or MatchResult.objects.filter(match=match).exists():
+                    return Response({"match": ["This match already has a result."]},
+                                    status=status.HTTP_400_BAD_REQUEST)
+            result = record_result(
+                data['winner'], data['loser'], data['source'],
+                match=match, session=data.get('session'), played_at=data.get('played_at'),
+            )
+            if match is not None:
+                match.winner = data['winner']
+                match.score = data.get('score', '')
+                match.save(update_fields=['winner', 'score'])
+                if match.tournament.draw_format == 'single_elimination':
+                    advance_winner(match)
+
+        return Response(self.get_serializer(result).data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,140 @@
+"""
+Versioned response caching and conditional GET for read-heavy API endpoints.
+
+Cached responses live under a per-namespace version token. Model signals
+call invalidate() to swap the token, which orphans every cached page of
+that namespace at once; orphaned entries simply expire.
+
+Each cached page also keeps its validators: an ETag (a digest of the page
+data) and a Last-Modified date (the newest `updated_at` among its rows, or
+the last invalidation if that is later). Clients repeating a request with
+If-None-Match get a 304 straight from the cache. Last-Modified is sent for
+information only: with one-second resolution it can't tell apart two
+changes within the same second, so If-Modified-Since alone never gets a 304.
+
+Namespaces whose pages show user fields (names, emails) register with
+invalidate_on_user_change() and are all invalidated by one User receiver.
+
+The backend is whatever CACHES['default'] is configured to be.
+"""
+import hashlib
+import json
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def namespace_state(namespace):
+    """(version token, time of the last invalidation) of a namespace."""
+    key = f'{namespace}:version'
+    state = cache.get(key)
+    if state is None:
+        state = (uuid.uuid4().hex, time.time())
+        cache.add(key, state, timeout=None)
+        state = cache.get(key) or state
+    return state
+
+
+def namespace_version(namespace):
+    return namespace_state(namespace)[0]
+
+
+def invalidate(*namespaces):
+    for namespace in namespaces:
+        cache.set(f'{namespace}:version', (uuid.uuid4().hex, time.time()), timeout=None)
+
+
+# Namespaces invalidated whenever a user changes
+_user_namespaces = set()
+
+
+def invalidate_on_user_change(*namespaces):
+    _user_namespaces.update(namespaces)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_namespaces(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached page shows
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate(*_user_namespaces)
+
+
+def response_cache_key(namespace, request):
+    """Key on host, path and the sorted query parameters."""
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw = f'{request.get_host()}{request.path}?{params}'
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'{namespace}:{namespace_version(namespace)}:{digest}'
+
+
+def data_etag(data):
+    raw = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+class CachedResponseMixin:
+    """
+    Serve GET responses from the cache and answer If-None-Match with 304.
+    Views set `cache_namespace` and invalidate it from model signals whenever
+    the underlying data changes. Only use on views whose response doesn't
+    depend on the requesting user (or opt those requests out in is_cacheable).
+    """
+    cache_namespace = None
+    cache_timeout = 60 * 15
+    # Rows' modification time, aggregated into Last-Modified (None to skip)
+    last_modified_field = 'updated_at'
+
+    def is_cacheable(self):
+        return True
+
+    def get_last_modified(self):
+        """Newest last_modified_field among the rows this request shows."""
+        if self.last_modified_field is None:
+            return None
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset.aggregate(last_modified=Max(self.last_modified_field))['last_modified']
+
+    def get(self, request, *args, **kwargs):
+        if not self.is_cacheable():
+            return super().get(request, *args, **kwargs)
+
+        key = response_cache_key(self.cache_namespace, request)
+        entry = cache.get(key)
+        if entry is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            changed_at = namespace_state(self.cache_namespace)[1]
+            rows_changed_at = self.get_last_modified()
+            if rows_changed_at is not None:
+                changed_at = max(changed_at, rows_changed_at.timestamp())
+            entry = {
+                'data': response.data,
+                'etag': data_etag(response.data),
+                'last_modified': int(changed_at),
+            }
+            cache.set(key, entry, self.cache_timeout)
+        else:
+            response = Response(entry['data'])
+
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        # Let clients keep the page, but revalidate it on every use
+        patch_cache_control(response, no_cache=True)
+        return get_conditional_response(request, etag=entry['etag'], response=response)
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class SnapshotModel(models.Model):
+    """
+    A model that remembers what its row held when last read from or written
+    to the database, and never writes back the fields kept up to date
+    elsewhere (F() counters, background jobs).
+
+    Subclasses record their snapshot in take_snapshot(), as _loaded_*
+    attributes, and list the fields maintained elsewhere in MAINTAINED_FIELDS.
+    """
+    MAINTAINED_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.take_snapshot()
+        return instance
+
+    def take_snapshot(self):
+        pass
+
+    def save(self, *args, **kwargs):
+        if self.MAINTAINED_FIELDS and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        self.take_snapshot()
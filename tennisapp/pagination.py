@@ -0,0 +1,130 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination:
+    """
+    Keyset ("cursor") pagination over a view's natural ordering.
+
+    The cursor holds the ordering values of the last row on the page, so the
+    next page is a single index range scan (no COUNT, no OFFSET) as long as
+    a composite index matches the ordering. The ordering must end in a
+    unique field, normally the id, to break ties.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+
+    def __init__(self, ordering, page_size=None):
+        self.ordering = ordering
+        if page_size:
+            self.page_size = page_size
+
+    def encode_cursor(self, obj, reverse=False):
+        """Cursor for the rows after obj, or before it when reverse is set."""
+        values = [getattr(obj, field.lstrip('-')) for field in self.ordering]
+        # str() keeps full datetime precision, unlike DjangoJSONEncoder
+        raw = json.dumps({'before' if reverse else 'after': values}, default=str)
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """(values, reverse) from a cursor; NotFound if it is malformed."""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor")
+        if not isinstance(payload, dict) or len(payload) != 1:
+            raise NotFound("Invalid cursor")
+        (direction, values), = payload.items()
+        if direction not in ('after', 'before') or not isinstance(values, list) \
+                or len(values) != len(self.ordering):
+            raise NotFound("Invalid cursor")
+        return values, direction == 'before'
+
+    def after(self, values, reverse=False):
+        """
+        Rows strictly after `values` in the ordering (before them when
+        reverse is set), as a lexicographic Q.
+        """
+        clauses = []
+        for position, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            equal = {f.lstrip('-'): v for f, v in zip(self.ordering[:position], values)}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': values[position]}))
+        return reduce(or_, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            try:
+                queryset = queryset.filter(self.after(values, reverse))
+            except (ValidationError, TypeError, ValueError):
+                # Well-formed, but the values don't fit the ordering fields
+                raise NotFound("Invalid cursor")
+        if reverse:
+            queryset = queryset.reverse()
+
+        page = list(queryset[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, bool(cursor)
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[0], reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; keyset pagination when the request
+    opts in with a `cursor` parameter (`?cursor=` for the first page).
+
+    Views using this class declare `cursor_ordering`, e.g.
+    ('-date', '-start_time', '-id').
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering and KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination(ordering, page_size=self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
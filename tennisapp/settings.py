@@ -66,6 +66,7 @@ INSTALLED_APPS = [
     'profiles',
     'training',
     'tournaments',
+    'ratings',
 ]
 
 SITE_ID = 1
@@ -159,6 +160,20 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
+# Profile image thumbnails (profiles/thumbnails.py), rendered by a thread pool
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))
+THUMBNAILS_ASYNC = True
+
+# Response cache (tennisapp/cache.py). Local memory is per process, so with
+# several workers point CACHE_BACKEND/CACHE_LOCATION at a shared backend,
+# e.g. django.core.cache.backends.filebased.FileBasedCache and a directory.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'tennisapp'),
+    }
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -170,7 +185,7 @@ REST_FRAMEWORK = {
         else 'dj_rest_auth.jwt_auth.JWTCookieAuthentication'
     )],
     'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.PageNumberPagination',
+        'tennisapp.pagination.OptionalCursorPagination',
     'PAGE_SIZE': 10,
     'DATETIME_FORMAT': '%d %b %Y',
 }
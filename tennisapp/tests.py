@@ -0,0 +1,141 @@
+import base64
+import json
+from datetime import date, time, timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from profiles.signals import COACH_DIRECTORY_CACHE, PLAYER_PROFILES_CACHE
+from profiles.models import PlayerProfile
+from tennisapp.cache import namespace_version
+from tournaments.models import Tournament, TournamentRegistration
+from tournaments.signals import TOURNAMENTS_CACHE
+from training.models import TennisCourt, TrainingSession
+
+
+class MeDashboardTests(APITestCase):
+    """The dashboard costs a fixed number of queries."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='player', password='pass')
+        self.player = PlayerProfile.objects.create(
+            user=self.user, date_of_birth=date(2000, 1, 1), skill_level='intermediate', profile_image=None,
+        )
+        self.client.force_authenticate(self.user)
+        self.court = TennisCourt.objects.create(name='Court 1')
+        self.next_slot = 8
+
+    def add_data(self, sessions, tournaments):
+        day = date.today() + timedelta(days=7)
+        for _ in range(sessions):
+            session = TrainingSession.objects.create(
+                court=self.court, date=day, start_time=time(self.next_slot, 0), focus_area='Serve', intensity=5,
+            )
+            session.add_player(self.player)
+            self.next_slot += 1
+        for i in range(tournaments):
+            tournament = Tournament.objects.create(
+                name=f'Open {i}', location='Club', start_date=day, end_date=day,
+                surface='hard', created_by=User.objects.create_user(username=f'organiser{self.next_slot}{i}'),
+            )
+            TournamentRegistration.objects.create(tournament=tournament, player=self.player)
+
+    def fetch(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/me/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_query_count_is_independent_of_data(self):
+        self.add_data(sessions=1, tournaments=1)
+        small, _ = self.fetch()
+
+        self.add_data(sessions=6, tournaments=3)
+        large, data = self.fetch()
+
+        self.assertEqual(small, large)
+        self.assertEqual(data['profile']['id'], self.player.pk)
+        self.assertEqual(len(data['upcoming_sessions']), 5)
+        self.assertEqual(data['upcoming_sessions'][0]['participant_summary']['active_count'], 1)
+        self.assertEqual(len(data['tournament_registrations']), 4)
+
+
+class KeysetPaginationTests(APITestCase):
+    """?cursor= pages walk the feed in both directions and reject bad cursors."""
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='staff', password='pass', is_staff=True))
+        court = TennisCourt.objects.create(name='Court 1')
+        day = date.today() + timedelta(days=7)
+        for offset in range(2):
+            for hour in range(8, 20):
+                TrainingSession.objects.create(
+                    court=court, date=day + timedelta(days=offset), start_time=time(hour, 0),
+                    focus_area='Serve', intensity=5,
+                )
+        self.expected = list(
+            TrainingSession.objects.order_by('-date', '-start_time', '-id').values_list('pk', flat=True)
+        )
+
+    def page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return [row['id'] for row in data['results']], data
+
+    def test_pages_forward_and_back(self):
+        pages, url = [], '/api/training/?cursor='
+        while url:
+            ids, data = self.page(url)
+            pages.append((ids, data))
+            url = data['next']
+        self.assertEqual([pk for ids, _ in pages for pk in ids], self.expected)
+        self.assertEqual([len(ids) for ids, _ in pages], [10, 10, 4])
+        self.assertIsNone(pages[0][1]['previous'])
+
+        ids, data = self.page(pages[2][1]['previous'])
+        self.assertEqual(ids, pages[1][0])
+        ids, data = self.page(data['previous'])
+        self.assertEqual(ids, pages[0][0])
+        self.assertIsNone(data['previous'])
+        self.assertEqual(self.page(data['next'])[0], pages[1][0])
+
+    def test_invalid_cursors_are_not_found(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        for cursor in [
+            'not-a-cursor',
+            encode(['2030-01-01', '10:00:00', 1]),
+            encode({'after': ['2030-01-01', '10:00:00']}),
+            encode({'sideways': ['2030-01-01', '10:00:00', 1]}),
+            encode({'after': ['yesterday', '10:00:00', 1]}),
+            encode({'before': ['2030-01-01', 'noon', 'x']}),
+            encode({'after': ['2030-01-01', '10:00:00', {'id': 1}]}),
+        ]:
+            response = self.client.get(f'/api/training/?cursor={cursor}')
+            self.assertEqual(response.status_code, 404, cursor)
+
+
+class UserInvalidationTests(APITestCase):
+    """One User receiver invalidates every namespace that shows user fields."""
+
+    NAMESPACES = [COACH_DIRECTORY_CACHE, PLAYER_PROFILES_CACHE, TOURNAMENTS_CACHE]
+
+    def versions(self):
+        return [namespace_version(namespace) for namespace in self.NAMESPACES]
+
+    def test_user_changes_invalidate_all_namespaces(self):
+        user = User.objects.create_user(username='player')
+        before = self.versions()
+        user.first_name = 'Ana'
+        user.save()
+        after = self.versions()
+        for old, new in zip(before, after):
+            self.assertNotEqual(old, new)
+
+    def test_logins_leave_namespaces_alone(self):
+        user = User.objects.create_user(username='player')
+        before = self.versions()
+        user.save(update_fields=['last_login'])
+        self.assertEqual(self.versions(), before)
@@ -17,7 +17,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from .views import root_route
+from .views import root_route, MeDashboard
 
 
 urlpatterns = [
@@ -28,6 +28,8 @@ urlpatterns = [
     path('api/profiles/', include('profiles.urls')),
     path('api/training/', include('training.urls')),
     path('api/tournaments/', include('tournaments.urls')),
+    path('api/ratings/', include('ratings.urls')),
+    path('api/me/dashboard/', MeDashboard.as_view()),
 ]
 
 if settings.DEBUG:
@@ -1,5 +1,14 @@
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import generics, permissions, serializers
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from profiles.models import PlayerProfile
+from profiles.serializers import PlayerProfileSerializer
+from tournaments.models import TournamentRegistration
+from tournaments.serializers import PlayerRegistrationSerializer
+from training.models import TrainingSession
+from training.serializers import TrainingSessionSummarySerializer
 
 @api_view(['GET'])
 def root_route(request):
@@ -9,6 +18,48 @@ def root_route(request):
             "profiles": "/api/profiles/",
             "training": "/api/training/",
             "tournaments": "/api/tournaments/",
+            "leaderboard": "/api/ratings/leaderboard/",
+            "dashboard": "/api/me/dashboard/",
             "authentication": "/api/auth/",
         }
-    })
\ No newline at end of file
+    })
+
+
+class DashboardQuerySerializer(serializers.Serializer):
+    sessions = serializers.IntegerField(min_value=1, max_value=20, default=5)
+
+
+class MeDashboard(generics.GenericAPIView):
+    """
+    Everything the home screen needs in one request: the player's profile,
+    their next ?sessions= (default 5) training sessions and their
+    registrations for tournaments that haven't finished. Costs three queries
+    on top of authentication, whatever the amount of data.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = DashboardQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        player = get_object_or_404(PlayerProfile.objects.select_related('user').with_age(), user=request.user)
+        sessions = (
+            TrainingSession.objects.upcoming()
+            .filter(sessionparticipant__player=player, sessionparticipant__status='active')
+            .exclude(status='canceled')
+            .select_related('court')
+            .order_by('start_at', 'id')[:params.validated_data['sessions']]
+        )
+        registrations = (
+            TournamentRegistration.objects.filter(player=player, tournament__end_date__gte=timezone.localdate())
+            .select_related('tournament__created_by')
+            .order_by('tournament__start_date', 'id')
+        )
+
+        context = self.get_serializer_context()
+        return Response({
+            "profile": PlayerProfileSerializer(player, context=context).data,
+            "upcoming_sessions": TrainingSessionSummarySerializer(sessions, many=True, context=context).data,
+            "tournament_registrations": PlayerRegistrationSerializer(registrations, many=True, context=context).data,
+        })
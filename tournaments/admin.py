@@ -1,17 +1,30 @@
-from django.contrib import admin
-from .models import Tournament, TournamentRegistration
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from .brackets import generate_draw
+from .models import Tournament, TournamentRegistration, Match
 
 # Register your models here.
 @admin.register(Tournament)
 class TournamentAdmin(admin.ModelAdmin):
-    list_display = ["name", "location", "start_date", "end_date", "surface", "created_by", "created_at"]
+    list_display = ["name", "location", "start_date", "end_date", "surface", "registrations_count", "created_by", "created_at"]
     list_filter = ['start_date']
     search_fields = ['title']
     date_hierarchy = 'start_date'
+    actions = ['generate_draws']
+
+    @admin.action(description="Generate the draw from registrations and seeds")
+    def generate_draws(self, request, queryset):
+        for tournament in queryset:
+            try:
+                matches = generate_draw(tournament)
+            except ValidationError as exc:
+                self.message_user(request, f"{tournament}: {' '.join(exc.messages)}", messages.ERROR)
+            else:
+                self.message_user(request, f"{tournament}: {len(matches)} match(es) drawn.")
 
 @admin.register(TournamentRegistration)
 class TournamentRegistrationAdmin(admin.ModelAdmin):
-    list_display = ("player", "tournament", "registration_date")
+    list_display = ("player", "tournament", "seed", "registration_date")
     list_filter = ("tournament", "registration_date")
     search_fields = ("player__user__username", "tournament__name")
     
@@ -21,4 +34,11 @@ class TournamentRegistrationAdmin(admin.ModelAdmin):
         elif hasattr(obj, 'tournament') and obj.tournament:
             return obj.tournament.title
         return "No event"
-    get_event.short_description = 'Event'
\ No newline at end of file
+    get_event.short_description = 'Event'
+
+
+@admin.register(Match)
+class MatchAdmin(admin.ModelAdmin):
+    list_display = ("tournament", "round", "position", "player1", "player2", "court", "scheduled_at", "duration_hours", "winner", "score")
+    list_filter = ("tournament", "court")
+    list_select_related = ("tournament", "player1__user", "player2__user", "winner__user", "court")
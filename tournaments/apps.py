@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TournmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tournaments'
+
+    def ready(self):
+        from . import signals  # noqa: F401
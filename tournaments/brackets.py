@@ -0,0 +1,115 @@
+"""
+Tournament draws.
+
+A draw is built from the tournament's registrations: seeded players in seed
+order, then the unseeded players in random order. The format builds unsaved
+Match rows from that ranking in memory and they are inserted with a single
+bulk_create, so even a 256-player draw is a handful of queries.
+"""
+import random
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from .models import Match
+
+
+def bracket_order(size):
+    """Seed numbers in draw-line order for a bracket of `size` (a power of two),
+    e.g. 8 -> [1, 8, 4, 5, 2, 7, 3, 6], so the top seeds can only meet late."""
+    order = [1]
+    while len(order) < size:
+        total = len(order) * 2 + 1
+        order = [seed for top in order for seed in (top, total - top)]
+    return order
+
+
+def next_match(round, position):
+    """Where the winner of (round, position) plays next: (round, position, slot)."""
+    return round + 1, position // 2, position % 2
+
+
+def advance_winner(match):
+    """Enter the winner of a knockout match into their next match, if there is one."""
+    round, position, slot = next_match(match.round, match.position)
+    Match.objects.filter(tournament_id=match.tournament_id, round=round, position=position).update(
+        **{'player1' if slot == 0 else 'player2': match.winner_id}
+    )
+
+
+def single_elimination(tournament_id, players):
+    """
+    Matches for a knockout draw of `players` (ranked, best first). The
+    bracket is the next power of two; the missing lines are byes, which the
+    top seeds receive.
+    """
+    size = 1 << (len(players) - 1).bit_length()
+    rounds = size.bit_length() - 1
+    lines = [players[seed - 1] if seed <= len(players) else None for seed in bracket_order(size)]
+
+    matches, byes = [], {}
+    for position in range(size // 2):
+        first, second = lines[2 * position], lines[2 * position + 1]
+        if first is None or second is None:
+            byes[position] = first or second
+        else:
+            matches.append(Match(
+                tournament_id=tournament_id, round=1, position=position,
+                player1_id=first, player2_id=second,
+            ))
+    for round in range(2, rounds + 1):
+        for position in range(size >> round):
+            match = Match(tournament_id=tournament_id, round=round, position=position)
+            if round == 2:
+                match.player1_id = byes.get(2 * position)
+                match.player2_id = byes.get(2 * position + 1)
+            matches.append(match)
+    return matches
+
+
+def round_robin(tournament_id, players):
+    """Every player meets every other once, scheduled into rounds with the circle method."""
+    lineup = list(players) + ([None] if len(players) % 2 else [])
+    size = len(lineup)
+    matches = []
+    for round in range(1, size):
+        for position in range(size // 2):
+            first, second = lineup[position], lineup[size - 1 - position]
+            if first is not None and second is not None:
+                matches.append(Match(
+                    tournament_id=tournament_id, round=round, position=position,
+                    player1_id=first, player2_id=second,
+                ))
+        # Keep the first player in place and rotate everybody else
+        lineup.insert(1, lineup.pop())
+    return matches
+
+
+FORMATS = {
+    'single_elimination': single_elimination,
+    'round_robin': round_robin,
+}
+
+
+def ranked_players(tournament, rng=None):
+    """Player ids: seeds in order, then the unseeded players shuffled."""
+    registrations = tournament.registrations.order_by(
+        F('seed').asc(nulls_last=True), 'id'
+    ).values_list('player_id', 'seed')
+    seeded, unseeded = [], []
+    for player_id, seed in registrations:
+        (unseeded if seed is None else seeded).append(player_id)
+    (rng or random).shuffle(unseeded)
+    return seeded + unseeded
+
+
+def generate_draw(tournament, draw_format=None, rng=None):
+    """Replace the tournament's draw with a fresh one. Returns the created matches."""
+    build = FORMATS[draw_format or tournament.draw_format]
+    with transaction.atomic():
+        if tournament.matches.exclude(winner=None).exists():
+            raise ValidationError("The draw already has results and can no longer be regenerated.")
+        players = ranked_players(tournament, rng)
+        if len(players) < 2:
+            raise ValidationError("A draw needs at least two registered players.")
+        tournament.matches.all().delete()
+        return Match.objects.bulk_create(build(tournament.pk, players), batch_size=500)
@@ -0,0 +1,152 @@
+"""
+Bulk registration import from CSV entry lists.
+
+Rows are read one at a time and handled in batches: each batch resolves its
+players with at most three queries (by player_id, username and email),
+drops players who are already entered with a lookup in one in-memory set
+of the tournament's entrants, and inserts the rest with bulk_create. Memory
+use depends on the batch size and the tournament's entry list, not on the
+size of the file.
+
+Columns: one of player_id, username or email identifies the player; seed
+is optional.
+"""
+import csv
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from profiles.models import PlayerProfile
+from tennisapp.cache import invalidate
+from .models import Tournament, TournamentRegistration
+from .signals import TOURNAMENTS_CACHE
+
+BATCH_SIZE = 500
+IDENTIFIER_COLUMNS = ('player_id', 'username', 'email')
+# Keep the report small for badly broken files; error_count has the total
+MAX_REPORTED_ERRORS = 1000
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def row_key(row):
+    """(column, value) of the first identifier the row fills in, or None."""
+    for column in IDENTIFIER_COLUMNS:
+        value = (row.get(column) or '').strip()
+        if value:
+            return column, value.lower() if column == 'email' else value
+    return None
+
+
+def resolve_players(rows):
+    """Map row keys to player ids, with one query per identifier column in use."""
+    wanted = {column: set() for column in IDENTIFIER_COLUMNS}
+    for _, row in rows:
+        key = row_key(row)
+        if key is not None:
+            wanted[key[0]].add(key[1])
+
+    found = {}
+    ids = {value for value in wanted['player_id'] if value.isdigit()}
+    if ids:
+        for pk in PlayerProfile.objects.filter(pk__in=ids).values_list('pk', flat=True):
+            found['player_id', str(pk)] = pk
+    if wanted['username']:
+        players = PlayerProfile.objects.filter(user__username__in=wanted['username'])
+        for username, pk in players.values_list('user__username', 'pk'):
+            found['username', username] = pk
+    if wanted['email']:
+        players = PlayerProfile.objects.annotate(email=Lower('user__email')).filter(email__in=wanted['email'])
+        for email, pk in players.values_list('email', 'pk'):
+            # Several accounts can share an address; those rows are ambiguous
+            found['email', email] = None if ('email', email) in found else pk
+    return found
+
+
+def import_registrations(tournament, lines, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Register the players listed in CSV `lines` (any iterable of text lines,
+    e.g. an open file) for `tournament`. Returns a report with the number of
+    created registrations, skipped duplicates and the errors per row.
+
+    Batches are committed as they go: a file that stops decoding part way
+    keeps the rows before that point and reports where it stopped.
+    """
+    reader = csv.DictReader(lines)
+    columns = {(name or '').strip() for name in reader.fieldnames or []}
+    if not columns & set(IDENTIFIER_COLUMNS):
+        raise ValidationError(f"The file needs one of these columns: {', '.join(IDENTIFIER_COLUMNS)}.")
+
+    entered = set(tournament.registrations.values_list('player_id', flat=True))
+    report = {'created': 0, 'duplicates': 0, 'error_count': 0, 'errors': []}
+
+    def error(line, message):
+        report['error_count'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'row': line, 'error': message})
+
+    # Row numbers as in a spreadsheet: the header is row 1
+    rows = ((line, {(k or '').strip(): v for k, v in row.items()}) for line, row in enumerate(reader, start=2))
+    try:
+        for batch in batches(rows, batch_size):
+            players = resolve_players(batch)
+            new = []
+            for line, row in batch:
+                key = row_key(row)
+                if key is None:
+                    error(line, "No player_id, username or email given.")
+                    continue
+                if key not in players:
+                    error(line, f"No player with {key[0]} '{key[1]}'.")
+                    continue
+                if players[key] is None:
+                    error(line, f"Several players have the email '{key[1]}'.")
+                    continue
+
+                seed = (row.get('seed') or '').strip()
+                if seed and not (seed.isdigit() and int(seed) > 0):
+                    error(line, f"Invalid seed '{seed}'.")
+                    continue
+
+                player_id = players[key]
+                if player_id in entered:
+                    report['duplicates'] += 1
+                    continue
+                entered.add(player_id)
+                new.append((line, TournamentRegistration(
+                    tournament=tournament, player_id=player_id, seed=int(seed) if seed else None,
+                )))
+
+            if dry_run or not new:
+                report['created'] += len(new)
+                continue
+            try:
+                with transaction.atomic():
+                    TournamentRegistration.objects.bulk_create([registration for _, registration in new])
+                    Tournament.adjust_registrations(tournament.pk, len(new))
+            except IntegrityError:
+                # Someone registered concurrently; find the clashing rows one by one
+                for line, registration in new:
+                    try:
+                        with transaction.atomic():
+                            registration.save()
+                    except IntegrityError:
+                        error(line, "The player was registered by someone else during the import.")
+                    else:
+                        report['created'] += 1
+            else:
+                report['created'] += len(new)
+    except UnicodeDecodeError:
+        # Earlier batches are already in; report how far the import got
+        error(reader.line_num + 1, "The file is not UTF-8 encoded from here on; the remaining rows were not read.")
+    finally:
+        if report['created'] and not dry_run:
+            invalidate(TOURNAMENTS_CACHE)
+    return report
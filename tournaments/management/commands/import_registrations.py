@@ -0,0 +1,33 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from tournaments.imports import import_registrations
+from tournaments.models import Tournament
+
+
+class Command(BaseCommand):
+    help = "Register players for a tournament from a CSV entry list (player_id, username or email; optional seed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('tournament_id', type=int)
+        parser.add_argument('csv_file')
+        parser.add_argument('--dry-run', action='store_true', help="Validate the file without registering anyone.")
+
+    def handle(self, *args, **options):
+        try:
+            tournament = Tournament.objects.get(pk=options['tournament_id'])
+        except Tournament.DoesNotExist:
+            raise CommandError(f"Tournament {options['tournament_id']} does not exist.")
+
+        try:
+            with open(options['csv_file'], encoding='utf-8-sig', newline='') as lines:
+                report = import_registrations(tournament, lines, dry_run=options['dry_run'])
+        except (OSError, ValidationError) as exc:
+            raise CommandError(exc)
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['error']}")
+        verb = "would be created" if options['dry_run'] else "created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} registration(s) {verb}, {report['duplicates']} duplicate(s) skipped, "
+            f"{report['error_count']} error(s)."
+        ))
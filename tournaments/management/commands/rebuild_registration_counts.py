@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from tennisapp.cache import invalidate
+from tournaments.models import Tournament, TournamentRegistration
+from tournaments.signals import TOURNAMENTS_CACHE
+
+
+def registration_count():
+    counts = (
+        TournamentRegistration.objects
+        .filter(tournament=OuterRef('pk'))
+        .order_by()
+        .values('tournament')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = "Recompute Tournament.registrations_count from registration rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report tournaments whose counter has drifted.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted_ids = list(
+                Tournament.objects
+                .annotate(real_count=registration_count())
+                .exclude(registrations_count=F('real_count'))
+                .values_list('pk', flat=True)
+            )
+            if drifted_ids and not options['dry_run']:
+                Tournament.objects.filter(pk__in=drifted_ids).update(registrations_count=registration_count())
+        # update() sends no signals, so the cached lists would keep the old counts
+        if drifted_ids and not options['dry_run']:
+            invalidate(TOURNAMENTS_CACHE)
+
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted_ids)} tournament(s) with drifted counts {verb}."))
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0002_remove_tournamentregistration_seed'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='tournament',
+            options={'ordering': ['-start_date', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='tournament',
+            index=models.Index(fields=['-start_date', '-id'], name='tournament_feed_idx'),
+        ),
+    ]
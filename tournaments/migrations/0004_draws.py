@@ -0,0 +1,43 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_profile_thumbnails'),
+        ('tournaments', '0003_tournament_feed_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='draw_format',
+            field=models.CharField(choices=[('single_elimination', 'Single elimination'), ('round_robin', 'Round robin')], default='single_elimination', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='tournamentregistration',
+            name='seed',
+            field=models.PositiveIntegerField(blank=True, help_text='1 for the top seed; leave empty for unseeded players', null=True),
+        ),
+        migrations.CreateModel(
+            name='Match',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round', models.PositiveSmallIntegerField()),
+                ('position', models.PositiveSmallIntegerField()),
+                ('score', models.CharField(blank=True, max_length=50)),
+                ('player1', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='profiles.playerprofile')),
+                ('player2', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='profiles.playerprofile')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='tournaments.tournament')),
+                ('winner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='profiles.playerprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Matches',
+                'ordering': ['tournament', 'round', 'position'],
+                'unique_together': {('tournament', 'round', 'position')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:00
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_registrations(apps, schema_editor):
+    Tournament = apps.get_model('tournaments', 'Tournament')
+    TournamentRegistration = apps.get_model('tournaments', 'TournamentRegistration')
+    rows = TournamentRegistration.objects.order_by().values('tournament').annotate(total=Count('id'))
+    for row in rows:
+        Tournament.objects.filter(pk=row['tournament']).update(registrations_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0004_draws'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='registrations_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_registrations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tournament',
+            index=models.Index(fields=['start_date', 'registrations_count'], name='tournament_entries_idx'),
+        ),
+    ]
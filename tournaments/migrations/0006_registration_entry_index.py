@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0005_tournament_registrations_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tournamentregistration',
+            index=models.Index(fields=['tournament', 'registration_date', 'id'], name='registration_entry_idx'),
+        ),
+    ]
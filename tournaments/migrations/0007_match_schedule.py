@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0012_courtusage'),
+        ('tournaments', '0006_registration_entry_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='court',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='matches', to='training.tenniscourt'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='scheduled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['court', 'scheduled_at'], name='match_court_schedule_idx'),
+        ),
+    ]
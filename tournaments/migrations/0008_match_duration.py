@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0007_match_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='duration_hours',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,35 +1,137 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
+from django.utils import timezone
 from profiles.models import PlayerProfile
+from tennisapp.models import SnapshotModel
+from training.models import TennisCourt
 
 # Create your models here.
-class Tournament(models.Model):
+class TournamentQuerySet(models.QuerySet):
+    def open_for_entries(self, today=None):
+        """Tournaments that haven't started yet."""
+        return self.filter(start_date__gt=today or timezone.localdate())
+
+    def started(self, today=None):
+        return self.filter(start_date__lte=today or timezone.localdate())
+
+
+class Tournament(SnapshotModel):
     SURFACE_TYPES = [
         ('clay', 'Clay'),
         ('grass', 'Grass'),
         ('hard', 'Hard Court'),
         ('carpet', 'Carpet'),
     ]
+
+    DRAW_FORMATS = [
+        ('single_elimination', 'Single elimination'),
+        ('round_robin', 'Round robin'),
+    ]
     
     name = models.CharField(max_length=200)
     location = models.CharField(max_length=200)
     start_date = models.DateField()
     end_date = models.DateField()
     surface = models.CharField(max_length=10, choices=SURFACE_TYPES)
+    draw_format = models.CharField(max_length=20, choices=DRAW_FORMATS, default='single_elimination')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tournaments')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Kept in step by TournamentRegistration
+    registrations_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Maintained with F() updates, never written back from a stale instance
+    MAINTAINED_FIELDS = ('registrations_count',)
+
+    objects = TournamentQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-start_date', '-id']
+        indexes = [
+            # Feed ordering, so keyset pages are index range scans
+            models.Index(fields=['-start_date', '-id'], name='tournament_feed_idx'),
+            # "Open tournaments with fewer than N entrants"
+            models.Index(fields=['start_date', 'registrations_count'], name='tournament_entries_idx'),
+        ]
+
+    @classmethod
+    def adjust_registrations(cls, tournament_id, delta):
+        cls.objects.filter(pk=tournament_id).update(registrations_count=F('registrations_count') + delta)
     
     def __str__(self):
         return self.name
 
-class TournamentRegistration(models.Model):
+class TournamentRegistrationQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Join the player with their user and the tournament, in entry order."""
+        return self.select_related('player__user', 'tournament').order_by('registration_date', 'id')
+
+
+class TournamentRegistration(SnapshotModel):
     player = models.ForeignKey(PlayerProfile, on_delete=models.CASCADE, related_name='tournament_registrations')
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='registrations')
     registration_date = models.DateTimeField(auto_now_add=True)
+    seed = models.PositiveIntegerField(blank=True, null=True, help_text="1 for the top seed; leave empty for unseeded players")
     
+    # Tournament as last read from / written to the database
+    _loaded_tournament_id = None
+
+    objects = TournamentRegistrationQuerySet.as_manager()
+
     class Meta:
         unique_together = ['player', 'tournament']
+        indexes = [
+            # Entry list ordering, so keyset pages are index range scans
+            models.Index(fields=['tournament', 'registration_date', 'id'], name='registration_entry_idx'),
+        ]
+
+    def take_snapshot(self):
+        self._loaded_tournament_id = self.__dict__.get('tournament_id')
+
+    def save(self, *args, **kwargs):
+        loaded_tournament_id = self._loaded_tournament_id
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.tournament_id != loaded_tournament_id:
+                if loaded_tournament_id is not None:
+                    Tournament.adjust_registrations(loaded_tournament_id, -1)
+                Tournament.adjust_registrations(self.tournament_id, 1)
     
     def __str__(self):
-        return f"{self.player.user.get_full_name()} - {self.tournament.name}"
\ No newline at end of file
+        return f"{self.player.user.get_full_name()} - {self.tournament.name}"
+
+
+class Match(models.Model):
+    """
+    One match of a tournament draw, addressed by (round, position).
+
+    In single elimination the winner of (round, position) plays on in
+    (round + 1, position // 2), so no links between matches are stored.
+    Byes are not stored either: a player with a first-round bye is entered
+    directly into their second-round match.
+    """
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='matches')
+    round = models.PositiveSmallIntegerField()
+    position = models.PositiveSmallIntegerField()
+    player1 = models.ForeignKey(PlayerProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    player2 = models.ForeignKey(PlayerProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    winner = models.ForeignKey(PlayerProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    score = models.CharField(max_length=50, blank=True)
+    # Order of play, see tournaments.scheduling
+    court = models.ForeignKey(TennisCourt, on_delete=models.SET_NULL, null=True, blank=True, related_name='matches')
+    scheduled_at = models.DateTimeField(null=True, blank=True)
+    # Length of the slot booked from scheduled_at
+    duration_hours = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('tournament', 'round', 'position')
+        ordering = ['tournament', 'round', 'position']
+        indexes = [
+            models.Index(fields=['court', 'scheduled_at'], name='match_court_schedule_idx'),
+        ]
+        verbose_name_plural = "Matches"
+
+    def __str__(self):
+        return f"{self.tournament.name} R{self.round} #{self.position + 1}"
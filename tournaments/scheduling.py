@@ -0,0 +1,104 @@
+"""
+Order of play.
+
+Matches are placed greedily in draw order (round, position) on hourly slots
+between the tournament's start_date and end_date, within the club's opening
+hours. Each match gets the earliest slot on any of the given courts that:
+
+- doesn't overlap a training session or another tournament's match on
+  that court (checked against the court occupancy bitmaps from
+  training.occupancy) or a match placed earlier in the same run,
+- starts at least `rest_hours` after each of its players' previous match,
+- and, in single elimination, starts at least `rest_hours` after both
+  matches feeding into it have finished.
+
+Everything is computed in memory from one load of the window's sessions
+and matches, and the result is written back with a single bulk_update.
+"""
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.utils import timezone
+from training.models import TennisCourt
+from training.occupancy import CourtOccupancy, OPENING_HOUR, CLOSING_HOUR
+from .models import Match
+
+MATCH_HOURS = 2
+REST_HOURS = 1
+
+
+def schedule_matches(tournament, courts=None, match_hours=MATCH_HOURS, rest_hours=REST_HOURS, dry_run=False):
+    """
+    Give every match of the tournament a court and start time. Returns
+    (scheduled, unscheduled): matches with their new court_id/scheduled_at/duration_hours,
+    and those that didn't fit in the tournament window.
+    """
+    court_ids = sorted(court.pk for court in (courts if courts is not None else TennisCourt.objects.all()))
+    matches = list(tournament.matches.order_by('round', 'position'))
+    days = (tournament.end_date - tournament.start_date).days + 1
+    last_start = CLOSING_HOUR - match_hours
+
+    index = CourtOccupancy()
+    index.load_range(tournament.start_date, tournament.end_date)
+    # This tournament's own slots are about to be reassigned
+    for match in matches:
+        index.discard(('match', match.pk))
+
+    # Times are whole hours counted from midnight on start_date
+    player_free = {}   # player id -> earliest start of their next match
+    finished = {}      # (round, position) -> end of that match
+    unplaced = set()   # (round, position) of matches that didn't fit
+    scheduled, unscheduled = [], []
+    for match in matches:
+        ready = 0
+        for player_id in (match.player1_id, match.player2_id):
+            ready = max(ready, player_free.get(player_id, 0))
+        if tournament.draw_format == 'single_elimination' and match.round > 1:
+            for feeder in ((match.round - 1, 2 * match.position), (match.round - 1, 2 * match.position + 1)):
+                if feeder in unplaced:
+                    ready = None
+                    break
+                if feeder in finished:
+                    ready = max(ready, finished[feeder] + rest_hours)
+
+        slot = None if ready is None else first_free_slot(
+            index, tournament.start_date, court_ids, ready, days, last_start, match_hours
+        )
+        if slot is None:
+            match.court_id, match.scheduled_at, match.duration_hours = None, None, None
+            unplaced.add((match.round, match.position))
+            unscheduled.append(match)
+            continue
+
+        start, court_id = slot
+        day = tournament.start_date + timedelta(days=start // 24)
+        start_time = time(start % 24)
+        index.reserve(court_id, day, start_time, time(start % 24 + match_hours), token=('match', match.pk))
+        match.court_id = court_id
+        match.scheduled_at = timezone.make_aware(datetime.combine(day, start_time))
+        match.duration_hours = match_hours
+        finished[match.round, match.position] = start + match_hours
+        for player_id in (match.player1_id, match.player2_id):
+            if player_id is not None:
+                player_free[player_id] = start + match_hours + rest_hours
+        scheduled.append(match)
+
+    if not dry_run:
+        with transaction.atomic():
+            Match.objects.bulk_update(matches, ['court', 'scheduled_at', 'duration_hours'], batch_size=500)
+    return scheduled, unscheduled
+
+
+def first_free_slot(index, first_day, court_ids, ready, days, last_start, match_hours):
+    """Earliest (start, court_id) at or after `ready` with a free court, or None."""
+    day, hour = divmod(ready, 24)
+    hour = max(hour, OPENING_HOUR)
+    while day < days:
+        date = first_day + timedelta(days=day)
+        while hour <= last_start:
+            start_time, end_time = time(hour), time(hour + match_hours)
+            for court_id in court_ids:
+                if index.is_free(court_id, date, start_time, end_time):
+                    return day * 24 + hour, court_id
+            hour += 1
+        day, hour = day + 1, OPENING_HOUR
+    return None
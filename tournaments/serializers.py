@@ -1,8 +1,15 @@
 from rest_framework import serializers
-from .models import Tournament, TournamentRegistration
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
+from .models import Tournament, TournamentRegistration, Match
 from profiles.models import PlayerProfile
 from profiles.serializers import PlayerProfileSerializer
+from training.models import TennisCourt
 from django.contrib.auth.models import User
+from tennisapp.pagination import KeysetPagination
+
+# Entry order of a tournament's registrations, shared with the list endpoint
+REGISTRATION_ORDERING = ('registration_date', 'id')
 
 class TournamentSerializer(serializers.ModelSerializer):
     created_by = serializers.ReadOnlyField(source='created_by.username')
@@ -25,5 +32,78 @@ class TournamentRegistrationSerializer(serializers.ModelSerializer):
         model = TournamentRegistration
         fields = '__all__'
 
+class PlayerRegistrationSerializer(serializers.ModelSerializer):
+    """One of a player's registrations, with the tournament instead of the player."""
+    tournament = TournamentSerializer(read_only=True)
+
+    class Meta:
+        model = TournamentRegistration
+        fields = ['id', 'tournament', 'registration_date']
+
 class TournamentDetailSerializer(TournamentSerializer):
-    registrations = TournamentRegistrationSerializer(many=True, read_only=True)
\ No newline at end of file
+    """
+    Embeds the first page of registrations plus a cursor link to the rest,
+    so the cost doesn't grow with the size of the entry list.
+    """
+    registrations = serializers.SerializerMethodField()
+
+    REGISTRATIONS_PAGE_SIZE = 10
+
+    def get_registrations(self, tournament):
+        pagination = KeysetPagination(REGISTRATION_ORDERING)
+        page = list(tournament.registrations.for_listing()[:self.REGISTRATIONS_PAGE_SIZE + 1])
+        results = page[:self.REGISTRATIONS_PAGE_SIZE]
+        next_link = None
+        if len(page) > len(results):
+            url = reverse(
+                'tournament-registrations', kwargs={'tournament_id': tournament.pk},
+                request=self.context.get('request'),
+            )
+            next_link = replace_query_param(url, pagination.cursor_query_param, pagination.encode_cursor(results[-1]))
+        return {
+            'count': tournament.registrations_count,
+            'next': next_link,
+            'results': TournamentRegistrationSerializer(results, many=True, context=self.context).data,
+        }
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    player1_name = serializers.ReadOnlyField(source='player1.user.get_full_name')
+    player2_name = serializers.ReadOnlyField(source='player2.user.get_full_name')
+    # The project-wide DATETIME_FORMAT drops the time of day
+    scheduled_at = serializers.DateTimeField(format='iso-8601', read_only=True)
+
+    class Meta:
+        model = Match
+        fields = [
+            'id', 'round', 'position', 'player1', 'player1_name', 'player2', 'player2_name',
+            'winner', 'score', 'court', 'scheduled_at', 'duration_hours',
+        ]
+        read_only_fields = ['duration_hours']
+
+
+class DrawSerializer(serializers.Serializer):
+    draw_format = serializers.ChoiceField(choices=Tournament.DRAW_FORMATS, required=False)
+
+
+class TournamentQuerySerializer(serializers.Serializer):
+    # Missing query params read as False otherwise
+    open = serializers.BooleanField(required=False, allow_null=True, default=None)
+    surface = serializers.ChoiceField(choices=Tournament.SURFACE_TYPES, required=False)
+    min_registrations = serializers.IntegerField(min_value=0, required=False)
+    max_registrations = serializers.IntegerField(min_value=0, required=False)
+    ordering = serializers.ChoiceField(
+        choices=['-start_date', 'start_date', 'registrations', '-registrations'], default='-start_date'
+    )
+
+
+class RegistrationImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    dry_run = serializers.BooleanField(default=False)
+
+
+class ScheduleSerializer(serializers.Serializer):
+    courts = serializers.PrimaryKeyRelatedField(queryset=TennisCourt.objects.all(), many=True, required=False)
+    match_hours = serializers.IntegerField(min_value=1, max_value=4, default=2)
+    rest_hours = serializers.IntegerField(min_value=0, max_value=12, default=1)
+    dry_run = serializers.BooleanField(default=False)
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from profiles.models import PlayerProfile
+from profiles.thumbnails import thumbnails_updated
+from tennisapp.cache import invalidate, invalidate_on_user_change
+from .models import Tournament, TournamentRegistration
+
+TOURNAMENTS_CACHE = 'tournaments'
+
+invalidate_on_user_change(TOURNAMENTS_CACHE)
+
+
+# ---------------- Registration counters ----------------
+@receiver(post_delete, sender=TournamentRegistration)
+def release_registration(sender, instance, **kwargs):
+    if instance._loaded_tournament_id is not None:
+        Tournament.adjust_registrations(instance._loaded_tournament_id, -1)
+
+
+# ---------------- Tournament cache ----------------
+@receiver(post_save, sender=Tournament)
+@receiver(post_delete, sender=Tournament)
+@receiver(post_save, sender=TournamentRegistration)
+@receiver(post_delete, sender=TournamentRegistration)
+@receiver(post_save, sender=PlayerProfile)
+@receiver(post_delete, sender=PlayerProfile)
+@receiver(thumbnails_updated, sender=PlayerProfile)
+def invalidate_tournaments(sender, **kwargs):
+    invalidate(TOURNAMENTS_CACHE)
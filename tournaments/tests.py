@@ -1,3 +1,455 @@
-from django.test import TestCase
+import io
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import combinations
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from profiles.models import PlayerProfile
+from tennisapp.cache import namespace_version
+from .brackets import bracket_order, generate_draw, round_robin, single_elimination
+from .models import Tournament, TournamentRegistration, Match
+from .imports import import_registrations
+from .scheduling import schedule_matches
+from .signals import TOURNAMENTS_CACHE
+from training.models import TennisCourt, TrainingSession
 
-# Create your tests here.
+
+class TournamentConditionalGetTests(APITestCase):
+    """Repeated reads are answered from the cache, with 304s for unchanged pages."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='organiser', password='pass')
+        self.tournament = Tournament.objects.create(
+            name='Club Open', location='Court 1', start_date=date(2030, 6, 1),
+            end_date=date(2030, 6, 3), surface='clay', created_by=self.user,
+        )
+        self.url = f'/api/tournaments/{self.tournament.pk}/'
+
+    def test_matching_etag_is_answered_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 0)
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        first = self.client.get(self.url)
+        self.tournament.name = 'Club Open 2030'
+        self.tournament.save()
+
+        # The change may fall within the second Last-Modified names
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'Club Open 2030')
+
+    def test_registration_changes_the_etag(self):
+        first = self.client.get(self.url)
+        player = PlayerProfile.objects.create(
+            user=User.objects.create_user(username='player', password='pass'),
+            date_of_birth=date(2000, 1, 1),
+            skill_level='beginner',
+            profile_image=None,
+        )
+        TournamentRegistration.objects.create(tournament=self.tournament, player=player)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.json()['registrations']['count'], 1)
+
+
+class BracketTests(APITestCase):
+    def test_top_seeds_get_the_byes(self):
+        self.assertEqual(bracket_order(8), [1, 8, 4, 5, 2, 7, 3, 6])
+        matches = single_elimination(1, players=list(range(1, 6)))
+
+        first_round = [(m.player1_id, m.player2_id) for m in matches if m.round == 1]
+        self.assertEqual(first_round, [(4, 5)])
+        second_round = [(m.player1_id, m.player2_id) for m in matches if m.round == 2]
+        self.assertEqual(second_round, [(1, None), (2, 3)])
+        self.assertEqual(len(matches), 4)
+
+    def test_round_robin_pairs_everybody_once(self):
+        matches = round_robin(1, players=list(range(7)))
+        pairs = {frozenset((m.player1_id, m.player2_id)) for m in matches}
+        self.assertEqual(pairs, {frozenset(pair) for pair in combinations(range(7), 2)})
+        for round in {m.round for m in matches}:
+            players = [p for m in matches if m.round == round for p in (m.player1_id, m.player2_id)]
+            self.assertEqual(len(players), len(set(players)))
+
+    def test_large_draw_is_bulk_inserted(self):
+        organiser = User.objects.create_user(username='organiser')
+        tournament = Tournament.objects.create(
+            name='Big Open', location='Club', start_date=date(2030, 6, 1),
+            end_date=date(2030, 6, 7), surface='hard', created_by=organiser,
+        )
+        User.objects.bulk_create(User(username=f'p{i}') for i in range(200))
+        PlayerProfile.objects.bulk_create(
+            PlayerProfile(user=user, date_of_birth=date(2000, 1, 1), skill_level='advanced')
+            for user in User.objects.filter(username__startswith='p')
+        )
+        players = PlayerProfile.objects.order_by('id')
+        TournamentRegistration.objects.bulk_create(
+            TournamentRegistration(tournament=tournament, player=player, seed=i + 1 if i < 32 else None)
+            for i, player in enumerate(players)
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            matches = generate_draw(tournament, rng=random.Random(1))
+        self.assertEqual(len(matches), 199)
+        self.assertLess(len(queries), 10)
+
+
+class RegistrationCountTests(APITestCase):
+    """registrations_count follows registrations and drives the list filters."""
+
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username='organiser')
+        self.players = [
+            PlayerProfile.objects.create(
+                user=User.objects.create_user(username=f'player{i}'),
+                date_of_birth=date(2000, 1, 1),
+                skill_level='beginner',
+            )
+            for i in range(3)
+        ]
+
+    def create_tournament(self, name, entrants):
+        tournament = Tournament.objects.create(
+            name=name, location='Club', start_date=date(2030, 6, 1),
+            end_date=date(2030, 6, 2), surface='hard', created_by=self.organiser,
+        )
+        for player in self.players[:entrants]:
+            TournamentRegistration.objects.create(tournament=tournament, player=player)
+        return tournament
+
+    def test_counter_follows_create_and_delete(self):
+        tournament = self.create_tournament('Open', entrants=3)
+        tournament.registrations.first().delete()
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.registrations_count, 2)
+
+        tournament.name = 'Renamed'
+        tournament.save()
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.registrations_count, 2)
+
+    def test_rebuild_fixes_drift_and_invalidates_the_list(self):
+        tournament = self.create_tournament('Open', entrants=2)
+        Tournament.objects.filter(pk=tournament.pk).update(registrations_count=5)
+        version = namespace_version(TOURNAMENTS_CACHE)
+
+        call_command('rebuild_registration_counts', stdout=io.StringIO())
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.registrations_count, 2)
+        self.assertNotEqual(namespace_version(TOURNAMENTS_CACHE), version)
+
+    def test_list_filters_on_the_counter_in_fixed_queries(self):
+        self.create_tournament('Quiet', entrants=1)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/tournaments/?open=true&max_registrations=1')
+        self.create_tournament('Busy', entrants=3)
+        self.create_tournament('Empty', entrants=0)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/tournaments/?open=true&max_registrations=1&ordering=-registrations')
+        names = [row['name'] for row in response.json()['results']]
+        self.assertEqual(names, ['Quiet', 'Empty'])
+        self.assertEqual(response.json()['results'][0]['registrations_count'], 1)
+        self.assertEqual(len(small), len(large))
+
+    def test_list_without_open_returns_past_and_future(self):
+        self.create_tournament('Upcoming', entrants=0)
+        Tournament.objects.create(
+            name='Finished', location='Club', start_date=date(2020, 6, 1),
+            end_date=date(2020, 6, 2), surface='hard', created_by=self.organiser,
+        )
+        response = self.client.get('/api/tournaments/')
+        names = {row['name'] for row in response.json()['results']}
+        self.assertEqual(names, {'Upcoming', 'Finished'})
+
+        response = self.client.get('/api/tournaments/?open=false')
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Finished'])
+
+
+class TournamentDetailRegistrationTests(APITestCase):
+    """The detail embeds one page of registrations; the rest is a cursor away."""
+
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament.objects.create(
+            name='Open', location='Club', start_date=date(2030, 6, 1), end_date=date(2030, 6, 2),
+            surface='hard', created_by=User.objects.create_user(username='organiser'),
+        )
+        self.url = f'/api/tournaments/{self.tournament.pk}/'
+
+    def register(self, count):
+        start = TournamentRegistration.objects.count()
+        for i in range(start, start + count):
+            player = PlayerProfile.objects.create(
+                user=User.objects.create_user(username=f'player{i}'),
+                date_of_birth=date(2000, 1, 1),
+                skill_level='beginner',
+                profile_image=None,
+            )
+            TournamentRegistration.objects.create(tournament=self.tournament, player=player)
+
+    def fetch(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_detail_cost_is_independent_of_entrants(self):
+        self.register(2)
+        small, _ = self.fetch(self.url)
+        self.register(20)
+        large, data = self.fetch(self.url)
+
+        self.assertEqual(small, large)
+        registrations = data['registrations']
+        self.assertEqual(registrations['count'], 22)
+        self.assertEqual(len(registrations['results']), 10)
+
+        seen = [row['id'] for row in registrations['results']]
+        next_url = registrations['next']
+        self.assertTrue(next_url.startswith(f'http://testserver/api/tournaments/{self.tournament.pk}/registrations/?'))
+        while next_url:
+            _, page = self.fetch(next_url)
+            seen += [row['id'] for row in page['results']]
+            next_url = page['next']
+        self.assertEqual(seen, list(self.tournament.registrations.order_by('registration_date', 'id').values_list('id', flat=True)))
+
+
+class RegistrationImportTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username='organiser')
+        self.tournament = Tournament.objects.create(
+            name='Open', location='Club', start_date=date(2030, 6, 1), end_date=date(2030, 6, 2),
+            surface='hard', created_by=self.organiser,
+        )
+        self.players = [
+            PlayerProfile.objects.create(
+                user=User.objects.create_user(username=f'player{i}', email=f'player{i}@example.com'),
+                date_of_birth=date(2000, 1, 1),
+                skill_level='beginner',
+            )
+            for i in range(4)
+        ]
+        TournamentRegistration.objects.create(tournament=self.tournament, player=self.players[0])
+
+    def upload(self, content, **data):
+        self.client.force_authenticate(self.organiser)
+        upload = SimpleUploadedFile('entries.csv', content.encode(), content_type='text/csv')
+        return self.client.post(
+            f'/api/tournaments/{self.tournament.pk}/registrations/import/',
+            {'file': upload, **data}, format='multipart',
+        )
+
+    def test_import_reports_per_row(self):
+        csv = (
+            "player_id,username,email,seed\n"
+            f"{self.players[0].pk},,,\n"             # already registered
+            f",player1,,1\n"
+            f",,PLAYER2@example.com,\n"
+            f",player1,,\n"                          # duplicate within the file
+            f",ghost,,\n"
+            f"{self.players[3].pk},,,top\n"
+        )
+        response = self.upload(csv)
+
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual((report['created'], report['duplicates']), (2, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [6, 7])
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.registrations_count, 3)
+        self.assertEqual(self.tournament.registrations.get(player=self.players[1]).seed, 1)
+
+    def test_dry_run_writes_nothing(self):
+        response = self.upload("username\nplayer1\nplayer2\n", dry_run=True)
+
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(self.tournament.registrations.count(), 1)
+
+    def test_file_without_identifier_column_is_rejected(self):
+        self.assertEqual(self.upload("name\nSomebody\n").status_code, 400)
+
+    def test_undecodable_tail_keeps_committed_batches(self):
+        def lines():
+            yield "username\n"
+            yield "player1\n"
+            yield "player2\n"
+            raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'invalid start byte')
+
+        version = namespace_version(TOURNAMENTS_CACHE)
+        report = import_registrations(self.tournament, lines(), batch_size=1)
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([error['row'] for error in report['errors']], [4])
+        self.assertEqual(self.tournament.registrations.count(), 3)
+        self.assertNotEqual(namespace_version(TOURNAMENTS_CACHE), version)
+
+    def test_concurrent_registration_is_reported_per_row(self):
+        def lines():
+            yield "username\n"
+            yield "player1\n"
+            yield "player2\n"
+            # Somebody else enters player2 before the batch is written
+            TournamentRegistration.objects.create(tournament=self.tournament, player=self.players[2])
+            yield "player3\n"
+
+        report = import_registrations(self.tournament, lines())
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(report['errors'], [
+            {'row': 3, 'error': "The player was registered by someone else during the import."},
+        ])
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.registrations_count, 4)
+
+
+class SchedulingTests(APITestCase):
+    def test_large_draw_is_scheduled_without_conflicts(self):
+        start = date.today() + timedelta(days=30)
+        tournament = Tournament.objects.create(
+            name='Big Open', location='Club', start_date=start, end_date=start + timedelta(days=9),
+            surface='hard', created_by=User.objects.create_user(username='organiser'),
+        )
+        courts = [TennisCourt.objects.create(name=f'Court {i}') for i in range(12)]
+        booked = TrainingSession.objects.create(
+            court=courts[0], date=start, start_time=time(9, 0), focus_area='Serve', intensity=5,
+        )
+        matches = single_elimination(tournament.pk, players=list(range(1, 257)))
+        for match in matches:
+            # Only the shape of the draw matters here
+            match.player1_id = match.player2_id = None
+        Match.objects.bulk_create(matches)
+
+        with CaptureQueriesContext(connection) as queries:
+            scheduled, unscheduled = schedule_matches(tournament)
+        self.assertLess(len(queries), 10)
+        self.assertEqual((len(scheduled), unscheduled), (255, []))
+
+        slots = {}
+        for match in Match.objects.filter(tournament=tournament):
+            for hour in range(2):
+                slot = (match.court_id, match.scheduled_at + timedelta(hours=hour))
+                self.assertNotIn(slot, slots)
+                slots[slot] = match
+            if match.round > 1:
+                feeders = Match.objects.filter(
+                    tournament=tournament, round=match.round - 1, position__in=[2 * match.position, 2 * match.position + 1]
+                )
+                for feeder in feeders:
+                    self.assertGreaterEqual(match.scheduled_at, feeder.scheduled_at + timedelta(hours=3))
+        session_start = timezone.make_aware(datetime.combine(booked.date, booked.start_time))
+        for hour in (-1, 0):
+            self.assertNotIn((courts[0].pk, session_start + timedelta(hours=hour)), slots)
+
+    def make_tournament(self, name, start, days=1, draw_format='single_elimination'):
+        return Tournament.objects.create(
+            name=name, location='Club', start_date=start, end_date=start + timedelta(days=days - 1),
+            surface='hard', draw_format=draw_format,
+            created_by=User.objects.get_or_create(username='organiser')[0],
+        )
+
+    def enter(self, tournament, count):
+        start = PlayerProfile.objects.count()
+        for i in range(start, start + count):
+            player = PlayerProfile.objects.create(
+                user=User.objects.create_user(username=f'player{i}'),
+                date_of_birth=date(2000, 1, 1), skill_level='beginner', profile_image=None,
+            )
+            TournamentRegistration.objects.create(tournament=tournament, player=player, seed=i - start + 1)
+        generate_draw(tournament, rng=random.Random(0))
+
+    def test_players_rest_between_matches(self):
+        start = date.today() + timedelta(days=30)
+        tournament = self.make_tournament('Round Robin', start, days=2, draw_format='round_robin')
+        self.enter(tournament, 4)
+        courts = [TennisCourt.objects.create(name=f'Court {i}') for i in range(2)]
+
+        scheduled, unscheduled = schedule_matches(tournament, courts=courts, match_hours=2, rest_hours=1)
+        self.assertEqual((len(scheduled), unscheduled), (6, []))
+
+        by_player = {}
+        for match in Match.objects.filter(tournament=tournament).order_by('scheduled_at'):
+            for player_id in (match.player1_id, match.player2_id):
+                by_player.setdefault(player_id, []).append(match.scheduled_at)
+        for starts in by_player.values():
+            self.assertEqual(len(starts), 3)
+            for earlier, later in zip(starts, starts[1:]):
+                self.assertGreaterEqual(later - earlier, timedelta(hours=3))
+
+    def test_overlapping_tournaments_share_courts_without_clashes(self):
+        start = date.today() + timedelta(days=30)
+        court = TennisCourt.objects.create(name='Centre Court')
+        first, second = self.make_tournament('First', start), self.make_tournament('Second', start)
+        self.enter(first, 4)
+        self.enter(second, 4)
+
+        schedule_matches(first, courts=[court])
+        schedule_matches(second, courts=[court])
+        # Rescheduling a tournament doesn't trip over its own earlier slots
+        schedule_matches(first, courts=[court])
+
+        hours = {}
+        for match in Match.objects.exclude(scheduled_at=None):
+            for hour in range(2):
+                slot = match.scheduled_at + timedelta(hours=hour)
+                self.assertNotIn(slot, hours)
+                hours[slot] = match
+        self.assertEqual(len(hours), 2 * 2 * 3)
+
+    def test_training_sessions_cannot_take_a_match_slot(self):
+        start = date.today() + timedelta(days=30)
+        court = TennisCourt.objects.create(name='Centre Court')
+        tournament = self.make_tournament('Open', start)
+        self.enter(tournament, 2)
+        schedule_matches(tournament, courts=[court])
+        match = tournament.matches.get()
+        begins = timezone.localtime(match.scheduled_at)
+
+        with self.assertRaises(ValidationError):
+            TrainingSession.objects.create(
+                court=court, date=begins.date(), start_time=(begins + timedelta(hours=1)).time(),
+                focus_area='Serve', intensity=5,
+            )
+        TrainingSession.objects.create(
+            court=court, date=begins.date(), start_time=(begins + timedelta(hours=2)).time(),
+            focus_area='Serve', intensity=5,
+        )
+
+    def test_longer_matches_hold_the_court_for_their_whole_slot(self):
+        start = date.today() + timedelta(days=30)
+        court = TennisCourt.objects.create(name='Centre Court')
+        tournament = self.make_tournament('Open', start)
+        self.enter(tournament, 2)
+        schedule_matches(tournament, courts=[court], match_hours=3)
+        match = tournament.matches.get()
+        self.assertEqual(match.duration_hours, 3)
+        begins = timezone.localtime(match.scheduled_at)
+
+        with self.assertRaises(ValidationError):
+            TrainingSession.objects.create(
+                court=court, date=begins.date(), start_time=(begins + timedelta(hours=2)).time(),
+                focus_area='Serve', intensity=5,
+            )
+        TrainingSession.objects.create(
+            court=court, date=begins.date(), start_time=(begins + timedelta(hours=3)).time(),
+            focus_area='Serve', intensity=5,
+        )
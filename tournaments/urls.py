@@ -4,6 +4,12 @@ from . import views
 urlpatterns = [
     path('', views.TournamentList.as_view()),
     path('<int:pk>/', views.TournamentDetail.as_view()),
-    path('<int:tournament_id>/registrations/', views.TournamentRegistrationList.as_view()),
+    path('<int:pk>/draw/', views.TournamentDraw.as_view()),
+    path('<int:pk>/schedule/', views.TournamentSchedule.as_view()),
+    path(
+        '<int:tournament_id>/registrations/', views.TournamentRegistrationList.as_view(),
+        name='tournament-registrations',
+    ),
+    path('<int:tournament_id>/registrations/import/', views.TournamentRegistrationImport.as_view()),
     path('<int:tournament_id>/registrations/<int:pk>/', views.TournamentRegistrationDetail.as_view()),
 ]
\ No newline at end of file
@@ -1,33 +1,85 @@
 from django.shortcuts import render
-from rest_framework import generics, permissions, status
+import io
+from django.core.exceptions import ValidationError
+from rest_framework import generics, permissions, serializers, status
 from rest_framework.response import Response
+from .brackets import generate_draw
+from .imports import import_registrations
+from .scheduling import schedule_matches
 from .models import Tournament, TournamentRegistration
-from .serializers import TournamentSerializer, TournamentDetailSerializer, TournamentRegistrationSerializer
+from .serializers import (
+    TournamentSerializer,
+    TournamentDetailSerializer,
+    TournamentRegistrationSerializer,
+    MatchSerializer,
+    DrawSerializer,
+    TournamentQuerySerializer,
+    RegistrationImportSerializer,
+    ScheduleSerializer,
+    REGISTRATION_ORDERING,
+)
+from tennisapp.cache import CachedResponseMixin
 from tennisapp.permissions import IsOwnerOrReadOnly
+from .signals import TOURNAMENTS_CACHE
 
 # Create your views here.
-class TournamentList(generics.ListCreateAPIView):
+class TournamentList(CachedResponseMixin, generics.ListCreateAPIView):
+    """
+    Tournaments, filterable by ?open=true (not started yet), ?surface=,
+    ?min_registrations= and ?max_registrations=, with
+    ?ordering=-start_date|start_date|registrations|-registrations.
+    """
     serializer_class = TournamentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_namespace = TOURNAMENTS_CACHE
+    ORDERINGS = {
+        '-start_date': ('-start_date', '-id'),
+        'start_date': ('start_date', 'id'),
+        'registrations': ('registrations_count', 'id'),
+        '-registrations': ('-registrations_count', '-id'),
+    }
+
+    def get_filters(self):
+        params = TournamentQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data
+
+    @property
+    def cursor_ordering(self):
+        # Opt-in keyset pagination with ?cursor=, over the requested ordering
+        return self.ORDERINGS[self.get_filters()['ordering']]
     
     def get_queryset(self):
-        return Tournament.objects.all()
+        filters = self.get_filters()
+        tournaments = Tournament.objects.select_related('created_by')
+        if filters.get('open') is not None:
+            tournaments = tournaments.open_for_entries() if filters['open'] else tournaments.started()
+        if filters.get('surface'):
+            tournaments = tournaments.filter(surface=filters['surface'])
+        if filters.get('min_registrations') is not None:
+            tournaments = tournaments.filter(registrations_count__gte=filters['min_registrations'])
+        if filters.get('max_registrations') is not None:
+            tournaments = tournaments.filter(registrations_count__lte=filters['max_registrations'])
+        return tournaments.order_by(*self.ORDERINGS[filters['ordering']])
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-class TournamentDetail(generics.RetrieveUpdateDestroyAPIView):
+class TournamentDetail(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
-    queryset = Tournament.objects.all()
+    queryset = Tournament.objects.select_related('created_by')
     serializer_class = TournamentDetailSerializer
+    cache_namespace = TOURNAMENTS_CACHE
 
 class TournamentRegistrationList(generics.ListCreateAPIView):
     serializer_class = TournamentRegistrationSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # Opt-in keyset pagination with ?cursor=
+    cursor_ordering = REGISTRATION_ORDERING
     
     def get_queryset(self):
         tournament_id = self.kwargs['tournament_id']
-        return TournamentRegistration.objects.filter(tournament_id=tournament_id)
+        return TournamentRegistration.objects.for_listing().filter(tournament_id=tournament_id)
     
     def perform_create(self, serializer):
         tournament_id = self.kwargs['tournament_id']
@@ -46,4 +98,105 @@ class TournamentRegistrationDetail(generics.RetrieveDestroyAPIView):
     
     def get_queryset(self):
         tournament_id = self.kwargs['tournament_id']
-        return TournamentRegistration.objects.filter(tournament_id=tournament_id)
\ No newline at end of file
+        return TournamentRegistration.objects.for_listing().filter(tournament_id=tournament_id)
+
+
+class TournamentDraw(generics.GenericAPIView):
+    """
+    The tournament's draw by round (GET). The organiser builds or rebuilds
+    it from the registrations and seeds with a POST, optionally overriding
+    the tournament's draw_format.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    queryset = Tournament.objects.all()
+    serializer_class = DrawSerializer
+
+    def draw_response(self, tournament, matches, status_code=status.HTTP_200_OK):
+        return Response({
+            "tournament": tournament.pk,
+            "draw_format": tournament.draw_format,
+            "matches": MatchSerializer(matches, many=True).data,
+        }, status=status_code)
+
+    def get(self, request, *args, **kwargs):
+        tournament = self.get_object()
+        matches = tournament.matches.select_related('player1__user', 'player2__user')
+        return self.draw_response(tournament, matches)
+
+    def post(self, request, *args, **kwargs):
+        tournament = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        draw_format = serializer.validated_data.get('draw_format', tournament.draw_format)
+        try:
+            generate_draw(tournament, draw_format)
+        except ValidationError as exc:
+            return Response({"detail": exc.messages}, status=status.HTTP_400_BAD_REQUEST)
+        if draw_format != tournament.draw_format:
+            tournament.draw_format = draw_format
+            tournament.save(update_fields=['draw_format', 'updated_at'])
+
+        matches = tournament.matches.select_related('player1__user', 'player2__user')
+        return self.draw_response(tournament, matches, status.HTTP_201_CREATED)
+
+
+class TournamentRegistrationImport(generics.GenericAPIView):
+    """
+    Register players in bulk from an uploaded CSV entry list (multipart
+    `file`, optional `dry_run`). Reports created rows, skipped duplicates
+    and errors by row number.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    queryset = Tournament.objects.all()
+    serializer_class = RegistrationImportSerializer
+    lookup_url_kwarg = 'tournament_id'
+
+    def post(self, request, *args, **kwargs):
+        tournament = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        dry_run = serializer.validated_data['dry_run']
+
+        # Stream the rows from the uploaded (spooled) file
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            report = import_registrations(tournament, lines, dry_run=dry_run)
+        except (ValidationError, UnicodeDecodeError) as exc:
+            messages = exc.messages if isinstance(exc, ValidationError) else ["The file must be UTF-8 encoded CSV."]
+            return Response({"detail": messages}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            lines.detach()
+
+        return Response(
+            {"dry_run": dry_run, **report},
+            status=status.HTTP_200_OK if dry_run or not report['created'] else status.HTTP_201_CREATED,
+        )
+
+
+class TournamentSchedule(generics.GenericAPIView):
+    """
+    Build the order of play (POST): courts and start times for every match
+    of the draw, avoiding training sessions on the same courts and giving
+    players rest between matches. Optional: courts, match_hours,
+    rest_hours, dry_run.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    queryset = Tournament.objects.all()
+    serializer_class = ScheduleSerializer
+
+    def post(self, request, *args, **kwargs):
+        tournament = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = dict(serializer.validated_data)
+        if not tournament.matches.exists():
+            return Response({"detail": "Generate the draw before scheduling it."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        scheduled, unscheduled = schedule_matches(tournament, courts=options.pop('courts', None), **options)
+        return Response({
+            "dry_run": options['dry_run'],
+            "scheduled": MatchSerializer(scheduled, many=True).data,
+            "unscheduled": [match.pk for match in unscheduled],
+        }, status=status.HTTP_200_OK)
@@ -1,9 +1,13 @@
 from django import forms
-from django.contrib import admin
-from datetime import time, datetime
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from datetime import time, datetime, timedelta
 from django.utils import timezone
 from django.utils.html import format_html
-from .models import TrainingSession, TennisCourt, SessionParticipant
+from .models import TrainingSession, TennisCourt, SessionParticipant, SessionWaitlistEntry
+from .lifecycle import cancel_sessions
+from .occupancy import occupancy_index
+from .recurrence import plan_occurrences, create_occurrences
 
 
 # ---------------- Custom Admin Form ----------------
@@ -41,14 +45,53 @@ class TrainingSessionAdminForm(forms.ModelForm):
         return cleaned_data
 
 
+# ---------------- Recurrence Action Form ----------------
+class RecurrenceActionForm(ActionForm):
+    repeat_until = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}),
+        help_text="Repeat selected sessions weekly until this date"
+    )
+
+
 # ---------------- Inline for Participants ----------------
+class SessionParticipantFormSet(forms.BaseInlineFormSet):
+    def clean(self):
+        """Check the seats against every row of the submit, not one row at a time."""
+        super().clean()
+        session = self.instance
+        active = session.active_count if session.pk else 0
+        for form in self.forms:
+            if not hasattr(form, 'cleaned_data') or not form.cleaned_data:
+                continue
+            participant = form.instance
+            if form.cleaned_data.get('DELETE'):
+                if participant.pk and participant._loaded_status == 'active':
+                    active -= 1
+            elif participant.pk is None:
+                active += 1
+        if active > session.max_players:
+            raise forms.ValidationError(
+                f"Session is full: only {session.max_players} player(s) can take part."
+            )
+
+
 class SessionParticipantInline(admin.TabularInline):
     model = SessionParticipant
+    formset = SessionParticipantFormSet
     extra = 0
     readonly_fields = ("canceled_at", "status")
     autocomplete_fields = ["player"]
 
 
+# ---------------- Inline for Waitlist ----------------
+class SessionWaitlistInline(admin.TabularInline):
+    model = SessionWaitlistEntry
+    extra = 0
+    readonly_fields = ("joined_at",)
+    autocomplete_fields = ["player"]
+
+
 # ---------------- Custom Filter ----------------
 class SessionDateFilter(admin.SimpleListFilter):
     title = "Session Date"
@@ -62,11 +105,11 @@ class SessionDateFilter(admin.SimpleListFilter):
         ]
 
     def queryset(self, request, queryset):
-        today = timezone.localdate()
+        start_of_today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
         if self.value() == "upcoming" or self.value() is None:
-            return queryset.filter(date__gte=today)
+            return queryset.filter(start_at__gte=start_of_today)
         elif self.value() == "past":
-            return queryset.filter(date__lt=today)
+            return queryset.filter(start_at__lt=start_of_today)
         elif self.value() == "all":
             return queryset
         return queryset
@@ -99,8 +142,19 @@ class TrainingSessionAdmin(admin.ModelAdmin):
     ]
     search_fields = ['focus_area', 'court__name']
     date_hierarchy = "date"
-    inlines = [SessionParticipantInline]
-    actions = ["cancel_selected_sessions"]
+    inlines = [SessionParticipantInline, SessionWaitlistInline]
+    actions = ["cancel_selected_sessions", "repeat_weekly"]
+    action_form = RecurrenceActionForm
+
+    # Share one court occupancy index per admin request so the form and
+    # model validation don't query for overlaps on every clean()
+    def changeform_view(self, request, *args, **kwargs):
+        with occupancy_index():
+            return super().changeform_view(request, *args, **kwargs)
+
+    def changelist_view(self, request, *args, **kwargs):
+        with occupancy_index():
+            return super().changelist_view(request, *args, **kwargs)
 
     # Colored status display
     def colored_status(self, obj):
@@ -119,24 +173,47 @@ class TrainingSessionAdmin(admin.ModelAdmin):
     colored_status.short_description = "Status"
 
     def active_players_count(self, obj):
-        return obj.sessionparticipant_set.filter(status='active').count()
+        return obj.active_count
+    active_players_count.admin_order_field = "active_count"
     active_players_count.short_description = "Active Players"
 
     def canceled_players_count(self, obj):
-        return obj.sessionparticipant_set.filter(status='canceled').count()
+        return obj.canceled_count
+    canceled_players_count.admin_order_field = "canceled_count"
     canceled_players_count.short_description = "Canceled Players"
 
     @admin.action(description="Cancel selected sessions")
     def cancel_selected_sessions(self, request, queryset):
-        updated_count = 0
-        for session in queryset:
-            if session.status != 'canceled':
-                session.status = 'canceled'
-                session.save()
-                for participant in session.sessionparticipant_set.all():
-                    participant.cancel()
-                updated_count += 1
-        self.message_user(request, f"{updated_count} session(s) canceled.")
+        canceled = cancel_sessions(queryset)
+        self.message_user(request, f"{len(canceled)} session(s) canceled.")
+
+    @admin.action(description="Repeat selected sessions weekly")
+    def repeat_weekly(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields["action"].choices = self.get_action_choices(request)
+        repeat_until = form.cleaned_data.get("repeat_until") if form.is_valid() else None
+        if not repeat_until:
+            self.message_user(request, "Choose a 'repeat until' date first.", messages.ERROR)
+            return
+
+        templates = [
+            (session, session.date.weekday(), session.date + timedelta(days=1))
+            for session in queryset
+            if session.date < repeat_until
+        ]
+        if not templates:
+            self.message_user(request, "'Repeat until' must be after the selected sessions.", messages.ERROR)
+            return
+
+        with occupancy_index() as index:
+            sessions, conflicts = plan_occurrences(templates, repeat_until, index=index)
+            create_occurrences(sessions)
+
+        self.message_user(request, f"{len(sessions)} session(s) created.")
+        if conflicts:
+            skipped = ", ".join(f"{c['date']:%d %b %Y} ({c['reason']})" for c in conflicts[:10])
+            more = f" and {len(conflicts) - 10} more" if len(conflicts) > 10 else ""
+            self.message_user(request, f"{len(conflicts)} occurrence(s) skipped: {skipped}{more}", messages.WARNING)
 
 
 # ---------------- Register TennisCourt ----------------
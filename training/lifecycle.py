@@ -0,0 +1,93 @@
+"""
+Set-based session lifecycle transitions.
+
+Sessions used to move to 'completed' only when somebody re-saved them after
+they ended. The sweep below applies the lifecycle rules to every due
+session with one UPDATE per batch, walking the lifecycle indexes so the
+cost follows the number of changed rows rather than the table size.
+
+Every transition announces the affected sessions once through
+sessions_bulk_updated after the transaction commits.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import TrainingSession, SessionParticipant
+from .signals import sessions_bulk_updated
+
+
+def ended_sessions(now=None):
+    """Scheduled sessions whose end time has passed."""
+    return TrainingSession.objects.filter(status='scheduled').ended(now)
+
+
+def sessions_due_for_auto_cancel():
+    """Sessions that reached the cancellation threshold but are still open."""
+    return TrainingSession.objects.filter(
+        canceled_count__gte=TrainingSession.AUTO_CANCEL_THRESHOLD
+    ).exclude(status='canceled')
+
+
+def _notify(session_ids, status):
+    transaction.on_commit(
+        lambda: sessions_bulk_updated.send(
+            sender=TrainingSession, session_ids=session_ids, status=status
+        )
+    )
+
+
+def _transition(queryset, status, batch_size, dry_run):
+    """Move every row of queryset to status in batches; returns the changed pks."""
+    changed = []
+    due = queryset.order_by().values_list('pk', flat=True)
+    if dry_run:
+        return list(due)
+    while True:
+        batch = list(due[:batch_size])
+        if not batch:
+            return changed
+        with transaction.atomic():
+            # Rows may have changed since they were read (a session gaining
+            # players, say); lock and re-apply the predicate before writing
+            batch = list(due.filter(pk__in=batch).select_for_update())
+            queryset.filter(pk__in=batch).update(status=status, updated_at=timezone.now())
+        if batch:
+            changed.extend(batch)
+            _notify(batch, status)
+
+
+def sweep_sessions(batch_size=500, dry_run=False, now=None):
+    """
+    Apply the auto-cancel rule, then complete ended sessions.
+    Returns {'canceled': [pks], 'completed': [pks]}.
+    """
+    return {
+        'canceled': _transition(sessions_due_for_auto_cancel(), 'canceled', batch_size, dry_run),
+        'completed': _transition(ended_sessions(now), 'completed', batch_size, dry_run),
+    }
+
+
+def cancel_sessions(queryset):
+    """
+    Cancel every session in queryset together with its active participants
+    in a few statements inside one transaction. Returns the canceled pks.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        session_ids = list(
+            queryset.exclude(status='canceled').order_by()
+            .select_for_update().values_list('pk', flat=True)
+        )
+        if not session_ids:
+            return []
+        SessionParticipant.objects.filter(session_id__in=session_ids, status='active').update(
+            status='canceled', canceled_at=now
+        )
+        TrainingSession.objects.filter(pk__in=session_ids).update(
+            status='canceled',
+            canceled_count=F('canceled_count') + F('active_count'),
+            active_count=0,
+            updated_at=now,
+        )
+        _notify(session_ids, 'canceled')
+    return session_ids
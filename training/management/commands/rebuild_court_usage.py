@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from training.usage import rebuild_usage
+
+
+class Command(BaseCommand):
+    help = "Recompute the court utilization rollup (CourtUsage) from training sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start_date', help="First date to rebuild (YYYY-MM-DD).")
+        parser.add_argument('--to', dest='end_date', help="Last date to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        dates = {}
+        for key in ('start_date', 'end_date'):
+            value = options[key]
+            dates[key] = parse_date(value) if value else None
+            if value and dates[key] is None:
+                raise CommandError(f"Invalid date: {value}")
+
+        rows = rebuild_usage(**dates)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} court usage row(s)."))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from training.models import TrainingSession, SessionParticipant
+from training.usage import refresh_sessions
+
+
+def participant_count(status):
+    counts = (
+        SessionParticipant.objects
+        .filter(session=OuterRef('pk'), status=status)
+        .order_by()
+        .values('session')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = "Recompute TrainingSession.active_count / canceled_count from participant rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report sessions whose counters have drifted.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = (
+                TrainingSession.objects
+                .annotate(real_active=participant_count('active'), real_canceled=participant_count('canceled'))
+                .exclude(active_count=F('real_active'), canceled_count=F('real_canceled'))
+                .values_list('pk', flat=True)
+            )
+            drifted_ids = list(drifted)
+            if drifted_ids and not options['dry_run']:
+                TrainingSession.objects.filter(pk__in=drifted_ids).update(
+                    active_count=participant_count('active'),
+                    canceled_count=participant_count('canceled'),
+                )
+                refresh_sessions(drifted_ids)
+
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted_ids)} session(s) with drifted counters {verb}."))
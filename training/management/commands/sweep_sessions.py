@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from training.lifecycle import sweep_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Complete ended sessions and auto-cancel sessions with too many "
+        "cancellations. Safe to run on a schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Report what would change without updating anything.",
+        )
+
+    def handle(self, *args, **options):
+        changed = sweep_sessions(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        prefix = "Would mark" if options['dry_run'] else "Marked"
+        for status, pks in changed.items():
+            self.stdout.write(self.style.SUCCESS(f"{prefix} {len(pks)} session(s) as {status}."))
+            if pks and options['verbosity'] > 1:
+                self.stdout.write("  " + ", ".join(str(pk) for pk in pks))
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:42
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_active_participants(apps, schema_editor):
+    TrainingSession = apps.get_model('training', 'TrainingSession')
+    SessionParticipant = apps.get_model('training', 'SessionParticipant')
+    active = (
+        SessionParticipant.objects
+        .filter(session=OuterRef('pk'), status='active')
+        .order_by()
+        .values('session')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    TrainingSession.objects.update(
+        active_count=Coalesce(Subquery(active, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0005_auto_20250828_2032'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingsession',
+            name='active_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_active_participants, migrations.RunPython.noop),
+    ]
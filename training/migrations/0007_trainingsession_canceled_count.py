@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:51
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_canceled_participants(apps, schema_editor):
+    TrainingSession = apps.get_model('training', 'TrainingSession')
+    SessionParticipant = apps.get_model('training', 'SessionParticipant')
+    canceled = (
+        SessionParticipant.objects
+        .filter(session=OuterRef('pk'), status='canceled')
+        .order_by()
+        .values('session')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    TrainingSession.objects.update(
+        canceled_count=Coalesce(Subquery(canceled, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0006_trainingsession_active_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingsession',
+            name='canceled_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_canceled_participants, migrations.RunPython.noop),
+    ]
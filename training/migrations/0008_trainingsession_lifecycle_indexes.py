@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0007_trainingsession_canceled_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(fields=['status', 'date', 'end_time'], name='training_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(condition=models.Q(('canceled_count__gte', 3)), fields=['status'], name='training_autocancel_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0008_trainingsession_lifecycle_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='trainingsession',
+            options={'ordering': ['-date', '-start_time', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(fields=['-date', '-start_time', '-id'], name='training_feed_idx'),
+        ),
+    ]
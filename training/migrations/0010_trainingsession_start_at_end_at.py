@@ -0,0 +1,53 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:46
+
+from datetime import datetime, timedelta
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 500
+
+
+def fill_bounds(apps, schema_editor):
+    TrainingSession = apps.get_model('training', 'TrainingSession')
+    batch = []
+    for session in TrainingSession.objects.only('date', 'start_time', 'end_time').iterator():
+        session.start_at = timezone.make_aware(datetime.combine(session.date, session.start_time))
+        if session.end_time:
+            session.end_at = timezone.make_aware(datetime.combine(session.date, session.end_time))
+        else:
+            session.end_at = session.start_at + timedelta(hours=1)
+        batch.append(session)
+        if len(batch) >= BATCH_SIZE:
+            TrainingSession.objects.bulk_update(batch, ['start_at', 'end_at'])
+            batch = []
+    if batch:
+        TrainingSession.objects.bulk_update(batch, ['start_at', 'end_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0009_trainingsession_feed_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='trainingsession',
+            name='training_status_end_idx',
+        ),
+        migrations.AddField(
+            model_name='trainingsession',
+            name='end_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='trainingsession',
+            name='start_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_bounds, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(fields=['status', 'end_at'], name='training_status_end_at_idx'),
+        ),
+    ]
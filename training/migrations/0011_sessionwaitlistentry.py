@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_coachavailability_coachprofile_coachreview'),
+        ('training', '0010_trainingsession_start_at_end_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionWaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_waitlist', to='profiles.playerprofile')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='training.trainingsession')),
+            ],
+            options={
+                'verbose_name_plural': 'Session waitlist entries',
+                'ordering': ['session', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='sessionwaitlistentry',
+            index=models.Index(fields=['session', 'id'], name='training_waitlist_fifo_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='sessionwaitlistentry',
+            unique_together={('session', 'player')},
+        ),
+    ]
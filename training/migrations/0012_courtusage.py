@@ -0,0 +1,61 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:48
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, ExtractHour
+import django.db.models.deletion
+
+
+def build_usage(apps, schema_editor):
+    TrainingSession = apps.get_model('training', 'TrainingSession')
+    CourtUsage = apps.get_model('training', 'CourtUsage')
+    totals = (
+        TrainingSession.objects.exclude(status='canceled').exclude(court=None)
+        .order_by()
+        .annotate(hour=ExtractHour('start_time'))
+        .values('court_id', 'date', 'hour')
+        .annotate(sessions=Count('id'), participants=Coalesce(Sum('active_count'), 0))
+    )
+    CourtUsage.objects.bulk_create(
+        [
+            CourtUsage(
+                court_id=row['court_id'],
+                date=row['date'],
+                hour=row['hour'],
+                booked_sessions=row['sessions'],
+                participants=row['participants'],
+            )
+            for row in totals
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0011_sessionwaitlistentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourtUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('booked_sessions', models.PositiveIntegerField(default=0)),
+                ('participants', models.PositiveIntegerField(default=0)),
+                ('court', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage', to='training.tenniscourt')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='courtusage',
+            index=models.Index(fields=['date', 'court'], name='training_usage_date_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='courtusage',
+            unique_together={('court', 'date', 'hour')},
+        ),
+        migrations.RunPython(build_usage, migrations.RunPython.noop),
+    ]
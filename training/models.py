@@ -1,9 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from profiles.models import PlayerProfile
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from datetime import datetime, timedelta, time
+from tennisapp.models import SnapshotModel
+from .occupancy import CourtOccupancy, get_active_index
 
 # ---------------- Tennis Court ----------------
 class TennisCourt(models.Model):
@@ -21,7 +24,33 @@ class TennisCourt(models.Model):
 
 
 # ---------------- Training Session ----------------
-class TrainingSession(models.Model):
+# Dropped-out participants that cancel a session
+AUTO_CANCEL_THRESHOLD = 3
+
+
+class TrainingSessionQuerySet(models.QuerySet):
+    # Range predicates on the indexed start_at / end_at columns
+    def upcoming(self, now=None):
+        return self.filter(start_at__gte=now or timezone.now())
+
+    def ended(self, now=None):
+        return self.filter(end_at__lte=now or timezone.now())
+
+    def cancellable_by_players(self, now=None):
+        """Sessions starting at least CANCELLATION_NOTICE from now."""
+        return self.filter(start_at__gte=(now or timezone.now()) + TrainingSession.CANCELLATION_NOTICE)
+
+    def for_listing(self):
+        """Join the court and prefetch participants with their player and user."""
+        return self.select_related('court').prefetch_related(
+            models.Prefetch(
+                'sessionparticipant_set',
+                queryset=SessionParticipant.objects.select_related('player__user'),
+            )
+        )
+
+
+class TrainingSession(SnapshotModel):
     # Use the same skill levels as PlayerProfile
     SKILL_LEVELS = [
         ('beginner', 'Beginner'),
@@ -65,6 +94,15 @@ class TrainingSession(models.Model):
     ]
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='scheduled')
 
+    # Aware datetimes derived from date/start_time/end_time on every write,
+    # so time-window queries are single indexed range predicates
+    start_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
+    end_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Participant counters, kept in step by SessionParticipant
+    active_count = models.PositiveIntegerField(default=0, editable=False)
+    canceled_count = models.PositiveIntegerField(default=0, editable=False)
+
     players = models.ManyToManyField(
         PlayerProfile,
         through='SessionParticipant',
@@ -74,8 +112,35 @@ class TrainingSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TrainingSessionQuerySet.as_manager()
+
+    # (court_id, date, start_time) as last read from / written to the database
+    _loaded_slot = None
+
+    # Maintained with F() updates, never written back from a stale instance
+    MAINTAINED_FIELDS = ('active_count', 'canceled_count')
+
     class Meta:
-        ordering = ['-date', '-start_time']
+        ordering = ['-date', '-start_time', '-id']
+        indexes = [
+            # Feed ordering, so keyset pages are index range scans
+            models.Index(fields=['-date', '-start_time', '-id'], name='training_feed_idx'),
+            # Lifecycle sweeps: "scheduled sessions that have ended"
+            models.Index(fields=['status', 'end_at'], name='training_status_end_at_idx'),
+            # Lifecycle sweeps: "sessions due for auto-cancel"
+            models.Index(
+                fields=['status'],
+                condition=models.Q(canceled_count__gte=AUTO_CANCEL_THRESHOLD),
+                name='training_autocancel_idx',
+            ),
+        ]
+
+    def take_snapshot(self):
+        self._loaded_slot = self.current_slot()
+
+    def current_slot(self):
+        values = self.__dict__
+        return (values.get('court_id'), values.get('date'), values.get('start_time'))
 
     # ---------------- Validation ----------------
     def clean(self):
@@ -83,11 +148,7 @@ class TrainingSession(models.Model):
 
         # Always auto-set end_time if missing
         if self.start_time and not self.end_time:
-            dt_start = datetime.combine(self.date, self.start_time)
-            dt_end = dt_start + timedelta(hours=1)
-            if dt_end.time() > time(22, 0):
-                dt_end = datetime.combine(self.date, time(22, 0))
-            self.end_time = dt_end.time()
+            self.end_time = self.default_end_time(self.date, self.start_time)
 
         # Validate max_players doesn't exceed 4
         if self.max_players > 4:
@@ -95,11 +156,10 @@ class TrainingSession(models.Model):
 
         # Only validate if both start & end exist
         if self.start_time and self.end_time:
-            session_start = timezone.make_aware(datetime.combine(self.date, self.start_time))
-            session_end = timezone.make_aware(datetime.combine(self.date, self.end_time))
+            self.sync_bounds()
 
             # 1. Cannot book past sessions (when creating new)
-            if session_start < now and not self.pk:
+            if self.start_at < now and not self.pk:
                 raise ValidationError("Cannot book a session in the past.")
 
             # 2. Allowed hours
@@ -109,22 +169,24 @@ class TrainingSession(models.Model):
                 raise ValidationError({"end_time": "End time must be between 09:00 and 22:00."})
 
             # 3. Duration must be 1h
-            duration_hours = (session_end - session_start).total_seconds() / 3600
+            duration_hours = (self.end_at - self.start_at).total_seconds() / 3600
             if duration_hours != 1:
                 raise ValidationError("Training session must be exactly 1 hour long.")
 
             # 4. No overlapping sessions on the same court
-            overlapping = TrainingSession.objects.filter(
-                court=self.court,
-                date=self.date,
-                start_time__lt=self.end_time,
-                end_time__gt=self.start_time
-            )
-            if self.pk:
-                overlapping = overlapping.exclude(pk=self.pk)
-            if overlapping.exists():
+            if self.court_has_conflict():
                 raise ValidationError("This court is already booked during this time.")
 
+    def court_has_conflict(self):
+        """
+        Check the court against other sessions and scheduled tournament
+        matches, through the active occupancy index or a one-day load.
+        """
+        index = get_active_index() or CourtOccupancy()
+        return bool(index.conflicts(
+            self.court_id, self.date, self.start_time, self.end_time, exclude_pk=self.pk
+        ))
+
     # ---------------- Save override ----------------
     def save(self, *args, **kwargs):
         # Ensure max_players doesn't exceed 4
@@ -133,55 +195,111 @@ class TrainingSession(models.Model):
             
         # Auto-set end_time before saving
         if self.start_time:
-            dt_start = datetime.combine(self.date, self.start_time)
-            dt_end = dt_start + timedelta(hours=1)
-            if dt_end.time() > time(22, 0):
-                dt_end = datetime.combine(self.date, time(22, 0))
-            self.end_time = dt_end.time()
+            self.end_time = self.default_end_time(self.date, self.start_time)
 
-        # Auto-complete sessions if already in the past
-        now = timezone.localtime()
-        
-        # FIX: Create timezone-aware datetime for comparison
-        session_start_naive = datetime.combine(self.date, self.start_time)
-        session_start = timezone.make_aware(session_start_naive)
-        session_end = session_start + timedelta(hours=1)
+        self.sync_bounds()
 
-        if self.status == 'scheduled' and session_end < now:
+        # Auto-complete sessions if already in the past
+        if self.status == 'scheduled' and self.end_at < timezone.now():
             self.status = 'completed'
 
         self.full_clean()
         super().save(*args, **kwargs)
 
     # ---------------- Helpers ----------------
+    CANCELLATION_NOTICE = timedelta(hours=24)
+
+    def sync_bounds(self):
+        """Derive start_at / end_at from the date and time columns."""
+        self.start_at = timezone.make_aware(datetime.combine(self.date, self.start_time))
+        if self.end_time:
+            self.end_at = timezone.make_aware(datetime.combine(self.date, self.end_time))
+        else:
+            self.end_at = self.start_at + timedelta(hours=1)
+
+    @staticmethod
+    def default_end_time(date, start_time):
+        """Sessions last one hour and never run past 22:00."""
+        dt_end = datetime.combine(date, start_time) + timedelta(hours=1)
+        if dt_end.time() > time(22, 0):
+            dt_end = datetime.combine(date, time(22, 0))
+        return dt_end.time()
+
     def duration(self):
         return (datetime.combine(self.date, self.end_time) - datetime.combine(self.date, self.start_time)).total_seconds() / 3600
 
     def __str__(self):
         return f"Session on {self.date} ({self.focus_area}) - {self.intended_level}"
 
+    AUTO_CANCEL_THRESHOLD = AUTO_CANCEL_THRESHOLD
+
     def check_auto_cancel(self):
-        canceled_count = self.sessionparticipant_set.filter(status='canceled').count()
-        if canceled_count >= 3 and self.status != 'canceled':
+        """Cancel the session once three participants have dropped out."""
+        if self.status == 'canceled':
+            return
+        updated = TrainingSession.objects.filter(
+            pk=self.pk, canceled_count__gte=self.AUTO_CANCEL_THRESHOLD
+        ).exclude(status='canceled').update(status='canceled', updated_at=timezone.now())
+        if updated:
+            from .signals import sessions_bulk_updated
             self.status = 'canceled'
-            self.save()
+            transaction.on_commit(
+                lambda: sessions_bulk_updated.send(
+                    sender=TrainingSession, session_ids=[self.pk], status='canceled'
+                )
+            )
 
     def add_player(self, player):
-        if self.players.count() >= self.max_players:
-            raise ValueError("Session is full")
-        SessionParticipant.objects.create(session=self, player=player)
+        """
+        Enroll a player, re-activating an earlier cancellation. The seat is
+        claimed with a conditional UPDATE on active_count, so concurrent joins
+        can never overbook the session.
+        """
+        participant = SessionParticipant.objects.filter(session=self, player=player).first()
+        if participant is None:
+            participant = SessionParticipant(session=self, player=player)
+        elif participant.status == 'active':
+            return participant
+        participant.session = self
+        participant.status = 'active'
+        participant.canceled_at = None
+        participant.save()
+        return participant
+
+    def join_waitlist(self, player):
+        """Queue a player for a seat in this session (first come, first served)."""
+        entry, _ = SessionWaitlistEntry.objects.get_or_create(session=self, player=player)
+        return entry
+
+    def promote_from_waitlist(self):
+        """
+        Give a free seat to the head of the waitlist. Costs a fixed number of
+        queries; returns the new participant, or None if nobody was promoted.
+        """
+        with transaction.atomic():
+            entry = (
+                self.waitlist.select_for_update()
+                .select_related('player')
+                .order_by('id')
+                .first()
+            )
+            if entry is None:
+                return None
+            try:
+                with transaction.atomic():
+                    entry.delete()
+                    return self.add_player(entry.player)
+            except ValueError:
+                return None
 
     def remove_player(self, player, by_admin=False):
         """Users can cancel only 24h before. Admin can cancel anytime."""
         try:
             participant = SessionParticipant.objects.get(session=self, player=player)
-            now = timezone.localtime()
-            
-            # FIX: Create timezone-aware datetime for comparison
-            session_start_naive = datetime.combine(self.date, self.start_time)
-            session_start = timezone.make_aware(session_start_naive)
-            
-            if by_admin or (session_start - now >= timedelta(hours=24)):
+            if self.start_at is None:
+                self.sync_bounds()
+
+            if by_admin or (self.start_at - timezone.now() >= self.CANCELLATION_NOTICE):
                 participant.cancel()
             else:
                 raise ValidationError("You can only cancel this session 24 hours before it starts.")
@@ -189,25 +307,22 @@ class TrainingSession(models.Model):
             pass
 
     def get_participant_status(self):
-        active = self.sessionparticipant_set.filter(status='active').select_related('player')
-        canceled = self.sessionparticipant_set.filter(status='canceled').select_related('player')
-        return {
-            'active': [p.player for p in active],
-            'canceled': [p.player for p in canceled]
-        }
+        status = {'active': [], 'canceled': []}
+        for participant in self.sessionparticipant_set.select_related('player'):
+            status[participant.status].append(participant.player)
+        return status
 
     def participant_summary(self):
-        status = self.get_participant_status()
         return {
-            'active_count': len(status['active']),
-            'canceled_count': len(status['canceled']),
-            'is_full': len(status['active']) >= self.max_players,
+            'active_count': self.active_count,
+            'canceled_count': self.canceled_count,
+            'is_full': self.active_count >= self.max_players,
             'is_canceled': self.status == 'canceled'
         }
 
 
 # ---------------- Session Participant ----------------
-class SessionParticipant(models.Model):
+class SessionParticipant(SnapshotModel):
     session = models.ForeignKey(TrainingSession, on_delete=models.CASCADE)
     player = models.ForeignKey(PlayerProfile, on_delete=models.CASCADE)
 
@@ -218,14 +333,108 @@ class SessionParticipant(models.Model):
     status = models.CharField(max_length=10, choices=PARTICIPANT_STATUS, default='active')
     canceled_at = models.DateTimeField(null=True, blank=True)
 
+    # Status as last read from / written to the database
+    _loaded_status = None
+
     class Meta:
         unique_together = ('session', 'player')
 
+    def take_snapshot(self):
+        self._loaded_status = self.__dict__.get('status')
+
+    def clean(self):
+        if self.status == 'active' and self._loaded_status != 'active' and self.session_id:
+            if self.session.active_count >= self.session.max_players:
+                raise ValidationError("Session is full")
+
+    @staticmethod
+    def counter_deltas(old_status, new_status):
+        """Changes to the session counters when a participant moves between statuses."""
+        deltas = {}
+        for status, field in (('active', 'active_count'), ('canceled', 'canceled_count')):
+            delta = (new_status == status) - (old_status == status)
+            if delta:
+                deltas[field] = delta
+        return deltas
+
+    def apply_counter_deltas(self, deltas):
+        """
+        Apply counter changes to the session row with F() expressions. Taking
+        a seat is conditional on the session not being full.
+        """
+        if not deltas:
+            return
+        seats = TrainingSession.objects.filter(pk=self.session_id)
+        claims_seat = deltas.get('active_count', 0) > 0
+        if claims_seat:
+            seats = seats.filter(active_count__lt=F('max_players'))
+        updated = seats.update(**{field: F(field) + delta for field, delta in deltas.items()})
+        if claims_seat and not updated:
+            raise ValueError("Session is full")
+
+    def save(self, *args, **kwargs):
+        deltas = self.counter_deltas(self._loaded_status, self.status)
+        with transaction.atomic():
+            self.apply_counter_deltas(deltas)
+            super().save(*args, **kwargs)
+
+        if deltas and self._meta.get_field('session').is_cached(self):
+            for field, delta in deltas.items():
+                setattr(self.session, field, getattr(self.session, field) + delta)
+
     def cancel(self):
-        self.status = 'canceled'
-        self.canceled_at = timezone.now()
-        self.save()
-        self.session.check_auto_cancel()
+        """Cancel this place and hand it to the head of the waitlist."""
+        with transaction.atomic():
+            was_active = self._loaded_status == 'active'
+            self.status = 'canceled'
+            self.canceled_at = timezone.now()
+            self.save()
+            session = self.session
+            session.check_auto_cancel()
+            if was_active and session.status != 'canceled':
+                session.promote_from_waitlist()
+
+    def __str__(self):
+        return f"{self.player.user.get_full_name()} - {self.session}"
+
+
+# ---------------- Court Usage Rollup ----------------
+class CourtUsage(models.Model):
+    """Booked sessions and participants per court and hour, see training.usage."""
+    court = models.ForeignKey(TennisCourt, on_delete=models.CASCADE, related_name='usage')
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    booked_sessions = models.PositiveIntegerField(default=0)
+    participants = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('court', 'date', 'hour')
+        indexes = [
+            models.Index(fields=['date', 'court'], name='training_usage_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.court} {self.date} {self.hour:02d}:00"
+
+
+# ---------------- Session Waitlist ----------------
+class SessionWaitlistEntry(models.Model):
+    session = models.ForeignKey(TrainingSession, on_delete=models.CASCADE, related_name='waitlist')
+    player = models.ForeignKey(PlayerProfile, on_delete=models.CASCADE, related_name='session_waitlist')
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('session', 'player')
+        ordering = ['session', 'id']
+        indexes = [
+            # FIFO order within a session: head lookup and position counts
+            models.Index(fields=['session', 'id'], name='training_waitlist_fifo_idx'),
+        ]
+        verbose_name_plural = "Session waitlist entries"
+
+    def position(self):
+        """1-based place in the queue."""
+        return SessionWaitlistEntry.objects.filter(session_id=self.session_id, id__lte=self.id).count()
 
     def __str__(self):
-        return f"{self.player.user.get_full_name()} - {self.session}"
\ No newline at end of file
+        return f"{self.player} waiting for {self.session}"
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+In-memory court occupancy index used for training session overlap checks.
+
+Sessions live inside the 08:00-22:00 window, so each (court, day) pair can
+be summarised by a small bitmap with one bit per opening hour. The bitmap
+answers most "is this court free?" questions on its own; the exact session
+intervals are only compared when two bitmaps share an hour.
+
+Scheduled tournament matches occupy their court too; they are loaded with
+the sessions under ('match', pk) keys.
+
+An index is loaded once per request or batch (two queries per set of
+dates) and kept in step with session saves and deletes through the
+training signals.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import time, timedelta
+from django.utils import timezone
+
+OPENING_HOUR = 8
+CLOSING_HOUR = 22
+
+_state = threading.local()
+
+
+def hour_mask(start_time, end_time):
+    """Return the bitmap of opening hours touched by [start_time, end_time)."""
+    first = max(start_time.hour, OPENING_HOUR)
+    last = end_time.hour
+    if (end_time.minute, end_time.second, end_time.microsecond) == (0, 0, 0):
+        last -= 1
+    last = min(last, CLOSING_HOUR - 1)
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << (first - OPENING_HOUR)
+
+
+class CourtOccupancy:
+    """Per-court, per-day occupancy bitmaps plus the intervals behind them."""
+
+    def __init__(self):
+        self._masks = {}       # (court_id, date) -> int bitmap
+        self._intervals = {}   # (court_id, date) -> {pk: (start, end)}
+        self._keys = {}        # pk -> (court_id, date)
+        self._loaded_dates = set()
+
+    # ---------------- Loading ----------------
+    def load(self, dates):
+        """Load every session on the given dates in a single query."""
+        from .models import TrainingSession
+
+        missing = set(dates) - self._loaded_dates
+        if not missing:
+            return
+        rows = TrainingSession.objects.filter(date__in=missing)
+        self._ingest(rows)
+        self._ingest_matches({'scheduled_at__date__in': missing})
+        self._loaded_dates |= missing
+
+    def load_range(self, start_date, end_date):
+        """Load every session between start_date and end_date (inclusive)."""
+        from .models import TrainingSession
+
+        rows = TrainingSession.objects.filter(date__range=(start_date, end_date))
+        self._ingest(rows)
+        self._ingest_matches({'scheduled_at__date__range': (start_date, end_date)})
+        day = start_date
+        while day <= end_date:
+            self._loaded_dates.add(day)
+            day += timedelta(days=1)
+
+    def _ingest(self, queryset):
+        rows = queryset.exclude(end_time=None).values_list(
+            'pk', 'court_id', 'date', 'start_time', 'end_time'
+        )
+        for pk, court_id, date, start_time, end_time in rows:
+            self._store(pk, court_id, date, start_time, end_time)
+
+    def _ingest_matches(self, lookups):
+        """
+        Scheduled matches, holding their court for the slot they were booked
+        for (the standard match length if none was recorded).
+        """
+        from tournaments.models import Match
+        from tournaments.scheduling import MATCH_HOURS
+
+        rows = Match.objects.filter(**lookups).exclude(court=None).values_list(
+            'pk', 'court_id', 'scheduled_at', 'duration_hours'
+        )
+        for pk, court_id, scheduled_at, duration_hours in rows:
+            start = timezone.localtime(scheduled_at)
+            end = time(min(start.hour + (duration_hours or MATCH_HOURS), CLOSING_HOUR))
+            self._store(('match', pk), court_id, start.date(), start.time(), end)
+
+    # ---------------- Maintenance ----------------
+    def _store(self, pk, court_id, date, start_time, end_time):
+        self.discard(pk)
+        key = (court_id, date)
+        self._intervals.setdefault(key, {})[pk] = (start_time, end_time)
+        self._masks[key] = self._masks.get(key, 0) | hour_mask(start_time, end_time)
+        self._keys[pk] = key
+
+    def add(self, session):
+        """Record a saved session. Dates that were never loaded are ignored."""
+        if session.date not in self._loaded_dates or not session.end_time:
+            self.discard(session.pk)
+            return
+        self._store(session.pk, session.court_id, session.date, session.start_time, session.end_time)
+
+    def discard(self, pk):
+        key = self._keys.pop(pk, None)
+        if key is None:
+            return
+        intervals = self._intervals[key]
+        del intervals[pk]
+        mask = 0
+        for start_time, end_time in intervals.values():
+            mask |= hour_mask(start_time, end_time)
+        self._masks[key] = mask
+
+    # ---------------- Lookups ----------------
+    def conflicts(self, court_id, date, start_time, end_time, exclude_pk=None):
+        """
+        Return the keys of sessions (pks) and matches (('match', pk))
+        overlapping the given slot on a court.
+        """
+        self.load([date])
+        key = (court_id, date)
+        if not self._masks.get(key, 0) & hour_mask(start_time, end_time):
+            return []
+        return [
+            pk for pk, (other_start, other_end) in self._intervals[key].items()
+            if pk != exclude_pk and other_start < end_time and other_end > start_time
+        ]
+
+    def is_free(self, court_id, date, start_time, end_time, exclude_pk=None):
+        return not self.conflicts(court_id, date, start_time, end_time, exclude_pk)
+
+    def reserve(self, court_id, date, start_time, end_time, token):
+        """Mark a slot as taken by a not-yet-saved session (bulk paths)."""
+        self.load([date])
+        self._store(token, court_id, date, start_time, end_time)
+
+
+def get_active_index():
+    """Return the occupancy index bound to the current request/batch, if any."""
+    return getattr(_state, 'index', None)
+
+
+@contextmanager
+def occupancy_index(index=None):
+    """
+    Bind an occupancy index for the duration of the block. Nested blocks
+    reuse the outer index so a whole request shares a single load.
+    """
+    previous = get_active_index()
+    if previous is not None and index is None:
+        yield previous
+        return
+    _state.index = index or CourtOccupancy()
+    try:
+        yield _state.index
+    finally:
+        _state.index = previous
@@ -0,0 +1,117 @@
+"""
+Weekly recurring training sessions.
+
+A recurrence rule ("Tuesdays 18:00 on Court 3, intermediate") is expanded
+into one occurrence per week, every occurrence is checked against the court
+occupancy index in a single pass, and the valid ones are inserted together
+with bulk_create inside one transaction.
+"""
+from datetime import datetime, time, timedelta
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from .models import TrainingSession
+from .occupancy import CourtOccupancy, get_active_index
+from .usage import slot_of, refresh_slots
+
+
+def weekly_dates(weekday, start_date, end_date):
+    """Every date between start_date and end_date falling on weekday (0=Monday)."""
+    day = start_date + timedelta(days=(weekday - start_date.weekday()) % 7)
+    while day <= end_date:
+        yield day
+        day += timedelta(weeks=1)
+
+
+def build_template(**fields):
+    """Validate the fields shared by every occurrence once, up front."""
+    template = TrainingSession(**fields)
+    template.end_time = TrainingSession.default_end_time(template.date, template.start_time)
+    template.clean_fields()
+    if not (time(8, 0) <= template.start_time <= time(21, 0)):
+        raise ValidationError({"start_time": "Start time must be between 08:00 and 21:00."})
+    return template
+
+
+def plan_occurrences(templates, end_date, index=None):
+    """
+    Expand each (template, weekday, first_date) rule up to end_date.
+
+    Returns (sessions, conflicts): unsaved sessions that can be booked, and
+    one report per occurrence that cannot. Accepted occurrences are reserved
+    in the index so later templates in the same batch see them.
+    """
+    if index is None:
+        index = get_active_index() or CourtOccupancy()
+    templates = list(templates)
+    if not templates:
+        return [], []
+    index.load_range(min(first_date for _, _, first_date in templates), end_date)
+    now = timezone.localtime()
+
+    sessions, conflicts = [], []
+    for template, weekday, first_date in templates:
+        for day in weekly_dates(weekday, first_date, end_date):
+            starts_at = timezone.make_aware(datetime.combine(day, template.start_time))
+            if starts_at < now:
+                conflicts.append({"date": day, "reason": "Cannot book a session in the past."})
+                continue
+            clashes = index.conflicts(template.court_id, day, template.start_time, template.end_time)
+            if clashes:
+                # Clashes with occurrences planned earlier in this batch carry no id
+                conflicts.append({
+                    "date": day,
+                    "reason": "This court is already booked during this time.",
+                    "conflicting_sessions": [key for key in clashes if not isinstance(key, tuple)],
+                    "conflicting_matches": [key[1] for key in clashes if isinstance(key, tuple) and key[0] == 'match'],
+                })
+                continue
+            session = TrainingSession(
+                court_id=template.court_id,
+                date=day,
+                start_time=template.start_time,
+                end_time=template.end_time,
+                focus_area=template.focus_area,
+                notes=template.notes,
+                intensity=template.intensity,
+                max_players=template.max_players,
+                intended_level=template.intended_level,
+            )
+            session.sync_bounds()
+            index.reserve(session.court_id, day, session.start_time, session.end_time, token=planned_key(session))
+            sessions.append(session)
+    return sessions, conflicts
+
+
+def planned_key(session):
+    """
+    Occupancy key of a planned, unsaved occurrence. Reserved slots never
+    overlap, so court and start are unique within an index.
+    """
+    return ('planned', session.court_id, session.date, session.start_time)
+
+
+def create_occurrences(sessions):
+    """Insert planned sessions in a single transaction."""
+    with transaction.atomic():
+        created = TrainingSession.objects.bulk_create(sessions)
+        refresh_slots(slot_of(s.court_id, s.date, s.start_time) for s in created)
+
+    # Move the reservations in a request-bound index over to the real pks
+    # (backends that don't return pks from bulk inserts keep the planned keys)
+    index = get_active_index()
+    if index is not None:
+        for session in created:
+            if session.pk is not None:
+                index.discard(planned_key(session))
+                index.add(session)
+    return created
+
+
+def create_recurring_sessions(weekday, start_date, end_date, dry_run=False, **fields):
+    """Plan and book a weekly recurrence rule. Returns (created, conflicts)."""
+    template = build_template(date=start_date, **fields)
+    sessions, conflicts = plan_occurrences([(template, weekday, start_date)], end_date)
+    if not dry_run:
+        sessions = create_occurrences(sessions)
+    return sessions, conflicts
@@ -1,20 +1,104 @@
 from rest_framework import serializers
-from profiles.models import PlayerProfile
-from .models import TrainingSession
+from .models import TrainingSession, TennisCourt, SessionParticipant
 from profiles.serializers import PlayerProfileSerializer
 
-class TrainingSessionSerializer(serializers.ModelSerializer):
+
+class TennisCourtSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TennisCourt
+        fields = '__all__'
+
+
+class SessionParticipantSerializer(serializers.ModelSerializer):
     player = PlayerProfileSerializer(read_only=True)
-    player_id = serializers.PrimaryKeyRelatedField(
-        queryset=PlayerProfile.objects.all(),
-        source='player',
-        write_only=True
+
+    class Meta:
+        model = SessionParticipant
+        fields = ['id', 'player', 'status', 'canceled_at']
+
+
+class TrainingSessionSerializer(serializers.ModelSerializer):
+    """
+    Expects the queryset from TrainingSession.objects.for_listing() (court
+    joined, participants with player and user prefetched) so a page costs a
+    fixed number of queries.
+    """
+    court = TennisCourtSerializer(read_only=True)
+    court_id = serializers.PrimaryKeyRelatedField(
+        queryset=TennisCourt.objects.all(),
+        source='court',
+        write_only=True,
+        required=False,
+        allow_null=True
     )
+    participants = SessionParticipantSerializer(source='sessionparticipant_set', many=True, read_only=True)
+    participant_summary = serializers.ReadOnlyField()
     duration = serializers.ReadOnlyField()
     
     class Meta:
         model = TrainingSession
-        fields = '__all__'
+        exclude = ['players']
 
 class TrainingSessionDetailSerializer(TrainingSessionSerializer):
-    player = PlayerProfileSerializer(read_only=True)
\ No newline at end of file
+    pass
+
+
+class TrainingSessionSummarySerializer(serializers.ModelSerializer):
+    """A session with its court and counters only; needs just select_related('court')."""
+    court = TennisCourtSerializer(read_only=True)
+    participant_summary = serializers.ReadOnlyField()
+
+    class Meta:
+        model = TrainingSession
+        fields = [
+            'id', 'court', 'date', 'start_time', 'end_time', 'focus_area', 'intensity',
+            'max_players', 'intended_level', 'status', 'participant_summary',
+        ]
+
+
+class RecurringSessionSerializer(serializers.Serializer):
+    WEEKDAYS = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    MAX_RANGE_DAYS = 366
+
+    court = serializers.PrimaryKeyRelatedField(queryset=TennisCourt.objects.all())
+    weekday = serializers.ChoiceField(choices=WEEKDAYS)
+    start_time = serializers.TimeField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    intended_level = serializers.ChoiceField(choices=TrainingSession.SKILL_LEVELS, default='intermediate')
+    focus_area = serializers.CharField(max_length=100)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    intensity = serializers.IntegerField(min_value=1, max_value=10)
+    max_players = serializers.IntegerField(min_value=1, max_value=4, default=4)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError({"end_date": "End date must be on or after the start date."})
+        if (data['end_date'] - data['start_date']).days > self.MAX_RANGE_DAYS:
+            raise serializers.ValidationError({"end_date": "Recurrences can span at most one year."})
+        return data
+
+
+class CourtUtilizationQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    court = serializers.PrimaryKeyRelatedField(queryset=TennisCourt.objects.all(), required=False)
+    surface_type = serializers.ChoiceField(
+        choices=TennisCourt._meta.get_field('surface_type').choices, required=False
+    )
+    # Missing query params read as False otherwise
+    indoor = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+    def validate(self, data):
+        if data.get('start') and data.get('end') and data['end'] < data['start']:
+            raise serializers.ValidationError({"end": "End date must be on or after the start date."})
+        return data
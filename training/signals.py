@@ -0,0 +1,98 @@
+import threading
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import Signal, receiver
+from .models import TrainingSession, SessionParticipant, SessionWaitlistEntry
+from .occupancy import get_active_index
+from .usage import slot_of, refresh_slots, refresh_sessions
+
+# Sent once after a set-based status change (bulk cancel, lifecycle sweep)
+# commits, with session_ids=[...] and status=<new status>. Receivers handle
+# side effects for the whole batch instead of per-row save() hooks.
+sessions_bulk_updated = Signal()
+
+# Sessions whose delete is in progress: their participants go with them in
+# the same cascade, so per-participant bookkeeping is skipped
+_deleting = threading.local()
+
+
+def session_is_being_deleted(session_id):
+    return session_id in getattr(_deleting, 'sessions', ())
+
+
+@receiver(pre_delete, sender=TrainingSession)
+def mark_session_deleting(sender, instance, **kwargs):
+    if not hasattr(_deleting, 'sessions'):
+        _deleting.sessions = set()
+    _deleting.sessions.add(instance.pk)
+
+
+@receiver(post_delete, sender=TrainingSession)
+def unmark_session_deleting(sender, instance, **kwargs):
+    getattr(_deleting, 'sessions', set()).discard(instance.pk)
+
+
+# ---------------- Occupancy index ----------------
+@receiver(post_save, sender=TrainingSession)
+def track_session_occupancy(sender, instance, **kwargs):
+    index = get_active_index()
+    if index is not None:
+        index.add(instance)
+
+
+@receiver(post_delete, sender=TrainingSession)
+def release_session_occupancy(sender, instance, **kwargs):
+    index = get_active_index()
+    if index is not None:
+        index.discard(instance.pk)
+
+
+# ---------------- Seat counters and waitlist ----------------
+@receiver(post_delete, sender=SessionParticipant)
+def release_participant_seat(sender, instance, **kwargs):
+    if session_is_being_deleted(instance.session_id):
+        return
+    instance.apply_counter_deltas(instance.counter_deltas(instance._loaded_status, None))
+    if instance._loaded_status == 'active' and instance.session.status == 'scheduled':
+        instance.session.promote_from_waitlist()
+
+
+@receiver(post_save, sender=TrainingSession)
+def close_session_waitlist(sender, instance, **kwargs):
+    if instance.status != 'scheduled':
+        instance.waitlist.all().delete()
+
+
+@receiver(sessions_bulk_updated, sender=TrainingSession)
+def close_bulk_waitlists(sender, session_ids, status, **kwargs):
+    SessionWaitlistEntry.objects.filter(session_id__in=session_ids).delete()
+
+
+# ---------------- Court usage rollup ----------------
+@receiver(post_save, sender=TrainingSession)
+def refresh_session_usage(sender, instance, **kwargs):
+    # post_save runs before save() records the new slot, so _loaded_slot is
+    # still the slot the session was moved away from (if any)
+    old_slot = slot_of(*instance._loaded_slot) if instance._loaded_slot else None
+    refresh_slots([old_slot, slot_of(*instance.current_slot())])
+
+
+@receiver(post_delete, sender=TrainingSession)
+def release_session_usage(sender, instance, **kwargs):
+    refresh_slots([slot_of(*instance.current_slot())])
+
+
+@receiver(post_save, sender=SessionParticipant)
+@receiver(post_delete, sender=SessionParticipant)
+def refresh_participant_usage(sender, instance, **kwargs):
+    if session_is_being_deleted(instance.session_id):
+        return
+    if instance._meta.get_field('session').is_cached(instance):
+        refresh_slots([slot_of(*instance.session.current_slot())])
+    else:
+        refresh_sessions([instance.session_id])
+
+
+@receiver(sessions_bulk_updated, sender=TrainingSession)
+def refresh_bulk_usage(sender, session_ids, status, **kwargs):
+    if status == 'canceled':
+        refresh_sessions(session_ids)
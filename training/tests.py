@@ -1,3 +1,663 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from profiles.models import PlayerProfile
+from .lifecycle import cancel_sessions, sweep_sessions
+from .models import TennisCourt, TrainingSession, SessionParticipant, SessionWaitlistEntry, CourtUsage
+from .occupancy import hour_mask, occupancy_index
+from .recurrence import build_template, create_recurring_sessions, plan_occurrences
+from .signals import sessions_bulk_updated
+from .usage import rebuild_usage
 
-# Create your tests here.
+
+class TrainingSessionQueryBudgetTests(APITestCase):
+    """The session endpoints cost a fixed number of queries per page."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', password='pass', is_staff=True)
+        self.client.force_authenticate(self.staff)
+        self.court = TennisCourt.objects.create(name='Court 1')
+        self.players = [
+            PlayerProfile.objects.create(
+                user=User.objects.create_user(username=f'player{i}', password='pass'),
+                date_of_birth=date(2000, 1, 1),
+                skill_level='intermediate',
+                profile_image=None,
+            )
+            for i in range(4)
+        ]
+        self.next_slot = 8
+
+    def create_sessions(self, count, participants):
+        day = date.today() + timedelta(days=7)
+        for _ in range(count):
+            session = TrainingSession.objects.create(
+                court=self.court,
+                date=day,
+                start_time=time(self.next_slot, 0),
+                focus_area='Serve',
+                intensity=5,
+            )
+            self.next_slot += 1
+            for player in self.players[:participants]:
+                session.add_player(player)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_list_query_count_is_independent_of_page_and_participants(self):
+        self.create_sessions(1, participants=1)
+        small, data = self.count_queries('/api/training/')
+        self.assertEqual(len(data['results']), 1)
+
+        self.create_sessions(9, participants=4)
+        large, data = self.count_queries('/api/training/')
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(len(data['results'][0]['participants']), 4)
+
+        self.assertEqual(small, large)
+
+    def test_cursor_page_query_count_is_fixed(self):
+        self.create_sessions(2, participants=1)
+        small, _ = self.count_queries('/api/training/?cursor=')
+
+        self.create_sessions(10, participants=4)
+        large, data = self.count_queries('/api/training/?cursor=')
+        self.assertEqual(len(data['results']), 10)
+
+        self.assertEqual(small, large)
+
+    def test_detail_query_count_is_independent_of_participants(self):
+        self.create_sessions(1, participants=1)
+        self.create_sessions(1, participants=4)
+        few, many = TrainingSession.objects.order_by('start_time')
+
+        few_count, _ = self.count_queries(f'/api/training/{few.pk}/')
+        many_count, data = self.count_queries(f'/api/training/{many.pk}/')
+
+        self.assertEqual(len(data['participants']), 4)
+        self.assertEqual(data['participant_summary']['active_count'], 4)
+        self.assertEqual(few_count, many_count)
+
+    def test_players_only_see_their_sessions(self):
+        self.create_sessions(1, participants=1)
+        self.create_sessions(1, participants=0)
+        self.client.force_authenticate(self.players[0].user)
+
+        _, data = self.count_queries('/api/training/')
+
+        self.assertEqual(data['count'], 1)
+
+
+class CourtOccupancyTests(TestCase):
+    """Overlap checks answered from the in-memory index."""
+
+    def setUp(self):
+        self.court = TennisCourt.objects.create(name='Court 1')
+        self.day = date.today() + timedelta(days=7)
+        self.session = TrainingSession.objects.create(
+            court=self.court, date=self.day, start_time=time(10, 0), focus_area='Serve', intensity=5,
+        )
+
+    def test_hour_mask(self):
+        self.assertEqual(hour_mask(time(8, 0), time(9, 0)), 0b1)
+        self.assertEqual(hour_mask(time(10, 0), time(11, 30)), 0b1100)
+        self.assertEqual(hour_mask(time(6, 0), time(8, 0)), 0)
+
+    def test_lookups_share_one_load(self):
+        with occupancy_index() as index, CaptureQueriesContext(connection) as queries:
+            self.assertEqual(index.conflicts(self.court.pk, self.day, time(10, 30), time(11, 30)), [self.session.pk])
+            self.assertEqual(index.conflicts(self.court.pk, self.day, time(11, 0), time(12, 0)), [])
+            self.assertTrue(index.is_free(self.court.pk, self.day, time(10, 0), time(11, 0), exclude_pk=self.session.pk))
+        # Sessions and scheduled matches, once
+        self.assertEqual(len(queries), 2)
+
+    def test_index_follows_saves_and_deletes(self):
+        clash = TrainingSession(court=self.court, date=self.day, start_time=time(10, 0), focus_area='Volley', intensity=5)
+        with occupancy_index() as index:
+            index.load([self.day])
+            with self.assertRaises(ValidationError):
+                clash.save()
+            self.session.delete()
+            clash.save()
+            self.assertEqual(index.conflicts(self.court.pk, self.day, time(10, 0), time(11, 0)), [clash.pk])
+
+
+class RecurringSessionTests(TestCase):
+    """Weekly rules are booked in one pass, skipping occurrences that clash."""
+
+    def setUp(self):
+        self.court = TennisCourt.objects.create(name='Court 1')
+        today = date.today()
+        # A Monday at least a week away
+        self.start = today + timedelta(days=7 + (7 - today.weekday()) % 7)
+        self.end = self.start + timedelta(weeks=3)
+        self.clash = TrainingSession.objects.create(
+            court=self.court, date=self.start + timedelta(weeks=1), start_time=time(18, 30),
+            focus_area='Match play', intensity=5,
+        )
+
+    def book(self, dry_run=False):
+        return create_recurring_sessions(
+            weekday=0, start_date=self.start, end_date=self.end, dry_run=dry_run,
+            court=self.court, start_time=time(18, 0), focus_area='Serve', intensity=5,
+        )
+
+    def test_occurrences_are_created_and_conflicts_skipped(self):
+        created, conflicts = self.book()
+
+        self.assertEqual(
+            [session.date for session in created],
+            [self.start, self.start + timedelta(weeks=2), self.start + timedelta(weeks=3)],
+        )
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['date'], self.clash.date)
+        self.assertEqual(conflicts[0]['conflicting_sessions'], [self.clash.pk])
+        self.assertEqual(TrainingSession.objects.filter(focus_area='Serve').count(), 3)
+
+    def test_clashes_within_a_batch_report_no_session_ids(self):
+        templates = [
+            (build_template(date=self.start, court=self.court, start_time=time(9, 0), focus_area=focus, intensity=5),
+             0, self.start)
+            for focus in ('Serve', 'Volley')
+        ]
+        sessions, conflicts = plan_occurrences(templates, self.end)
+
+        self.assertEqual({s.focus_area for s in sessions}, {'Serve'})
+        self.assertEqual(len(conflicts), 4)
+        for conflict in conflicts:
+            self.assertEqual((conflict['conflicting_sessions'], conflict['conflicting_matches']), ([], []))
+
+    def test_dry_run_books_nothing(self):
+        created, conflicts = self.book(dry_run=True)
+
+        self.assertEqual((len(created), len(conflicts)), (3, 1))
+        self.assertFalse(TrainingSession.objects.filter(focus_area='Serve').exists())
+
+    def test_repeat_weekly_admin_action(self):
+        admin = User.objects.create_superuser(username='admin', password='pass')
+        self.client.force_login(admin)
+        template = TrainingSession.objects.create(
+            court=self.court, date=self.start, start_time=time(18, 0), focus_area='Serve', intensity=5,
+        )
+        url = '/admin/training/trainingsession/'
+        action = {'action': 'repeat_weekly', '_selected_action': [template.pk]}
+
+        self.client.post(url, action)
+        self.assertEqual(TrainingSession.objects.filter(focus_area='Serve').count(), 1)
+
+        response = self.client.post(url, dict(action, repeat_until=self.end.isoformat()))
+        self.assertEqual(
+            sorted(TrainingSession.objects.filter(focus_area='Serve').values_list('date', flat=True)),
+            [self.start, self.start + timedelta(weeks=2), self.start + timedelta(weeks=3)],
+        )
+        messages = [str(message) for message in get_messages(response.wsgi_request)]
+        self.assertIn('2 session(s) created.', messages)
+        self.assertTrue(any('1 occurrence(s) skipped' in message for message in messages))
+
+
+def make_players(count, prefix='player'):
+    return [
+        PlayerProfile.objects.create(
+            user=User.objects.create_user(username=f'{prefix}{i}', password='pass'),
+            date_of_birth=date(2000, 1, 1),
+            skill_level='intermediate',
+            profile_image=None,
+        )
+        for i in range(count)
+    ]
+
+
+def make_session(court, start_hour=10, days_ahead=7, **fields):
+    return TrainingSession.objects.create(
+        court=court, date=date.today() + timedelta(days=days_ahead), start_time=time(start_hour, 0),
+        focus_area='Serve', intensity=5, **fields
+    )
+
+
+class SessionEnrollmentTests(TestCase):
+    """Seats are claimed with a conditional update on the stored counter."""
+
+    def setUp(self):
+        self.session = make_session(TennisCourt.objects.create(name='Court 1'), max_players=2)
+        self.players = make_players(3)
+
+    def test_full_session_rejects_a_join(self):
+        first, second, third = self.players
+        self.session.add_player(first)
+        self.session.add_player(second)
+
+        with self.assertRaises(ValueError):
+            self.session.add_player(third)
+        self.assertFalse(SessionParticipant.objects.filter(player=third).exists())
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.active_count, 2)
+
+    def test_canceled_participant_is_reactivated(self):
+        player = self.players[0]
+        participant = self.session.add_player(player)
+        self.session.remove_player(player, by_admin=True)
+
+        rejoined = self.session.add_player(player)
+        self.assertEqual(rejoined.pk, participant.pk)
+        self.assertEqual((rejoined.status, rejoined.canceled_at), ('active', None))
+        self.assertEqual(SessionParticipant.objects.filter(session=self.session).count(), 1)
+
+    def test_counters_follow_cancel_and_rejoin(self):
+        first, second, _ = self.players
+        self.session.add_player(first)
+        self.session.add_player(second)
+        self.session.remove_player(first, by_admin=True)
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.active_count, self.session.canceled_count), (1, 1))
+
+        self.session.add_player(first)
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.active_count, self.session.canceled_count), (2, 0))
+
+    def test_rejoining_a_full_session_is_rejected(self):
+        first, second, third = self.players
+        self.session.add_player(first)
+        self.session.add_player(second)
+        self.session.remove_player(first, by_admin=True)
+        self.session.add_player(third)
+
+        with self.assertRaises(ValueError):
+            self.session.add_player(first)
+        self.assertEqual(SessionParticipant.objects.get(player=first).status, 'canceled')
+
+
+class SessionCounterTests(TestCase):
+    """active_count / canceled_count stay in step with the participant rows."""
+
+    def setUp(self):
+        self.session = make_session(TennisCourt.objects.create(name='Court 1'))
+        self.players = make_players(3)
+
+    def counters(self):
+        self.session.refresh_from_db()
+        return self.session.active_count, self.session.canceled_count
+
+    def test_counters_follow_save_cancel_and_delete(self):
+        participants = [self.session.add_player(player) for player in self.players]
+        self.assertEqual(self.counters(), (3, 0))
+
+        participants[0].cancel()
+        self.assertEqual(self.counters(), (2, 1))
+
+        participants[0].delete()
+        participants[1].delete()
+        self.assertEqual(self.counters(), (1, 0))
+
+    def test_session_save_never_writes_stale_counters(self):
+        stale = TrainingSession.objects.get(pk=self.session.pk)
+        self.session.add_player(self.players[0])
+
+        stale.notes = 'Bring extra balls'
+        stale.save()
+        self.assertEqual(self.counters(), (1, 0))
+
+    def test_rebuild_command_fixes_drifted_counters(self):
+        self.session.add_player(self.players[0])
+        self.session.add_player(self.players[1]).cancel()
+        TrainingSession.objects.filter(pk=self.session.pk).update(active_count=4, canceled_count=0)
+
+        out = StringIO()
+        call_command('rebuild_session_counters', '--dry-run', stdout=out)
+        self.assertIn('1 session(s) with drifted counters would be fixed', out.getvalue())
+        self.assertEqual(self.counters(), (4, 0))
+
+        call_command('rebuild_session_counters', stdout=out)
+        self.assertEqual(self.counters(), (1, 1))
+
+
+class SessionLifecycleTests(TestCase):
+    """Set-based status transitions."""
+
+    def setUp(self):
+        court = TennisCourt.objects.create(name='Court 1')
+        self.sessions = [make_session(court, start_hour=hour) for hour in (9, 10, 11)]
+        self.players = make_players(2)
+        self.notified = []
+        sessions_bulk_updated.connect(self.record, sender=TrainingSession)
+        self.addCleanup(sessions_bulk_updated.disconnect, self.record, sender=TrainingSession)
+
+    def record(self, session_ids, status, **kwargs):
+        self.notified.append((status, sorted(session_ids)))
+
+    def statuses(self):
+        return list(TrainingSession.objects.order_by('start_time').values_list('status', flat=True))
+
+    def test_sweep_cancels_and_completes_due_sessions(self):
+        ended, dropped, upcoming = self.sessions
+        TrainingSession.objects.filter(pk=ended.pk).update(end_at=timezone.now() - timedelta(hours=1))
+        TrainingSession.objects.filter(pk=dropped.pk).update(canceled_count=3)
+
+        self.assertEqual(sweep_sessions(dry_run=True), {'canceled': [dropped.pk], 'completed': [ended.pk]})
+        self.assertEqual(self.statuses(), ['scheduled'] * 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = sweep_sessions(batch_size=1)
+        self.assertEqual(result, {'canceled': [dropped.pk], 'completed': [ended.pk]})
+        self.assertEqual(self.statuses(), ['completed', 'canceled', 'scheduled'])
+        self.assertEqual(self.notified, [('canceled', [dropped.pk]), ('completed', [ended.pk])])
+
+    def test_sweep_rechecks_rows_that_changed_after_the_read(self):
+        dropped = self.sessions[0]
+        TrainingSession.objects.filter(pk=dropped.pk).update(canceled_count=3)
+
+        class Interleaved:
+            """Let a participant rejoin between the sweep's read and its write."""
+            on_commit = staticmethod(transaction.on_commit)
+
+            @staticmethod
+            def atomic():
+                TrainingSession.objects.filter(pk=dropped.pk).update(canceled_count=2)
+                return transaction.atomic()
+
+        with mock.patch('training.lifecycle.transaction', Interleaved):
+            result = sweep_sessions()
+        self.assertEqual(result['canceled'], [])
+        self.assertEqual(self.statuses()[0], 'scheduled')
+
+    def test_cancel_sessions_cancels_participants_in_bulk(self):
+        first, second, untouched = self.sessions
+        for player in self.players:
+            first.add_player(player)
+        second.add_player(self.players[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            canceled = cancel_sessions(TrainingSession.objects.filter(pk__in=[first.pk, second.pk]))
+        self.assertEqual(sorted(canceled), sorted([first.pk, second.pk]))
+        self.assertEqual(self.statuses(), ['canceled', 'canceled', 'scheduled'])
+        first.refresh_from_db()
+        self.assertEqual((first.active_count, first.canceled_count), (0, 2))
+        self.assertFalse(SessionParticipant.objects.filter(status='active').exists())
+        self.assertFalse(SessionParticipant.objects.filter(canceled_at=None).exists())
+        self.assertEqual(self.notified, [('canceled', sorted(canceled))])
+
+        # Already canceled sessions are left alone
+        self.assertEqual(cancel_sessions(TrainingSession.objects.all()), [untouched.pk])
+
+
+class CancelSessionsActionTests(TestCase):
+    """The admin cancel action costs the same statements for any selection."""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser(username='admin', password='pass'))
+        self.court = TennisCourt.objects.create(name='Court 1')
+        self.players = make_players(2)
+        self.next_hour = 8
+
+    def cancel(self, count):
+        sessions = []
+        for _ in range(count):
+            session = make_session(self.court, start_hour=self.next_hour)
+            self.next_hour += 1
+            for player in self.players:
+                session.add_player(player)
+            sessions.append(session)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/admin/training/trainingsession/', {
+                'action': 'cancel_selected_sessions', '_selected_action': [s.pk for s in sessions],
+            })
+        self.assertEqual(response.status_code, 302)
+        return len(queries)
+
+    def test_query_count_is_independent_of_the_selection(self):
+        self.assertEqual(self.cancel(1), self.cancel(5))
+        self.assertFalse(TrainingSession.objects.exclude(status='canceled').exists())
+        self.assertEqual(
+            set(TrainingSession.objects.values_list('active_count', 'canceled_count')), {(0, 2)}
+        )
+
+
+class SessionBoundsTests(TestCase):
+    """start_at / end_at are derived on save and drive the time-window queries."""
+
+    def setUp(self):
+        self.court = TennisCourt.objects.create(name='Court 1')
+        self.session = make_session(self.court, start_hour=10)
+
+    def test_bounds_follow_date_and_time(self):
+        start = timezone.make_aware(datetime.combine(self.session.date, time(10, 0)))
+        self.assertEqual((self.session.start_at, self.session.end_at), (start, start + timedelta(hours=1)))
+
+        self.session.start_time = time(15, 0)
+        self.session.save()
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.start_at, start + timedelta(hours=5))
+        self.assertEqual(self.session.end_time, time(16, 0))
+
+    def test_time_window_querysets(self):
+        sessions = TrainingSession.objects.filter(pk=self.session.pk)
+        before = self.session.start_at - timedelta(hours=2)
+        after = self.session.end_at + timedelta(minutes=1)
+
+        self.assertTrue(sessions.upcoming(now=before).exists())
+        self.assertFalse(sessions.upcoming(now=after).exists())
+        self.assertFalse(sessions.ended(now=before).exists())
+        self.assertTrue(sessions.ended(now=after).exists())
+        self.assertFalse(sessions.cancellable_by_players(now=before).exists())
+        self.assertTrue(sessions.cancellable_by_players(now=before - timedelta(days=1)).exists())
+
+    def test_players_cannot_cancel_within_the_notice_period(self):
+        player = make_players(1)[0]
+        self.session.add_player(player)
+        TrainingSession.objects.filter(pk=self.session.pk).update(start_at=timezone.now() + timedelta(hours=2))
+        self.session.refresh_from_db()
+
+        with self.assertRaises(ValidationError):
+            self.session.remove_player(player)
+        self.session.remove_player(player, by_admin=True)
+        self.assertEqual(SessionParticipant.objects.get(player=player).status, 'canceled')
+
+
+class SessionWaitlistTests(APITestCase):
+    """Full sessions queue players first come, first served."""
+
+    def setUp(self):
+        self.session = make_session(TennisCourt.objects.create(name='Court 1'), max_players=1)
+        self.players = make_players(4)
+        self.url = f'/api/training/{self.session.pk}/waitlist/'
+
+    def join(self, player):
+        self.client.force_authenticate(player.user)
+        return self.client.post(self.url)
+
+    def waiting(self):
+        return list(self.session.waitlist.values_list('player', flat=True))
+
+    def active(self):
+        return list(
+            SessionParticipant.objects.filter(session=self.session, status='active').values_list('player', flat=True)
+        )
+
+    def test_join_enrolls_then_queues_with_positions(self):
+        first, second, third, _ = self.players
+        self.assertEqual(self.join(first).json(), {'session': self.session.pk, 'status': 'enrolled'})
+
+        response = self.join(second)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['position'], 1)
+        response = self.join(third)
+        self.assertEqual((response.json()['position'], response.json()['waitlist_length']), (2, 2))
+
+        # Joining again keeps the place
+        self.assertEqual(self.join(third).json()['position'], 2)
+        self.client.force_authenticate(third.user)
+        self.assertEqual(self.client.get(self.url).json()['position'], 2)
+
+    def test_get_and_delete(self):
+        first, second, third, _ = self.players
+        for player in (first, second, third):
+            self.join(player)
+
+        self.client.force_authenticate(first.user)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        self.client.force_authenticate(second.user)
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        self.client.force_authenticate(third.user)
+        self.assertEqual(self.client.get(self.url).json()['position'], 1)
+
+    def test_freed_seats_go_to_the_head_of_the_queue(self):
+        first, second, third, fourth = self.players
+        for player in self.players:
+            self.join(player)
+
+        self.session.remove_player(first, by_admin=True)
+        self.assertEqual(self.active(), [second.pk])
+        self.assertEqual(self.waiting(), [third.pk, fourth.pk])
+
+        SessionParticipant.objects.get(player=second).delete()
+        self.assertEqual(self.active(), [third.pk])
+        self.assertEqual(self.waiting(), [fourth.pk])
+
+    def test_waitlists_close_with_their_session(self):
+        for player in self.players[:3]:
+            self.join(player)
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_sessions(TrainingSession.objects.filter(pk=self.session.pk))
+        self.assertEqual(self.waiting(), [])
+        self.assertEqual(self.join(self.players[3]).status_code, 400)
+
+    def test_completed_sessions_close_their_waitlist(self):
+        for player in self.players[:3]:
+            self.join(player)
+        TrainingSession.objects.filter(pk=self.session.pk).update(end_at=timezone.now() - timedelta(hours=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            sweep_sessions()
+        self.assertEqual(self.waiting(), [])
+
+    def test_deleting_a_session_promotes_nobody(self):
+        for player in self.players[:3]:
+            self.join(player)
+        self.session.delete()
+        self.assertFalse(SessionParticipant.objects.exists())
+        self.assertFalse(SessionWaitlistEntry.objects.exists())
+
+
+class CourtUsageTests(APITestCase):
+    """The rollup follows bookings and feeds the utilization heatmap."""
+
+    def setUp(self):
+        self.court = TennisCourt.objects.create(name='Court 1', surface_type='Clay')
+        self.players = make_players(3)
+
+    def usage(self):
+        return list(CourtUsage.objects.order_by('date', 'hour').values_list('hour', 'booked_sessions', 'participants'))
+
+    def test_rollup_follows_sessions_and_participants(self):
+        morning = make_session(self.court, start_hour=9)
+        evening = make_session(self.court, start_hour=18)
+        for player in self.players[:2]:
+            morning.add_player(player)
+        self.assertEqual(self.usage(), [(9, 1, 2), (18, 1, 0)])
+
+        morning.remove_player(self.players[0], by_admin=True)
+        evening.start_time = time(19, 0)
+        evening.save()
+        self.assertEqual(self.usage(), [(9, 1, 1), (19, 1, 0)])
+
+        morning.delete()
+        self.assertEqual(self.usage(), [(19, 1, 0)])
+
+        incremental = self.usage()
+        rebuild_usage()
+        self.assertEqual(self.usage(), incremental)
+
+    def test_session_delete_cost_is_independent_of_participants(self):
+        def delete_cost(participants, hour):
+            session = make_session(self.court, start_hour=hour)
+            for player in self.players[:participants]:
+                session.add_player(player)
+            with CaptureQueriesContext(connection) as queries:
+                session.delete()
+            return len(queries)
+
+        self.assertEqual(delete_cost(1, 9), delete_cost(3, 10))
+
+    def test_heatmap(self):
+        session = make_session(self.court, start_hour=9)
+        session.add_player(self.players[0])
+        self.client.force_authenticate(User.objects.create_user(username='staff', password='pass', is_staff=True))
+
+        start = session.date - timedelta(days=6)
+        response = self.client.get(
+            f'/api/training/courts/utilization/?start={start}&end={session.date}&surface_type=Clay'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['cells'], [{
+            'weekday': session.date.weekday(), 'hour': 9, 'surface_type': 'Clay', 'indoor': False,
+            'booked_sessions': 1, 'participants': 1, 'utilization': 1.0,
+        }])
+
+        # Indoor courts are included unless ?indoor= says otherwise
+        indoor = TennisCourt.objects.create(name='Hall', surface_type='Hard', indoor=True)
+        make_session(indoor, start_hour=11)
+        url = f'/api/training/courts/utilization/?start={start}&end={session.date}'
+        cells = self.client.get(url).json()['cells']
+        self.assertEqual([(cell['hour'], cell['indoor']) for cell in cells], [(9, False), (11, True)])
+        cells = self.client.get(url + '&indoor=true').json()['cells']
+        self.assertEqual([(cell['hour'], cell['indoor']) for cell in cells], [(11, True)])
+
+        too_long = session.date - timedelta(days=366)
+        response = self.client.get(f'/api/training/courts/utilization/?start={too_long}&end={session.date}')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f'/api/training/courts/utilization/?start={date.today() - timedelta(days=400)}')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class SessionParticipantInlineTests(TestCase):
+    """The admin checks seats for all participant rows of a submit together."""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser(username='admin', password='pass'))
+        self.session = make_session(TennisCourt.objects.create(name='Court 1'), max_players=2)
+        self.players = make_players(3)
+        self.session.add_player(self.players[0])
+
+    def submit(self, new_players):
+        session = self.session
+        data = {
+            'court': session.court_id, 'date': session.date.isoformat(), 'start_time': '10:00:00',
+            'focus_area': session.focus_area, 'notes': '', 'intensity': session.intensity,
+            'max_players': session.max_players, 'intended_level': session.intended_level, 'status': session.status,
+            'waitlist-TOTAL_FORMS': 0, 'waitlist-INITIAL_FORMS': 0,
+        }
+        existing = list(SessionParticipant.objects.filter(session=session))
+        prefix = 'sessionparticipant_set'
+        data[f'{prefix}-TOTAL_FORMS'] = len(existing) + len(new_players)
+        data[f'{prefix}-INITIAL_FORMS'] = len(existing)
+        rows = [(p.pk, p.player_id) for p in existing] + [('', player.pk) for player in new_players]
+        for i, (pk, player_id) in enumerate(rows):
+            data.update({f'{prefix}-{i}-id': pk, f'{prefix}-{i}-session': session.pk, f'{prefix}-{i}-player': player_id})
+        return self.client.post(f'/admin/training/trainingsession/{session.pk}/change/', data)
+
+    def test_rows_beyond_the_free_seats_are_rejected(self):
+        response = self.submit(self.players[1:])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Session is full')
+        self.assertEqual(SessionParticipant.objects.filter(session=self.session).count(), 1)
+
+    def test_rows_within_the_free_seats_are_saved(self):
+        response = self.submit(self.players[1:2])
+        self.assertEqual(response.status_code, 302)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.active_count, 2)
@@ -4,4 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.TrainingSessionList.as_view()),
     path('<int:pk>/', views.TrainingSessionDetail.as_view()),
+    path('<int:pk>/waitlist/', views.SessionWaitlist.as_view()),
+    path('recurring/', views.RecurringSessionCreate.as_view()),
+    path('courts/utilization/', views.CourtUtilizationHeatmap.as_view()),
 ]
\ No newline at end of file
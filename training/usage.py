@@ -0,0 +1,83 @@
+"""
+Court utilization rollup.
+
+CourtUsage keeps one row per (court, date, hour) with the number of booked
+(non-canceled) sessions starting in that hour and their active participants.
+Changes refresh only the slots they touch, so the heatmap never has to scan
+raw sessions; rebuild_usage() recomputes a date range from scratch.
+"""
+from datetime import time
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, ExtractHour
+from .models import TrainingSession, CourtUsage
+
+
+def slot_of(court_id, date, start_time):
+    """The rollup key for a session, or None for sessions without a court."""
+    if court_id is None or date is None or start_time is None:
+        return None
+    return (court_id, date, start_time.hour)
+
+
+def refresh_slots(slots):
+    """Recompute the given (court_id, date, hour) slots from their sessions."""
+    for slot in {slot for slot in slots if slot is not None}:
+        court_id, date, hour = slot
+        end = time(hour + 1) if hour < 23 else time.max
+        totals = TrainingSession.objects.filter(
+            court_id=court_id, date=date, start_time__gte=time(hour), start_time__lt=end
+        ).exclude(status='canceled').aggregate(
+            sessions=Count('id'), participants=Coalesce(Sum('active_count'), 0)
+        )
+        if totals['sessions']:
+            CourtUsage.objects.update_or_create(
+                court_id=court_id, date=date, hour=hour,
+                defaults={
+                    'booked_sessions': totals['sessions'],
+                    'participants': totals['participants'],
+                },
+            )
+        else:
+            CourtUsage.objects.filter(court_id=court_id, date=date, hour=hour).delete()
+
+
+def refresh_sessions(session_ids):
+    """Refresh the slots of the given sessions (one lookup for the batch)."""
+    rows = TrainingSession.objects.filter(pk__in=session_ids).values_list('court_id', 'date', 'start_time')
+    refresh_slots(slot_of(*row) for row in rows)
+
+
+def rebuild_usage(start_date=None, end_date=None):
+    """Recompute the rollup from scratch, optionally for a date range only."""
+    sessions = TrainingSession.objects.exclude(status='canceled').exclude(court=None)
+    usage = CourtUsage.objects.all()
+    if start_date:
+        sessions = sessions.filter(date__gte=start_date)
+        usage = usage.filter(date__gte=start_date)
+    if end_date:
+        sessions = sessions.filter(date__lte=end_date)
+        usage = usage.filter(date__lte=end_date)
+
+    totals = (
+        sessions.order_by()
+        .annotate(hour=ExtractHour('start_time'))
+        .values('court_id', 'date', 'hour')
+        .annotate(sessions=Count('id'), participants=Coalesce(Sum('active_count'), 0))
+    )
+    with transaction.atomic():
+        usage.delete()
+        rows = CourtUsage.objects.bulk_create(
+            (
+                CourtUsage(
+                    court_id=row['court_id'],
+                    date=row['date'],
+                    hour=row['hour'],
+                    booked_sessions=row['sessions'],
+                    participants=row['participants'],
+                )
+                for row in totals.iterator()
+            ),
+            batch_size=1000,
+        )
+    return len(rows)
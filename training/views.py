@@ -1,27 +1,192 @@
-from django.shortcuts import render
-from rest_framework import generics, permissions
-from .models import TrainingSession
-from .serializers import TrainingSessionSerializer, TrainingSessionDetailSerializer
+from django.shortcuts import render, get_object_or_404
+from datetime import timedelta
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractIsoWeekDay
+from django.utils import timezone
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.response import Response
+from profiles.models import PlayerProfile
+from .models import TrainingSession, SessionParticipant, SessionWaitlistEntry, TennisCourt, CourtUsage
+from .recurrence import create_recurring_sessions
+from .serializers import (
+    TrainingSessionSerializer,
+    TrainingSessionDetailSerializer,
+    RecurringSessionSerializer,
+    CourtUtilizationQuerySerializer,
+)
 from tennisapp.permissions import IsOwnerOrReadOnly
 
 # Create your views here.
 class TrainingSessionList(generics.ListCreateAPIView):
     serializer_class = TrainingSessionSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # Opt-in keyset pagination with ?cursor=
+    cursor_ordering = ('-date', '-start_time', '-id')
     
     def get_queryset(self):
+        sessions = TrainingSession.objects.for_listing()
         # If user is staff, show all sessions
         if self.request.user.is_staff:
-            return TrainingSession.objects.all()
-        # Otherwise, only show sessions for the current user
-        return TrainingSession.objects.filter(player__user=self.request.user)
+            return sessions
+        if not self.request.user.is_authenticated:
+            return sessions.none()
+        # Otherwise, only show sessions the current user takes part in
+        return sessions.filter(sessionparticipant__player__user=self.request.user)
     
     def perform_create(self, serializer):
-        # Automatically set the player to the current user's profile
-        profile = self.request.user.playerprofile
-        serializer.save(player=profile)
+        # Automatically enroll the current user's player profile
+        session = serializer.save()
+        profile = PlayerProfile.objects.filter(user=self.request.user).first()
+        if profile is not None:
+            session.add_player(profile)
 
 class TrainingSessionDetail(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    queryset = TrainingSession.objects.for_listing()
+    serializer_class = TrainingSessionDetailSerializer
+
+class RecurringSessionCreate(generics.GenericAPIView):
+    """Book a weekly recurrence rule in one pass and report conflicts per occurrence."""
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = RecurringSessionSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        dry_run = data.pop('dry_run')
+        try:
+            created, conflicts = create_recurring_sessions(
+                weekday=data.pop('weekday'),
+                start_date=data.pop('start_date'),
+                end_date=data.pop('end_date'),
+                dry_run=dry_run,
+                **data
+            )
+        except ValidationError as exc:
+            return Response(exc.message_dict, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "dry_run": dry_run,
+            "created_count": 0 if dry_run else len(created),
+            "dates": [session.date for session in created],
+            "session_ids": [session.pk for session in created if session.pk],
+            "conflicts": conflicts,
+        }, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+class SessionWaitlist(generics.GenericAPIView):
+    """
+    Join a session or its waitlist (POST), see your place in the queue (GET)
+    and leave the queue (DELETE). Freed seats are handed to the head of the
+    queue on the server, so clients don't need to poll for space.
+    """
+    permission_classes = [permissions.IsAuthenticated]
     queryset = TrainingSession.objects.all()
-    serializer_class = TrainingSessionDetailSerializer
\ No newline at end of file
+
+    def get_player(self):
+        return get_object_or_404(PlayerProfile, user=self.request.user)
+
+    def get_entry(self, session, player):
+        return SessionWaitlistEntry.objects.filter(session=session, player=player).first()
+
+    def waitlist_response(self, session, entry, status_code=status.HTTP_200_OK):
+        return Response({
+            "session": session.pk,
+            "status": "waitlisted",
+            "position": entry.position(),
+            "waitlist_length": session.waitlist.count(),
+        }, status=status_code)
+
+    def get(self, request, *args, **kwargs):
+        session = self.get_object()
+        entry = self.get_entry(session, self.get_player())
+        if entry is None:
+            return Response({"detail": "You are not on the waitlist for this session."},
+                            status=status.HTTP_404_NOT_FOUND)
+        return self.waitlist_response(session, entry)
+
+    def post(self, request, *args, **kwargs):
+        session = self.get_object()
+        player = self.get_player()
+        if session.status != 'scheduled':
+            return Response({"detail": "This session is not open for booking."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if SessionParticipant.objects.filter(session=session, player=player, status='active').exists():
+            return Response({"session": session.pk, "status": "enrolled"})
+
+        entry = self.get_entry(session, player)
+        if entry is None:
+            try:
+                session.add_player(player)
+                return Response({"session": session.pk, "status": "enrolled"},
+                                status=status.HTTP_201_CREATED)
+            except ValueError:
+                entry = session.join_waitlist(player)
+        return self.waitlist_response(session, entry, status.HTTP_202_ACCEPTED)
+
+    def delete(self, request, *args, **kwargs):
+        session = self.get_object()
+        SessionWaitlistEntry.objects.filter(session=session, player=self.get_player()).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CourtUtilizationHeatmap(generics.GenericAPIView):
+    """
+    Court utilization by weekday (0=Monday) and hour, split by surface type
+    and indoor/outdoor. Reads only the CourtUsage rollup, never raw sessions.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = CourtUtilizationQuerySerializer
+    DEFAULT_WEEKS = 12
+    MAX_DAYS = 366
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        end = params.get('end') or timezone.localdate()
+        start = params.get('start') or end - timedelta(weeks=self.DEFAULT_WEEKS)
+        if (end - start).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({"start": f"The range can span at most {self.MAX_DAYS} days."})
+
+        courts = TennisCourt.objects.all()
+        if params.get('court'):
+            courts = courts.filter(pk=params['court'].pk)
+        if params.get('surface_type'):
+            courts = courts.filter(surface_type=params['surface_type'])
+        if params.get('indoor') is not None:
+            courts = courts.filter(indoor=params['indoor'])
+
+        # Court-hours on offer: courts per group x days of each weekday in range
+        group_sizes = {
+            (row['surface_type'], row['indoor']): row['courts']
+            for row in courts.order_by().values('surface_type', 'indoor').annotate(courts=Count('id'))
+        }
+        weekday_days = [0] * 7
+        for offset in range((end - start).days + 1):
+            weekday_days[(start + timedelta(days=offset)).weekday()] += 1
+
+        rows = (
+            CourtUsage.objects.filter(date__range=(start, end), court__in=courts)
+            .annotate(iso_weekday=ExtractIsoWeekDay('date'))
+            .values('iso_weekday', 'hour', 'court__surface_type', 'court__indoor')
+            .annotate(booked=Sum('booked_sessions'), players=Sum('participants'))
+            .order_by('iso_weekday', 'hour', 'court__surface_type', 'court__indoor')
+        )
+        cells = []
+        for row in rows:
+            weekday = row['iso_weekday'] - 1
+            group = (row['court__surface_type'], row['court__indoor'])
+            available = group_sizes.get(group, 0) * weekday_days[weekday]
+            cells.append({
+                "weekday": weekday,
+                "hour": row['hour'],
+                "surface_type": group[0],
+                "indoor": group[1],
+                "booked_sessions": row['booked'],
+                "participants": row['players'],
+                "utilization": round(row['booked'] / available, 4) if available else None,
+            })
+        return Response({"start": start, "end": end, "cells": cells})